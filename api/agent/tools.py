@@ -5,17 +5,14 @@ Each function returns standardized JSON responses for LLM consumption
 import sys
 import os
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from database.operations import (
-    get_all_products,
-    get_latest_price,
-    get_price_statistics,
-    get_price_history
-)
+from database.archive import get_long_range_price_window, get_long_range_trend_summary
+from database.cache import get_product_by_id, get_catalog, get_product_snapshots
+from api.downsampling import downsample_observations
 from config import PRODUCTS
 
 
@@ -33,6 +30,11 @@ def _standardize_response(
     }
 
 
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    """Format a record timestamp for the JSON tool output"""
+    return value.isoformat() if value else None
+
+
 def get_laptop_prices(
     brand: Optional[str] = None,
     min_price: Optional[float] = None,
@@ -80,49 +82,45 @@ def get_laptop_prices(
                 error="min_price cannot be greater than max_price"
             )
 
-        # Get all products
-        products = get_all_products()
+        # Get all products with their latest prices
+        catalog = get_catalog()
 
-        if not products:
+        if not catalog:
             return _standardize_response(
                 success=True,
                 data={"count": 0, "products": []}
             )
 
-        # Enrich with latest prices
         enriched_products = []
-        for product in products:
+        for product, latest in catalog:
             # Filter by brand if specified
-            if brand and product["brand"] != brand:
+            if brand and product.brand != brand:
                 continue
 
-            # Get latest price
-            latest = get_latest_price(product["product_id"])
-
             if not latest:
                 continue
 
             # Filter by price range
-            if min_price and (latest["price"] is None or latest["price"] < min_price):
+            if min_price and (latest.price is None or latest.price < min_price):
                 continue
 
-            if max_price and (latest["price"] is None or latest["price"] > max_price):
+            if max_price and (latest.price is None or latest.price > max_price):
                 continue
 
             # Filter by availability
-            if in_stock_only and latest["availability"] != "In Stock":
+            if in_stock_only and latest.availability != "In Stock":
                 continue
 
             enriched_products.append({
-                "product_id": product["product_id"],
-                "brand": product["brand"],
-                "model": product["model"],
-                "product_url": product["product_url"],
-                "current_price": latest["price"],
-                "currency": latest["currency"],
-                "availability": latest["availability"],
-                "promo": latest["promo"],
-                "last_updated": latest["scraped_at"]
+                "product_id": product.product_id,
+                "brand": product.brand,
+                "model": product.model,
+                "product_url": product.product_url,
+                "current_price": latest.price,
+                "currency": latest.currency,
+                "availability": latest.availability,
+                "promo": latest.promo,
+                "last_updated": _isoformat(latest.scraped_at)
             })
 
         # Sort by price (cheapest first)
@@ -157,44 +155,39 @@ def get_laptop_details(product_id: str) -> Dict[str, Any]:
         get_laptop_details("HP-PROBOOK-440-G11")
     """
     try:
-        # Validate product exists
-        all_products = get_all_products()
-        product = next((p for p in all_products if p["product_id"] == product_id), None)
+        # Product, latest price and statistics in one query
+        snapshots = get_product_snapshots([product_id])
 
-        if not product:
+        if not snapshots:
             return _standardize_response(
                 success=False,
                 error=f"Product '{product_id}' not found. Use get_laptop_prices() to see available products."
             )
 
-        # Get latest price
-        latest = get_latest_price(product_id)
+        snapshot = snapshots[0]
 
-        if not latest:
+        if not snapshot.has_price_data:
             return _standardize_response(
                 success=False,
                 error=f"No price data available for '{product_id}'"
             )
 
-        # Get price statistics
-        stats = get_price_statistics(product_id)
-
         # Combine all data
         details = {
-            "product_id": product["product_id"],
-            "brand": product["brand"],
-            "model": product["model"],
-            "product_url": product["product_url"],
-            "current_price": latest["price"],
-            "currency": latest["currency"],
-            "availability": latest["availability"],
-            "promo": latest["promo"],
-            "last_updated": latest["scraped_at"],
+            "product_id": snapshot.product_id,
+            "brand": snapshot.brand,
+            "model": snapshot.model,
+            "product_url": snapshot.product_url,
+            "current_price": snapshot.price,
+            "currency": snapshot.currency,
+            "availability": snapshot.availability,
+            "promo": snapshot.promo,
+            "last_updated": _isoformat(snapshot.scraped_at),
             "statistics": {
-                "min_price": stats["min_price"] if stats else None,
-                "max_price": stats["max_price"] if stats else None,
-                "avg_price": stats["avg_price"] if stats else None,
-                "total_records": stats["total_records"] if stats else 0
+                "min_price": snapshot.min_price,
+                "max_price": snapshot.max_price,
+                "avg_price": snapshot.avg_price,
+                "total_records": snapshot.total_records
             }
         }
 
@@ -210,13 +203,14 @@ def get_laptop_details(product_id: str) -> Dict[str, Any]:
         )
 
 
-def get_price_trend(product_id: str, days: int = 30) -> Dict[str, Any]:
+def get_price_trend(product_id: str, days: int = 30, points: int = 50) -> Dict[str, Any]:
     """
     Get price history and trend analysis for a laptop over a time period.
 
     Args:
         product_id: Laptop identifier
         days: Number of days to analyze (1-365, default 30)
+        points: Maximum history points, downsampled with LTTB (default 50)
 
     Returns:
         Standardized response with price trend data
@@ -233,8 +227,7 @@ def get_price_trend(product_id: str, days: int = 30) -> Dict[str, Any]:
             )
 
         # Validate product exists
-        all_products = get_all_products()
-        product = next((p for p in all_products if p["product_id"] == product_id), None)
+        product = get_product_by_id(product_id)
 
         if not product:
             return _standardize_response(
@@ -242,42 +235,28 @@ def get_price_trend(product_id: str, days: int = 30) -> Dict[str, Any]:
                 error=f"Product '{product_id}' not found"
             )
 
-        # Get price history (get more than needed to filter by date)
-        history = get_price_history(product_id, limit=1000)
+        # Aggregate the date window in SQL (plus the Parquet archive for old days)
+        cutoff_date = datetime.now() - timedelta(days=days)
+        summary = get_long_range_trend_summary(product_id, cutoff_date)
 
-        if not history:
+        if summary is None:
             return _standardize_response(
                 success=False,
                 error=f"No price history available for '{product_id}'"
             )
 
-        # Filter by date range
-        from datetime import datetime, timedelta
-        cutoff_date = datetime.now() - timedelta(days=days)
-
-        filtered_history = []
-        for record in history:
-            record_date = datetime.fromisoformat(record["scraped_at"])
-            if record_date >= cutoff_date:
-                filtered_history.append(record)
-
-        if not filtered_history:
+        if not summary["data_points"]:
             return _standardize_response(
                 success=False,
                 error=f"No price data found within the last {days} days for '{product_id}'"
             )
 
-        # Sort by date (oldest first)
-        filtered_history.sort(key=lambda x: x["scraped_at"])
-
         # Calculate trend
-        first_price = filtered_history[0]["price"]
-        latest_price = filtered_history[-1]["price"]
-
-        prices = [h["price"] for h in filtered_history if h["price"] is not None]
-        min_price = min(prices) if prices else None
-        max_price = max(prices) if prices else None
-        avg_price = sum(prices) / len(prices) if prices else None
+        first_price = summary["first_price"]
+        latest_price = summary["latest_price"]
+        min_price = summary["min_price"]
+        max_price = summary["max_price"]
+        avg_price = summary["avg_price"]
 
         price_change = latest_price - first_price if first_price and latest_price else 0
         price_change_percent = (price_change / first_price * 100) if first_price else 0
@@ -290,21 +269,23 @@ def get_price_trend(product_id: str, days: int = 30) -> Dict[str, Any]:
         else:
             trend_direction = "down"
 
-        # Return last 50 data points for visualization
-        visualization_data = filtered_history[-50:]
+        # Downsample the whole window for visualization (oldest first)
+        visualization_data = [
+            row.to_dict() for row in downsample_observations(get_long_range_price_window(product_id, cutoff_date)[::-1], points)
+        ]
 
         return _standardize_response(
             success=True,
             data={
                 "product_id": product_id,
-                "brand": product["brand"],
-                "model": product["model"],
+                "brand": product.brand,
+                "model": product.model,
                 "period_days": days,
                 "trend": {
                     "first_price": first_price,
-                    "first_date": filtered_history[0]["scraped_at"],
+                    "first_date": summary["first_date"],
                     "latest_price": latest_price,
-                    "latest_date": filtered_history[-1]["scraped_at"],
+                    "latest_date": summary["latest_date"],
                     "min_price": min_price,
                     "max_price": max_price,
                     "avg_price": round(avg_price, 2) if avg_price else None,
@@ -337,43 +318,35 @@ def compare_laptop_prices(product_ids: Optional[List[str]] = None) -> Dict[str,
         compare_laptop_prices(["HP-PROBOOK-440-G11", "LENOVO-THINKPAD-E14-GEN7-AMD"])
     """
     try:
-        # Get all products
-        all_products = get_all_products()
+        # Get products with latest price and statistics (filtered by product_ids if specified)
+        snapshots = get_product_snapshots(product_ids or None)
 
-        if not all_products:
-            return _standardize_response(
-                success=True,
-                data={"count": 0, "comparison": []}
-            )
-
-        # Filter by product_ids if specified
-        if product_ids:
-            all_products = [p for p in all_products if p["product_id"] in product_ids]
-
-            if not all_products:
+        if not snapshots:
+            if product_ids:
                 return _standardize_response(
                     success=False,
                     error="None of the specified product_ids were found"
                 )
+            return _standardize_response(
+                success=True,
+                data={"count": 0, "comparison": []}
+            )
 
         # Build comparison list
         comparison = []
-        for product in all_products:
-            latest = get_latest_price(product["product_id"])
-            stats = get_price_statistics(product["product_id"])
-
-            if latest:
+        for snapshot in snapshots:
+            if snapshot.has_price_data:
                 comparison.append({
-                    "product_id": product["product_id"],
-                    "brand": product["brand"],
-                    "model": product["model"],
-                    "current_price": latest["price"],
-                    "currency": latest["currency"],
-                    "availability": latest["availability"],
-                    "min_price": stats["min_price"] if stats else None,
-                    "max_price": stats["max_price"] if stats else None,
-                    "avg_price": round(stats["avg_price"], 2) if stats and stats["avg_price"] else None,
-                    "last_updated": latest["scraped_at"]
+                    "product_id": snapshot.product_id,
+                    "brand": snapshot.brand,
+                    "model": snapshot.model,
+                    "current_price": snapshot.price,
+                    "currency": snapshot.currency,
+                    "availability": snapshot.availability,
+                    "min_price": snapshot.min_price,
+                    "max_price": snapshot.max_price,
+                    "avg_price": round(snapshot.avg_price, 2) if snapshot.avg_price else None,
+                    "last_updated": _isoformat(snapshot.scraped_at)
                 })
 
         # Sort by current price (cheapest first)
@@ -415,10 +388,10 @@ def check_availability(brand: Optional[str] = None) -> Dict[str, Any]:
                 error=f"Invalid brand '{brand}'. Must be 'HP' or 'Lenovo'."
             )
 
-        # Get all products
-        all_products = get_all_products()
+        # Get all products with their latest prices
+        catalog = get_catalog()
 
-        if not all_products:
+        if not catalog:
             return _standardize_response(
                 success=True,
                 data={"summary": {"total_products": 0, "in_stock": 0, "out_of_stock": 0}, "details": []}
@@ -426,30 +399,29 @@ def check_availability(brand: Optional[str] = None) -> Dict[str, Any]:
 
         # Filter by brand if specified
         if brand:
-            all_products = [p for p in all_products if p["brand"] == brand]
+            catalog = [(p, latest) for p, latest in catalog if p.brand == brand]
 
         # Build availability list
         in_stock_count = 0
         out_of_stock_count = 0
         details = []
 
-        for product in all_products:
-            latest = get_latest_price(product["product_id"])
+        for product, latest in catalog:
 
             if latest:
-                is_in_stock = latest["availability"] == "In Stock"
+                is_in_stock = latest.availability == "In Stock"
                 if is_in_stock:
                     in_stock_count += 1
                 else:
                     out_of_stock_count += 1
 
                 details.append({
-                    "product_id": product["product_id"],
-                    "brand": product["brand"],
-                    "model": product["model"],
-                    "availability": latest["availability"],
-                    "price": latest["price"],
-                    "last_updated": latest["scraped_at"]
+                    "product_id": product.product_id,
+                    "brand": product.brand,
+                    "model": product.model,
+                    "availability": latest.availability,
+                    "price": latest.price,
+                    "last_updated": _isoformat(latest.scraped_at)
                 })
 
         # Sort by availability (in stock first), then by price
@@ -505,10 +477,10 @@ def find_deals(
                 error=f"Invalid brand '{brand}'. Must be 'HP' or 'Lenovo'."
             )
 
-        # Get all products
-        all_products = get_all_products()
+        # Get all products with latest price and statistics
+        snapshots = get_product_snapshots()
 
-        if not all_products:
+        if not snapshots:
             return _standardize_response(
                 success=True,
                 data={"count": 0, "deals": []}
@@ -516,19 +488,16 @@ def find_deals(
 
         # Filter by brand if specified
         if brand:
-            all_products = [p for p in all_products if p["brand"] == brand]
+            snapshots = [s for s in snapshots if s.brand == brand]
 
         # Find deals
         deals = []
-        for product in all_products:
-            latest = get_latest_price(product["product_id"])
-            stats = get_price_statistics(product["product_id"])
-
-            if not latest or not stats or not latest["price"] or not stats["avg_price"]:
+        for snapshot in snapshots:
+            if not snapshot.price or not snapshot.avg_price:
                 continue
 
-            current_price = latest["price"]
-            avg_price = stats["avg_price"]
+            current_price = snapshot.price
+            avg_price = snapshot.avg_price
 
             # Calculate discount percentage
             discount_percent = ((avg_price - current_price) / avg_price) * 100
@@ -536,16 +505,16 @@ def find_deals(
             # Check if meets threshold
             if discount_percent >= threshold_percent:
                 deals.append({
-                    "product_id": product["product_id"],
-                    "brand": product["brand"],
-                    "model": product["model"],
+                    "product_id": snapshot.product_id,
+                    "brand": snapshot.brand,
+                    "model": snapshot.model,
                     "current_price": current_price,
                     "avg_price": round(avg_price, 2),
                     "discount_amount": round(avg_price - current_price, 2),
                     "discount_percent": round(discount_percent, 2),
-                    "availability": latest["availability"],
-                    "promo": latest["promo"],
-                    "last_updated": latest["scraped_at"]
+                    "availability": snapshot.availability,
+                    "promo": snapshot.promo,
+                    "last_updated": _isoformat(snapshot.scraped_at)
                 })
 
         # Sort by discount percentage (best deals first)
@@ -0,0 +1,130 @@
+"""
+Response compression middleware
+Compresses response bodies of at least API_COMPRESSION_MIN_SIZE bytes with
+brotli (when the Brotli package is installed and the client accepts "br")
+or gzip. JSON from the price-history and comparison endpoints compresses
+roughly 10x, which matters far more on the wire than serialization time.
+
+Only complete bodies are compressed; streamed responses pass through
+unchanged. That includes responses passing through BaseHTTPMiddleware
+(@app.middleware), so this middleware must be registered inside those.
+"""
+import os
+import sys
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from config import API_COMPRESSION_MIN_SIZE, API_GZIP_LEVEL, API_BROTLI_QUALITY
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def supported_encodings() -> tuple:
+    """Content codings this process can produce, in order of preference"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    """
+    Pick the preferred supported coding from an Accept-Encoding header
+
+    Args:
+        accept_encoding: Raw header value, e.g. "gzip, deflate, br;q=0.9"
+
+    Returns:
+        str: "br", "gzip", or None to send the identity encoding
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in supported_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a response body
+
+    Args:
+        body: Uncompressed bytes
+        encoding: "br" or "gzip"
+
+    Returns:
+        bytes: Encoded body
+    """
+    if encoding == "br":
+        return brotli.compress(body, mode=brotli.MODE_TEXT, quality=API_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=API_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large, complete response bodies"""
+
+    def __init__(self, app, minimum_size: int = API_COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (encoding is None
+                    or message.get("more_body", False)
+                    or len(body) < self.minimum_size
+                    or "content-encoding" in headers
+                    or not headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)):
+                # Not accepted, streamed, small or already encoded: send as is
+                passthrough = True
+                if "content-encoding" not in headers:
+                    headers.add_vary_header("Accept-Encoding")
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
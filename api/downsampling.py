@@ -0,0 +1,109 @@
+"""
+Chart downsampling for price-trend history
+Largest-Triangle-Three-Buckets (LTTB, Steinarsson 2013) picks the N points
+of a series that keep its visual shape: price drops, spikes and promo dips
+survive, where taking the first or last N rows of a window would simply
+cut most of it off.
+
+Bucket averages are computed with NumPy in one pass; the selection loop
+runs once per output point over vectorized triangle areas.
+"""
+from datetime import date, datetime
+
+import numpy as np
+
+
+def lttb_indices(x, y, points: int) -> np.ndarray:
+    """
+    Indices of the points LTTB keeps from a series
+
+    Args:
+        x: Ascending x values (e.g. POSIX timestamps)
+        y: Values, same length as x (no NaNs)
+        points: Target number of points (the first and last are always kept)
+
+    Returns:
+        np.ndarray: Ascending indices into x/y, at most `points` long
+    """
+    n = len(x)
+    if points >= n:
+        return np.arange(n, dtype=np.intp)
+    if points < 3:
+        return np.array([0, n - 1][:points], dtype=np.intp)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # points - 2 buckets over the interior points [1, n - 1)
+    # (integer arithmetic: exact bucket boundaries, the last one is n - 1)
+    edges = np.arange(points - 1, dtype=np.intp) * (n - 2) // (points - 2) + 1
+    starts = edges[:-1]
+    counts = np.diff(edges)
+
+    # Average of each bucket; the last bucket looks ahead to the final point
+    mean_x = np.append(np.add.reduceat(x[:n - 1], starts) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:n - 1], starts) / counts, y[-1])
+
+    selected = np.empty(points, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Twice the area of the triangle (point a, candidate, next bucket average)
+        area = np.abs(
+            (x[a] - mean_x[i + 1]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (mean_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def _timestamp(value) -> float:
+    """Numeric x value for a datetime, date or ISO 8601 string"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return float(value.toordinal() * 86400)
+    return float(value)
+
+
+def downsample(rows: list, points: int, x, y) -> list:
+    """
+    Reduce rows to at most `points` with LTTB
+
+    Rows without a value (failed scrapes) are skipped. Rows may be in
+    either time order; the result keeps that order.
+
+    Args:
+        rows: Records or dicts, ordered by time
+        points: Target number of rows
+        x: Callable returning a row's timestamp (datetime, date or ISO string)
+        y: Callable returning a row's value (None to skip the row)
+
+    Returns:
+        list: The kept rows
+    """
+    rows = [row for row in rows if y(row) is not None]
+    if len(rows) <= points:
+        return rows
+
+    newest_first = _timestamp(x(rows[0])) > _timestamp(x(rows[-1]))
+    if newest_first:
+        rows = rows[::-1]
+
+    keep = lttb_indices([_timestamp(x(row)) for row in rows], [float(y(row)) for row in rows], points)
+    result = [rows[i] for i in keep]
+    return result[::-1] if newest_first else result
+
+
+def downsample_observations(observations: list, points: int) -> list:
+    """LTTB over PriceObservation records (as returned by get_price_window)"""
+    return downsample(observations, points, lambda row: row.scraped_at, lambda row: row.price)
+
+
+def downsample_buckets(buckets: list, points: int) -> list:
+    """LTTB over rollup bucket dicts (as returned by get_price_rollup), by close price"""
+    return downsample(buckets, points, lambda row: row["period_start"], lambda row: row["close_price"])
@@ -4,32 +4,203 @@ Exposes endpoints for product data, price history, and analytics
 """
 import os
 import sys
-from fastapi import FastAPI, HTTPException, Query, Body
+import json
+import math
+import logging
+import base64
+import asyncio
+import hashlib
+from collections import Counter
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Body, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
-from datetime import datetime, timedelta
-from pydantic import BaseModel
+from datetime import datetime, date, timedelta
+from pydantic import BaseModel, Field
 
 # Add project root to path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from database.operations import (
+from database.async_operations import (
     get_all_products,
+    get_product_by_id,
     get_latest_price,
+    get_catalog,
     get_price_history,
-    get_price_statistics
+    get_long_range_price_window,
+    get_long_range_trend_summary,
+    get_price_rollup,
+    get_rollup_trend_summary,
+    get_price_statistics,
+    get_price_statistics_batch,
+    get_price_trend_summaries,
+    get_price_rollups,
+    get_product_snapshots,
+    get_data_version,
+    run_in_db_executor,
+    shutdown_executor
 )
-from config import PRODUCTS
+from database.connection import (
+    get_pool_metrics,
+    get_circuit_metrics,
+    get_replica_metrics,
+    close_pools,
+    DatabaseUnavailableError,
+    PoolTimeoutError
+)
+from api.compression import CompressionMiddleware, choose_encoding, supported_encodings
+from api.responses import json_response, orjson
+from api.downsampling import downsample_observations, downsample_buckets
+from database.cache import get_cache_metrics
+from database.instrumentation import get_query_metrics, request_summary, request_degraded
+from database.migrations import apply_migrations, check_schema_version
+from config import (
+    PRODUCTS,
+    DB_AUTO_MIGRATE,
+    DB_SLOW_REQUEST_MS,
+    DB_REPEATED_OPERATION_THRESHOLD,
+    HTTP_CACHE_ENABLED,
+    HTTP_CACHE_MAX_AGE,
+    API_FAST_JSON,
+    API_COMPRESSION_ENABLED
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _warn_missing_accelerators():
+    """Log once when an optional serialization or compression package is missing"""
+    if API_FAST_JSON and orjson is None:
+        logger.warning("orjson is not installed; /api/v1 responses use the slower default JSON encoder")
+    if API_COMPRESSION_ENABLED and "br" not in supported_encodings():
+        logger.warning("Brotli is not installed; responses are compressed with gzip only")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Check the schema version on startup and release database resources on shutdown"""
+    _warn_missing_accelerators()
+    
+    if DB_AUTO_MIGRATE:
+        try:
+            await run_in_db_executor(apply_migrations)
+        except Exception as e:
+            logger.error(f"Automatic migration failed: {str(e)}")
+    
+    app.state.schema_status = await run_in_db_executor(check_schema_version)
+    if not app.state.schema_status["up_to_date"]:
+        logger.warning(
+            f"Database schema is not up to date (applied={app.state.schema_status['applied']}, "
+            f"expected={app.state.schema_status['expected']}). Run: python -m database.migrations"
+        )
+    
+    yield
+    shutdown_executor()
+    close_pools()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Laptop Insights API",
     description="REST API for laptop price tracking and comparison",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Compress large bodies (innermost: BaseHTTPMiddleware re-streams responses,
+# which would otherwise be passed through uncompressed)
+if API_COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Read endpoints whose responses also depend on the current time (sliding
+# windows): their ETags additionally change every hour
+_TIME_WINDOWED_SUFFIXES = ("/price-trend",)
+
+
+def _compute_etag(version, request: Request) -> str:
+    """
+    ETag for a read request
+    
+    Responses are a pure function of the data version and the request
+    path and query, so equal inputs give byte-identical bodies. Requests
+    that negotiate compression get a weak ETag: their bytes differ from
+    the identity body (as nginx does).
+    """
+    key = [repr(version), request.url.path, sorted(request.query_params.multi_items())]
+    if request.url.path.endswith(_TIME_WINDOWED_SUFFIXES):
+        key.append(datetime.now().strftime("%Y-%m-%d %H"))
+    digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+    if API_COMPRESSION_ENABLED and choose_encoding(request.headers.get("accept-encoding", "")):
+        return f'W/"{digest[:32]}"'
+    return f'"{digest[:32]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == opaque for tag in candidates)
+
+
+def _cache_control() -> str:
+    if HTTP_CACHE_MAX_AGE > 0:
+        return f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate"
+    return "no-cache"
+
+
+# Registered before CORS so that 304 responses still get CORS headers
+# (middleware added later wraps the earlier ones)
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """
+    Answer repeated /api/v1 reads with 304 Not Modified
+    
+    Data only changes when the scraper runs, so the ETag is derived from
+    the data version (probed at most once per CATALOG_CACHE_TTL) and the
+    request parameters. A matching If-None-Match is answered before the
+    endpoint runs, skipping its database work entirely.
+    
+    Responses built while a database operation failed (operations return
+    empty results on errors) or marked degraded are sent untagged, so a
+    partial body is never revalidated with 304.
+    """
+    if not HTTP_CACHE_ENABLED or request.method != "GET" or not request.url.path.startswith("/api/v1/"):
+        return await call_next(request)
+    
+    try:
+        version = await get_data_version()
+    except Exception as e:
+        logger.warning(f"Data version unavailable, skipping ETag: {str(e)}")
+        version = None
+    if version is None:
+        return await call_next(request)
+    
+    etag = _compute_etag(version, request)
+    headers = {"ETag": etag, "Cache-Control": _cache_control()}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        not_modified = Response(status_code=304, headers=headers)
+        if API_COMPRESSION_ENABLED:
+            # Same headers as the 200 this stands for
+            not_modified.headers["Vary"] = "Accept-Encoding"
+        return not_modified
+    
+    response = await call_next(request)
+    # Skip the tag if the result may be incomplete, or if a scrape landed
+    # while the response was being built
+    if (response.status_code == 200
+            and not request_degraded()
+            and await get_data_version() == version):
+        response.headers.update(headers)
+    return response
+
+
 # Enable CORS for frontend access
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +211,68 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def database_request_summary(request: Request, call_next):
+    """
+    Summarize the database work done for each request
+    
+    Adds a Server-Timing header with total database time and operation
+    count, and logs the per-operation breakdown when the request is slow
+    or calls the same operation repeatedly (an N+1 pattern).
+    """
+    with request_summary() as summary:
+        response = await call_next(request)
+    
+    if summary:
+        db_ms = sum(op["total_ms"] for op in summary)
+        queries = sum(op["queries"] for op in summary)
+        response.headers["Server-Timing"] = f'db;dur={db_ms:.1f};desc="{len(summary)} operations, {queries} queries"'
+        
+        repeated = {
+            name: count for name, count in Counter(op["operation"] for op in summary).items()
+            if count >= DB_REPEATED_OPERATION_THRESHOLD
+        }
+        if db_ms >= DB_SLOW_REQUEST_MS or repeated:
+            logger.warning(
+                f"{request.method} {request.url.path}: {len(summary)} database operations, "
+                f"{queries} queries, {db_ms:.1f} ms"
+                + (f", repeated operations {repeated}" if repeated else "")
+                + f" {json.dumps(summary)}"
+            )
+    
+    return response
+
+
+# Valid values for the `resolution` query parameter: raw rows or price_daily buckets
+RESOLUTION_PATTERN = "^(raw|day|week|month)$"
+
+# History points returned for charts (downsampled with LTTB) by default and at most
+TREND_HISTORY_POINTS = 50
+MAX_HISTORY_POINTS = 1000
+
+# POST /api/v1/products/batch: maximum product_ids per request and the facets it can return
+MAX_BATCH_PRODUCTS = 100
+BATCH_FACETS = ("latest", "stats", "trend", "history")
+
+
+def _server_error(error: Exception) -> HTTPException:
+    """
+    Map an unexpected endpoint error to an HTTP error
+    
+    Database outages (open circuit, saturated pool) become 503 with a
+    Retry-After hint so clients back off instead of treating it as a bug.
+    """
+    if isinstance(error, DatabaseUnavailableError):
+        return HTTPException(
+            status_code=503,
+            detail="Database temporarily unavailable",
+            headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+        )
+    if isinstance(error, PoolTimeoutError):
+        return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "1"})
+    return HTTPException(status_code=500, detail=str(error))
+
+
 # ==================== Request Models for Agent Tools ====================
 
 class GetLaptopPricesRequest(BaseModel):
@@ -54,6 +287,7 @@ class GetLaptopDetailsRequest(BaseModel):
 class GetPriceTrendRequest(BaseModel):
     product_id: str
     days: int = 30
+    points: int = Field(default=TREND_HISTORY_POINTS, ge=2, le=MAX_HISTORY_POINTS)
 
 class CompareLaptopPricesRequest(BaseModel):
     product_ids: Optional[List[str]] = None
@@ -70,6 +304,13 @@ class SearchLaptopSpecsRequest(BaseModel):
     product_id: Optional[str] = None
     top_k: int = 3
 
+class ProductBatchRequest(BaseModel):
+    product_ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_PRODUCTS)
+    facets: List[str] = ["latest", "stats"]
+    days: int = Field(default=30, ge=1, le=365)
+    resolution: str = Field(default="day", pattern="^(day|week|month)$")
+    points: Optional[int] = Field(default=None, ge=2, le=MAX_HISTORY_POINTS)
+
 
 # ==================== Health Check ====================
 
@@ -88,21 +329,40 @@ async def root():
 async def health_check():
     """Detailed health check with database status"""
     try:
-        products = get_all_products()
+        products = await get_all_products()
         db_status = "connected"
         product_count = len(products)
     except:
         db_status = "disconnected"
         product_count = 0
     
+    circuit = get_circuit_metrics()
+    if circuit["state"] != "closed":
+        # The product count may come from the stale catalog cache
+        db_status = "unavailable"
+    
     return {
         "status": "healthy" if db_status == "connected" else "degraded",
         "database": db_status,
         "products_in_db": product_count,
+        "connection_pool": get_pool_metrics(),
+        "circuit_breaker": circuit,
+        "read_replica": get_replica_metrics(),
+        "catalog_cache": get_cache_metrics(),
+        "schema": app.state.schema_status,
         "timestamp": datetime.now().isoformat()
     }
 
 
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics():
+    """Database operation histograms in Prometheus text format"""
+    return PlainTextResponse(
+        get_query_metrics().render_prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 # ==================== Product Endpoints ====================
 
 @app.get("/api/v1/products", tags=["Products"])
@@ -114,29 +374,28 @@ async def list_products():
         List of products with current price information
     """
     try:
-        products = get_all_products()
+        catalog = await get_catalog()
         
         # Enrich with latest price data
         enriched_products = []
-        for product in products:
-            latest_price = get_latest_price(product['product_id'])
+        for product, latest_price in catalog:
             
             enriched_products.append({
-                **product,
-                "latest_price": latest_price['price'] if latest_price else None,
-                "currency": latest_price['currency'] if latest_price else "USD",
-                "availability": latest_price['availability'] if latest_price else "Unknown",
-                "last_updated": latest_price['scraped_at'] if latest_price else None
+                **product.to_dict(),
+                "latest_price": latest_price.price if latest_price else None,
+                "currency": latest_price.currency if latest_price else "USD",
+                "availability": latest_price.availability if latest_price else "Unknown",
+                "last_updated": latest_price.scraped_at if latest_price else None
             })
         
-        return {
+        return json_response({
             "success": True,
             "count": len(enriched_products),
             "products": enriched_products
-        }
+        })
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _server_error(e)
 
 
 @app.get("/api/v1/products/{product_id}", tags=["Products"])
@@ -151,74 +410,222 @@ async def get_product(product_id: str):
         Product details with latest price
     """
     try:
-        # Get all products and find the matching one
-        products = get_all_products()
-        product = next((p for p in products if p['product_id'] == product_id), None)
+        # Primary-key lookup in the cached product index
+        product = await get_product_by_id(product_id)
         
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        # Get latest price
-        latest_price = get_latest_price(product_id)
+        # Get latest price and statistics
+        latest_price, stats = await asyncio.gather(
+            get_latest_price(product_id),
+            get_price_statistics(product_id)
+        )
         
-        # Get statistics
-        stats = get_price_statistics(product_id)
-        
-        return {
+        return json_response({
             "success": True,
             "product": {
-                **product,
+                **product.to_dict(),
                 "latest_price": latest_price,
                 "price_statistics": stats
             }
-        }
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _server_error(e)
+
+
+@app.post("/api/v1/products/batch", tags=["Products"])
+async def get_products_batch(request: ProductBatchRequest = Body(...)):
+    """
+    Get details for many products in one round trip
+    
+    Each facet is computed for all requested products at once with
+    set-based queries, so a compare view or catalog grid needs a single
+    request instead of one per product.
+    
+    Args:
+        request: product_ids (up to MAX_BATCH_PRODUCTS), facets to include
+            ("latest", "stats", "trend", "history"), trend/history window in
+            days, history resolution ("day", "week", "month") and optionally
+            the number of history points to downsample to
+    
+    Returns:
+        Products in request order with the requested facets, plus the
+        product_ids that were not found
+    """
+    unknown_facets = sorted(set(request.facets) - set(BATCH_FACETS))
+    if unknown_facets:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown facets {unknown_facets}; choose from {list(BATCH_FACETS)}"
+        )
+    
+    try:
+        product_ids = list(dict.fromkeys(request.product_ids))
+        catalog = {product.product_id: (product, latest) for product, latest in await get_catalog(product_ids)}
+        found_ids = [product_id for product_id in product_ids if product_id in catalog]
+        
+        # One set-based query per requested facet, run concurrently
+        cutoff_date = datetime.now() - timedelta(days=request.days)
+        queries = {}
+        if found_ids and "stats" in request.facets:
+            queries["stats"] = get_price_statistics_batch(found_ids)
+        if found_ids and "trend" in request.facets:
+            queries["trend"] = get_price_trend_summaries(found_ids, cutoff_date)
+        if found_ids and "history" in request.facets:
+            queries["history"] = get_price_rollups(found_ids, cutoff_date, resolution=request.resolution)
+        facets = dict(zip(queries, await asyncio.gather(*queries.values())))
+        
+        if any(result is None for result in facets.values()):
+            raise HTTPException(status_code=500, detail="Error computing product facets")
+        
+        products = []
+        for product_id in found_ids:
+            product, latest = catalog[product_id]
+            entry = product.to_dict()
+            if "latest" in request.facets:
+                entry["latest_price"] = latest
+            if "stats" in facets:
+                entry["price_statistics"] = facets["stats"][product_id]
+            if "trend" in facets:
+                summary = facets["trend"][product_id]
+                entry["trend"] = {
+                    "period_days": request.days,
+                    "data_points": summary["data_points"],
+                    **_trend_analysis(summary)
+                } if summary["min_price"] is not None else None
+            if "history" in facets:
+                history = facets["history"][product_id]
+                entry["history"] = downsample_buckets(history, request.points) if request.points else history
+            products.append(entry)
+        
+        return json_response({
+            "success": True,
+            "count": len(products),
+            "products": products,
+            "not_found": [product_id for product_id in product_ids if product_id not in catalog]
+        })
         
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _server_error(e)
 
 
 # ==================== Price History Endpoints ====================
 
+def _encode_history_cursor(resolution: str, last_row) -> str:
+    """Build an opaque cursor pointing just past the last row of a page"""
+    if resolution == "raw":
+        position = {"r": resolution, "t": last_row.scraped_at.isoformat(), "id": last_row.id}
+    else:
+        position = {"r": resolution, "p": last_row['period_start']}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def _decode_history_cursor(cursor: str, resolution: str):
+    """
+    Decode a cursor from _encode_history_cursor
+    
+    Returns:
+        (scraped_at, id) for raw history, or the bucket start date for rollups
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed or for another resolution
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if position["r"] != resolution:
+            raise ValueError("resolution mismatch")
+        if resolution == "raw":
+            return datetime.fromisoformat(position["t"]), int(position["id"])
+        return date.fromisoformat(position["p"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/api/v1/products/{product_id}/price-history", tags=["Price History"])
 async def get_product_price_history(
     product_id: str,
-    limit: int = Query(default=100, ge=1, le=1000, description="Number of records to return")
+    limit: int = Query(default=100, ge=1, le=1000, description="Number of records to return"),
+    resolution: str = Query(default="raw", pattern=RESOLUTION_PATTERN, description="raw observations or day/week/month OHLC buckets"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page")
 ):
     """
-    Get price history for a product
+    Get price history for a product, newest first
+    
+    Pages are keyset-paginated: pass the returned next_cursor to get the
+    following (older) page. next_cursor is null on the last page.
     
     Args:
         product_id: Product identifier
         limit: Maximum number of records (1-1000)
+        resolution: "raw" for individual observations, or "day", "week",
+            "month" for OHLC buckets read from the daily rollup
+        cursor: Opaque cursor from a previous response
     
     Returns:
         List of historical price records
     """
     try:
-        history = get_price_history(product_id, limit)
+        before = _decode_history_cursor(cursor, resolution) if cursor else None
         
-        if not history:
+        # Fetch one extra row to learn whether another page exists
+        if resolution == "raw":
+            history = await get_price_history(product_id, limit + 1, before)
+        else:
+            history = await get_price_rollup(product_id, resolution=resolution, limit=limit + 1, before=before)
+        
+        if not history and not cursor:
             raise HTTPException(status_code=404, detail="No price history found for this product")
         
-        return {
+        has_more = len(history) > limit
+        history = history[:limit]
+        
+        return json_response({
             "success": True,
             "product_id": product_id,
+            "resolution": resolution,
             "count": len(history),
-            "history": history
-        }
+            "history": history,
+            "next_cursor": _encode_history_cursor(resolution, history[-1]) if has_more else None
+        })
         
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _server_error(e)
+
+
+def _trend_analysis(summary: dict) -> dict:
+    """Price change and direction over a trend summary's window"""
+    first_price = summary['first_price']
+    latest_price = summary['latest_price']
+    price_change = latest_price - first_price if first_price and latest_price else 0
+    price_change_percent = (price_change / first_price * 100) if first_price else 0
+    
+    return {
+        "first_price": first_price,
+        "latest_price": latest_price,
+        "min_price": summary['min_price'],
+        "max_price": summary['max_price'],
+        "avg_price": summary['avg_price'],
+        "price_change": round(price_change, 2),
+        "price_change_percent": round(price_change_percent, 2),
+        "trend_direction": "up" if price_change > 0 else "down" if price_change < 0 else "stable"
+    }
 
 
 @app.get("/api/v1/products/{product_id}/price-trend", tags=["Price History"])
 async def get_price_trend(
     product_id: str,
-    days: int = Query(default=30, ge=1, le=365, description="Number of days to analyze")
+    days: int = Query(default=30, ge=1, le=365, description="Number of days to analyze"),
+    resolution: str = Query(default="raw", pattern=RESOLUTION_PATTERN, description="raw observations or day/week/month OHLC buckets"),
+    points: int = Query(default=TREND_HISTORY_POINTS, ge=2, le=MAX_HISTORY_POINTS, description="Maximum history points, chosen by LTTB downsampling")
 ):
     """
     Get price trend analysis for a product
@@ -226,60 +633,56 @@ async def get_price_trend(
     Args:
         product_id: Product identifier
         days: Number of days to analyze (1-365)
+        resolution: "raw" to analyze individual observations, or "day",
+            "week", "month" to read from the daily rollup
+        points: Maximum number of history points; the whole window is
+            downsampled with LTTB so the chart keeps its shape
+    
+    Raw windows reaching past the price_history retention cutoff include
+    the Parquet archive; the daily rollup keeps archived days anyway.
     
     Returns:
         Price trend data with statistics
     """
     try:
-        # Get price history
-        history = get_price_history(product_id, limit=1000)
-        
-        if not history:
-            raise HTTPException(status_code=404, detail="No price history found")
-        
-        # Filter by date range
+        # Aggregate the window in SQL; fetch the whole window for the chart
         cutoff_date = datetime.now() - timedelta(days=days)
-        filtered_history = [
-            h for h in history 
-            if h['scraped_at'] and datetime.fromisoformat(h['scraped_at']) >= cutoff_date
-        ]
+        if resolution == "raw":
+            summary, window_history = await asyncio.gather(
+                get_long_range_trend_summary(product_id, cutoff_date),
+                get_long_range_price_window(product_id, cutoff_date)
+            )
+            window_history = downsample_observations(window_history, points)
+        else:
+            summary, window_history = await asyncio.gather(
+                get_rollup_trend_summary(product_id, cutoff_date),
+                get_price_rollup(product_id, cutoff_date, resolution=resolution)
+            )
+            window_history = downsample_buckets(window_history, points)
         
-        if not filtered_history:
-            raise HTTPException(status_code=404, detail=f"No data found for the last {days} days")
+        if summary is None:
+            raise HTTPException(status_code=500, detail="Error computing price trend")
         
-        # Calculate trend statistics
-        prices = [h['price'] for h in filtered_history if h['price']]
+        if not summary['data_points']:
+            raise HTTPException(status_code=404, detail=f"No data found for the last {days} days")
         
-        if not prices:
+        if summary['min_price'] is None:
             raise HTTPException(status_code=404, detail="No price data available")
         
-        first_price = filtered_history[-1]['price']
-        latest_price = filtered_history[0]['price']
-        price_change = latest_price - first_price if first_price and latest_price else 0
-        price_change_percent = (price_change / first_price * 100) if first_price else 0
-        
-        return {
+        return json_response({
             "success": True,
             "product_id": product_id,
             "period_days": days,
-            "data_points": len(filtered_history),
-            "trend": {
-                "first_price": first_price,
-                "latest_price": latest_price,
-                "min_price": min(prices),
-                "max_price": max(prices),
-                "avg_price": sum(prices) / len(prices),
-                "price_change": round(price_change, 2),
-                "price_change_percent": round(price_change_percent, 2),
-                "trend_direction": "up" if price_change > 0 else "down" if price_change < 0 else "stable"
-            },
-            "history": filtered_history[:50]  # Return max 50 data points for visualization
-        }
+            "resolution": resolution,
+            "data_points": summary['data_points'],
+            "trend": _trend_analysis(summary),
+            "history": window_history  # At most `points` rows, newest first
+        })
         
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _server_error(e)
 
 
 # ==================== Analytics Endpoints ====================
@@ -293,37 +696,34 @@ async def price_comparison():
         Price comparison data for all products
     """
     try:
-        products = get_all_products()
+        snapshots = await get_product_snapshots()
         
         comparison = []
-        for product in products:
-            latest = get_latest_price(product['product_id'])
-            stats = get_price_statistics(product['product_id'])
-            
-            if latest:
+        for snapshot in snapshots:
+            if snapshot.has_price_data:
                 comparison.append({
-                    "product_id": product['product_id'],
-                    "brand": product['brand'],
-                    "model": product['model'],
-                    "current_price": latest['price'],
-                    "availability": latest['availability'],
-                    "min_price": stats['min_price'] if stats else None,
-                    "max_price": stats['max_price'] if stats else None,
-                    "avg_price": stats['avg_price'] if stats else None,
-                    "last_updated": latest['scraped_at']
+                    "product_id": snapshot.product_id,
+                    "brand": snapshot.brand,
+                    "model": snapshot.model,
+                    "current_price": snapshot.price,
+                    "availability": snapshot.availability,
+                    "min_price": snapshot.min_price,
+                    "max_price": snapshot.max_price,
+                    "avg_price": snapshot.avg_price,
+                    "last_updated": snapshot.scraped_at
                 })
         
         # Sort by current price
         comparison.sort(key=lambda x: x['current_price'] if x['current_price'] else float('inf'))
         
-        return {
+        return json_response({
             "success": True,
             "count": len(comparison),
             "comparison": comparison
-        }
+        })
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _server_error(e)
 
 
 @app.get("/api/v1/analytics/availability", tags=["Analytics"])
@@ -335,42 +735,41 @@ async def availability_summary():
         Availability statistics
     """
     try:
-        products = get_all_products()
+        catalog = await get_catalog()
         
         availability_data = []
         in_stock_count = 0
         out_of_stock_count = 0
         
-        for product in products:
-            latest = get_latest_price(product['product_id'])
+        for product, latest in catalog:
             
             if latest:
                 availability_data.append({
-                    "product_id": product['product_id'],
-                    "brand": product['brand'],
-                    "model": product['model'],
-                    "availability": latest['availability'],
-                    "price": latest['price']
+                    "product_id": product.product_id,
+                    "brand": product.brand,
+                    "model": product.model,
+                    "availability": latest.availability,
+                    "price": latest.price
                 })
                 
-                if latest['availability'] == "In Stock":
+                if latest.availability == "In Stock":
                     in_stock_count += 1
-                elif latest['availability'] == "Out of Stock":
+                elif latest.availability == "Out of Stock":
                     out_of_stock_count += 1
         
-        return {
+        return json_response({
             "success": True,
             "summary": {
-                "total_products": len(products),
+                "total_products": len(catalog),
                 "in_stock": in_stock_count,
                 "out_of_stock": out_of_stock_count,
-                "unknown": len(products) - in_stock_count - out_of_stock_count
+                "unknown": len(catalog) - in_stock_count - out_of_stock_count
             },
             "details": availability_data
-        }
+        })
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _server_error(e)
 
 
 # ==================== Search & Filter Endpoints ====================
@@ -395,37 +794,36 @@ async def search_products(
         Filtered list of products
     """
     try:
-        products = get_all_products()
+        catalog = await get_catalog()
         results = []
         
-        for product in products:
+        for product, latest in catalog:
             # Apply brand filter
-            if brand and product['brand'].lower() != brand.lower():
+            if brand and product.brand.lower() != brand.lower():
                 continue
             
-            latest = get_latest_price(product['product_id'])
             if not latest:
                 continue
             
             # Apply price filters
-            if min_price and (not latest['price'] or latest['price'] < min_price):
+            if min_price and (not latest.price or latest.price < min_price):
                 continue
-            if max_price and (not latest['price'] or latest['price'] > max_price):
+            if max_price and (not latest.price or latest.price > max_price):
                 continue
             
             # Apply availability filter
-            if availability and latest['availability'] != availability:
+            if availability and latest.availability != availability:
                 continue
             
             results.append({
-                **product,
-                "current_price": latest['price'],
-                "currency": latest['currency'],
-                "availability": latest['availability'],
-                "last_updated": latest['scraped_at']
+                **product.to_dict(),
+                "current_price": latest.price,
+                "currency": latest.currency,
+                "availability": latest.availability,
+                "last_updated": latest.scraped_at
             })
         
-        return {
+        return json_response({
             "success": True,
             "count": len(results),
             "filters_applied": {
@@ -435,10 +833,10 @@ async def search_products(
                 "availability": availability
             },
             "results": results
-        }
+        })
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _server_error(e)
 
 
 # ==================== Agent Tools Endpoints ====================
@@ -464,12 +862,12 @@ async def get_tool_schemas():
     Returns:
         List of OpenAI function calling compatible tool schemas
     """
-    return {
+    return json_response({
         "success": True,
         "count": len(get_all_tool_schemas()),
         "schemas": get_all_tool_schemas(),
         "system_prompt": get_agent_system_prompt()
-    }
+    })
 
 
 @app.post("/api/v1/agent/get_laptop_prices", tags=["Agent Tools"])
@@ -479,7 +877,7 @@ async def agent_get_laptop_prices(request: GetLaptopPricesRequest = Body(...)):
 
     This endpoint is designed for Azure AI Foundry agent function calling.
     """
-    return tool_get_laptop_prices(request.brand, request.min_price, request.max_price, request.in_stock_only)
+    return json_response(await run_in_db_executor(tool_get_laptop_prices, request.brand, request.min_price, request.max_price, request.in_stock_only))
 
 
 @app.post("/api/v1/agent/get_laptop_details", tags=["Agent Tools"])
@@ -489,7 +887,7 @@ async def agent_get_laptop_details(request: GetLaptopDetailsRequest = Body(...))
 
     This endpoint is designed for Azure AI Foundry agent function calling.
     """
-    return tool_get_laptop_details(request.product_id)
+    return json_response(await run_in_db_executor(tool_get_laptop_details, request.product_id))
 
 
 @app.post("/api/v1/agent/get_price_trend", tags=["Agent Tools"])
@@ -499,7 +897,7 @@ async def agent_get_price_trend(request: GetPriceTrendRequest = Body(...)):
 
     This endpoint is designed for Azure AI Foundry agent function calling.
     """
-    return tool_get_price_trend(request.product_id, request.days)
+    return json_response(await run_in_db_executor(tool_get_price_trend, request.product_id, request.days, request.points))
 
 
 @app.post("/api/v1/agent/compare_laptop_prices", tags=["Agent Tools"])
@@ -509,7 +907,7 @@ async def agent_compare_laptop_prices(request: CompareLaptopPricesRequest = Body
 
     This endpoint is designed for Azure AI Foundry agent function calling.
     """
-    return tool_compare_laptop_prices(request.product_ids)
+    return json_response(await run_in_db_executor(tool_compare_laptop_prices, request.product_ids))
 
 
 @app.post("/api/v1/agent/check_availability", tags=["Agent Tools"])
@@ -519,7 +917,7 @@ async def agent_check_availability(request: CheckAvailabilityRequest = Body(...)
 
     This endpoint is designed for Azure AI Foundry agent function calling.
     """
-    return tool_check_availability(request.brand)
+    return json_response(await run_in_db_executor(tool_check_availability, request.brand))
 
 
 @app.post("/api/v1/agent/find_deals", tags=["Agent Tools"])
@@ -529,7 +927,7 @@ async def agent_find_deals(request: FindDealsRequest = Body(...)):
 
     This endpoint is designed for Azure AI Foundry agent function calling.
     """
-    return tool_find_deals(request.threshold_percent, request.brand)
+    return json_response(await run_in_db_executor(tool_find_deals, request.threshold_percent, request.brand))
 
 
 @app.post("/api/v1/agent/search_laptop_specs", tags=["Agent Tools"])
@@ -542,7 +940,7 @@ async def agent_search_laptop_specs(request: SearchLaptopSpecsRequest = Body(...
 
     This endpoint is designed for Azure AI Foundry agent function calling.
     """
-    return tool_search_laptop_specs(request.query, request.product_id, request.top_k)
+    return json_response(await run_in_threadpool(tool_search_laptop_specs, request.query, request.product_id, request.top_k))
 
 
 # ==================== Chat Endpoint ====================
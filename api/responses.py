@@ -0,0 +1,80 @@
+"""
+Fast JSON responses for the /api/v1 routes
+FastAPI runs every returned dict through jsonable_encoder, which walks and
+copies the whole payload before json.dumps walks it again. Endpoints that
+return json_response(...) skip that pass: orjson serializes dicts, lists,
+datetimes and the slotted record dataclasses natively in one go.
+
+orjson is optional; without it (or with API_FAST_JSON=false) json_response
+falls back to the default encoder and produces the same JSON.
+"""
+import os
+import sys
+import json
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from config import API_FAST_JSON
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _orjson_default(value):
+    """Serialize the types orjson does not handle natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def render_fast(content) -> bytes:
+    """Serialize content with orjson"""
+    return orjson.dumps(content, default=_orjson_default, option=_ORJSON_OPTIONS)
+
+
+def render_default(content) -> bytes:
+    """Serialize content the way FastAPI does for a returned dict"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered by orjson"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return render_fast(content)
+
+
+def fast_json_enabled() -> bool:
+    """Check whether json_response uses orjson"""
+    return API_FAST_JSON and orjson is not None
+
+
+def json_response(content, status_code: int = 200, headers: dict = None) -> Response:
+    """
+    Build a JSON response, bypassing jsonable_encoder when orjson is available
+
+    Args:
+        content: JSON-serializable payload (records, datetimes allowed)
+        status_code: HTTP status code
+        headers: Extra response headers
+
+    Returns:
+        Response: FastJSONResponse, or JSONResponse as a fallback
+    """
+    if fast_json_enabled():
+        return FastJSONResponse(content, status_code=status_code, headers=headers)
+    return JSONResponse(jsonable_encoder(content), status_code=status_code, headers=headers)
@@ -0,0 +1,189 @@
+"""
+Concurrency benchmark for the async database layer
+Drives the FastAPI app in-process (httpx ASGI transport, lifespan
+included) against the SQLite benchmark database with 1, 10 and 100
+concurrent clients, in two modes:
+
+- executor: the app as shipped; handlers await database calls on the
+  bounded database executor
+- blocking: the baseline; run_in_db_executor is replaced by a direct call,
+  so every database call runs on the event loop as it did before the
+  async data-access layer
+
+SQLite answers in microseconds where Azure SQL needs a network round
+trip, so --query-latency-ms can add a blocking delay to each statement to
+approximate one.
+
+Run with: python -m benchmarks.async_concurrency [--database data/benchmark.db]
+          [--requests 20] [--query-latency-ms 0] [--routes get_product,search]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from contextlib import ExitStack
+from unittest import mock
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.endpoints import (
+    DEFAULT_DATABASE, RESULTS_DIR, ROUTES, git_commit, prepare_database, build_samples, run_route
+)
+
+CONCURRENCY_LEVELS = [1, 10, 100]
+MODES = ["blocking", "executor"]
+DEFAULT_ROUTES = "get_product,price_history_raw,price_trend_raw,search,products_batch"
+
+
+async def run_inline(func, *args, **kwargs):
+    """Blocking baseline for run_in_db_executor: call func on the event loop thread"""
+    return func(*args, **kwargs)
+
+
+def patch_mode(stack: ExitStack, mode: str):
+    """Route the app's database calls for one benchmark mode"""
+    if mode == "blocking":
+        import api.main
+        from database import async_operations
+
+        stack.enter_context(mock.patch.object(async_operations, "run_in_db_executor", run_inline))
+        stack.enter_context(mock.patch.object(api.main, "run_in_db_executor", run_inline))
+
+
+def patch_query_latency(stack: ExitStack, latency: float):
+    """Add a blocking delay to every SQLite statement, standing in for a network round trip"""
+    if latency <= 0:
+        return
+    from database.backends.sqlite import SqliteCursor
+
+    execute, executemany = SqliteCursor.execute, SqliteCursor.executemany
+
+    def slow_execute(self, *args, **kwargs):
+        time.sleep(latency)
+        return execute(self, *args, **kwargs)
+
+    def slow_executemany(self, *args, **kwargs):
+        time.sleep(latency)
+        return executemany(self, *args, **kwargs)
+
+    stack.enter_context(mock.patch.object(SqliteCursor, "execute", slow_execute))
+    stack.enter_context(mock.patch.object(SqliteCursor, "executemany", slow_executemany))
+
+
+def summarize(mode: str, clients: int, routes: list, elapsed: float) -> dict:
+    """Combine per-route results of one mode and concurrency level (latencies of the slowest route)"""
+    requests = sum(route["requests"] for route in routes)
+    return {
+        "mode": mode,
+        "clients": clients,
+        "requests": requests,
+        "errors": sum(route["errors"] for route in routes),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(max(route["latency_ms"]["p50"] for route in routes), 3),
+        "p99_ms": round(max(route["latency_ms"]["p99"] for route in routes), 3),
+        "routes": routes
+    }
+
+
+async def run_benchmark(routes: list, samples: list, requests_per_client: int, warmup: int) -> list:
+    """Run every mode at every concurrency level against the in-process app"""
+    import httpx
+    from api.main import app
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for clients in CONCURRENCY_LEVELS:
+                for mode in MODES:
+                    with ExitStack() as stack:
+                        patch_mode(stack, mode)
+                        route_results = []
+                        start = time.perf_counter()
+                        for route in routes:
+                            if warmup:
+                                await run_route(client, route, samples, min(clients, warmup), warmup)
+                            route_results.append(
+                                await run_route(client, route, samples, clients, clients * requests_per_client)
+                            )
+                        elapsed = time.perf_counter() - start
+
+                    result = summarize(mode, clients, route_results, elapsed)
+                    results.append(result)
+                    print(
+                        f"{clients:>8} {mode:>10} {result['requests']:>9} {result['elapsed_s']:>10.2f} "
+                        f"{result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                        f"{result['errors']:>7}"
+                    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare blocking and executor database calls under concurrent load")
+    parser.add_argument("--database", default=DEFAULT_DATABASE, help="SQLite database file (created and seeded if empty)")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client per route")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per route before measuring")
+    parser.add_argument("--query-latency-ms", type=float, default=0.0, help="Blocking delay added to each statement")
+    parser.add_argument("--routes", default=DEFAULT_ROUTES, help="Comma-separated benchmarks.endpoints route names")
+    parser.add_argument("--seed-products", type=int, default=1000, help="Products to generate for an empty database")
+    parser.add_argument("--seed-days", type=int, default=90, help="Days of history to generate for an empty database")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/async-concurrency-<time>-<commit>.json)")
+    args = parser.parse_args()
+
+    # Must be set before config is imported by the database modules
+    os.environ["DB_CONNECTION_STRING"] = f"sqlite:///{args.database}"
+
+    wanted = set(args.routes.split(","))
+    routes = [route for route in ROUTES if route[0] in wanted]
+    if not routes:
+        parser.error(f"No known routes in --routes {args.routes}")
+
+    from config import DB_EXECUTOR_WORKERS
+
+    dataset = prepare_database(args.seed_products, args.seed_days)
+    samples = build_samples(max(CONCURRENCY_LEVELS) * args.requests, seed=42)
+    logging.getLogger().setLevel(logging.ERROR)
+    for name in ("api.main", "database.operations", "database.connection"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+
+    print("=" * 90)
+    print(
+        f"ASYNC DB CONCURRENCY BENCHMARK: {len(routes)} routes, {args.requests} requests/client/route, "
+        f"query latency {args.query_latency_ms}ms, {DB_EXECUTOR_WORKERS} DB workers"
+    )
+    print("=" * 90)
+    print(f"{'clients':>8} {'mode':>10} {'requests':>9} {'elapsed s':>10} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+
+    with ExitStack() as stack:
+        patch_query_latency(stack, args.query_latency_ms / 1000)
+        results = asyncio.run(run_benchmark(routes, samples, args.requests, args.warmup))
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"async-concurrency-{datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "benchmark": "async_concurrency",
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "database": {"backend": "sqlite", **dataset},
+            "config": {
+                "requests_per_client": args.requests,
+                "warmup": args.warmup,
+                "query_latency_ms": args.query_latency_ms,
+                "db_executor_workers": DB_EXECUTOR_WORKERS,
+                "routes": [route[0] for route in routes]
+            },
+            "results": results
+        }, f, indent=2)
+    print(f"\n✓ Results written to {output}")
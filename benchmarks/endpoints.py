@@ -0,0 +1,299 @@
+"""
+Endpoint load test and latency benchmark
+Starts the FastAPI app in-process (httpx ASGI transport, lifespan included)
+against a local SQLite database, seeds it with synthetic data if it is
+empty, and drives every /api/v1 route, including the agent tool POSTs, with
+a configurable number of concurrent clients.
+
+Per route it reports p50/p95/p99 latency, throughput, errors and the
+database operations/queries per request (read from the Server-Timing
+header the API adds). Results are written as JSON so runs on different
+commits can be compared with --baseline.
+
+The RAG spec search needs Azure AI Search and is only included with
+--include-rag; /api/v1/chat needs the Foundry agent and is not covered.
+
+Run with: python -m benchmarks.endpoints [--database data/benchmark.db]
+          [--concurrency 10] [--requests 200] [--seed-products 1000]
+          [--baseline benchmarks/results/previous.json]
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import subprocess
+from collections import Counter
+from datetime import datetime
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+DEFAULT_DATABASE = os.path.join(project_root, "data", "benchmark.db")
+RESULTS_DIR = os.path.join(project_root, "benchmarks", "results")
+
+# (name, method, path, body builder); paths and bodies are filled from a
+# sample of the catalog so requests spread over many products
+ROUTES = [
+    ("list_products", "GET", "/api/v1/products", None),
+    ("get_product", "GET", "/api/v1/products/{product_id}", None),
+    ("price_history_raw", "GET", "/api/v1/products/{product_id}/price-history?limit=100", None),
+    ("price_history_day", "GET", "/api/v1/products/{product_id}/price-history?resolution=day&limit=100", None),
+    ("price_trend_raw", "GET", "/api/v1/products/{product_id}/price-trend?days=30", None),
+    ("price_trend_week", "GET", "/api/v1/products/{product_id}/price-trend?days=365&resolution=week", None),
+    ("price_comparison", "GET", "/api/v1/analytics/price-comparison", None),
+    ("availability", "GET", "/api/v1/analytics/availability", None),
+    ("search", "GET", "/api/v1/search?brand={brand}&max_price=2000", None),
+    ("agent_schemas", "GET", "/api/v1/agent/schemas", None),
+    ("products_batch", "POST", "/api/v1/products/batch",
+     lambda s: {"product_ids": s["product_ids"], "facets": ["latest", "stats", "trend", "history"]}),
+    ("agent_get_laptop_prices", "POST", "/api/v1/agent/get_laptop_prices",
+     lambda s: {"brand": s["brand"], "in_stock_only": True}),
+    ("agent_get_laptop_details", "POST", "/api/v1/agent/get_laptop_details",
+     lambda s: {"product_id": s["product_id"]}),
+    ("agent_get_price_trend", "POST", "/api/v1/agent/get_price_trend",
+     lambda s: {"product_id": s["product_id"], "days": 30}),
+    ("agent_compare_laptop_prices", "POST", "/api/v1/agent/compare_laptop_prices",
+     lambda s: {"product_ids": s["product_ids"]}),
+    ("agent_check_availability", "POST", "/api/v1/agent/check_availability",
+     lambda s: {"brand": s["brand"]}),
+    ("agent_find_deals", "POST", "/api/v1/agent/find_deals",
+     lambda s: {"threshold_percent": 5.0}),
+]
+
+RAG_ROUTE = ("agent_search_laptop_specs", "POST", "/api/v1/agent/search_laptop_specs",
+             lambda s: {"query": "battery life and display", "product_id": s["product_id"], "top_k": 3})
+
+_SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) operations, (\d+) queries"')
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Linear-interpolated percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, or "unknown" outside git"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def prepare_database(seed_products: int, seed_days: int) -> dict:
+    """
+    Migrate the benchmark database and seed it if it has no products
+
+    Returns:
+        dict: Dataset size (products, price_history rows, observations)
+    """
+    from database.connection import db_connection
+    from database.migrations import apply_migrations
+    from benchmarks.generate_data import generate
+
+    apply_migrations()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM products")
+        if cursor.fetchone()[0] == 0:
+            print(f"Seeding {seed_products} products x {seed_days} days of history...")
+            generate(products=seed_products, days=seed_days)
+
+        cursor.execute("SELECT (SELECT COUNT(*) FROM products), COUNT(*), SUM(observation_count) FROM price_history")
+        products, rows, observations = cursor.fetchone()
+    return {"products": products, "price_history_rows": rows, "observations": observations or 0}
+
+
+def build_samples(count: int, seed: int) -> list:
+    """Pick random products (with brand and a comparison set) to parameterize requests"""
+    from database.operations import get_all_products
+
+    products = get_all_products()
+    if not products:
+        raise RuntimeError("Benchmark database has no products")
+
+    rng = random.Random(seed)
+    ids = [p.product_id for p in products]
+    samples = []
+    for _ in range(count):
+        product = rng.choice(products)
+        samples.append({
+            "product_id": product.product_id,
+            "brand": product.brand,
+            "product_ids": rng.sample(ids, min(4, len(ids)))
+        })
+    return samples
+
+
+async def run_route(client, route: tuple, samples: list, concurrency: int, requests: int) -> dict:
+    """
+    Issue `requests` calls to one route from `concurrency` concurrent clients
+
+    Returns:
+        dict: Latency percentiles (ms), throughput, status counts and
+              average database work per request
+    """
+    name, method, path, body = route
+    latencies, statuses = [], Counter()
+    db_ms = db_operations = db_queries = 0.0
+    pending = iter(range(requests))
+
+    async def client_loop():
+        nonlocal db_ms, db_operations, db_queries
+        for i in pending:
+            sample = samples[i % len(samples)]
+            start = time.perf_counter()
+            response = await client.request(
+                method, path.format(**sample), json=body(sample) if body else None
+            )
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+            timing = _SERVER_TIMING.search(response.headers.get("server-timing", ""))
+            if timing:
+                db_ms += float(timing.group(1))
+                db_operations += int(timing.group(2))
+                db_queries += int(timing.group(3))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "route": name,
+        "method": method,
+        "path": path,
+        "requests": requests,
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": {
+            "mean": round(sum(latencies) * 1000 / len(latencies), 3),
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3)
+        },
+        "db_per_request": {
+            "operations": round(db_operations / requests, 2),
+            "queries": round(db_queries / requests, 2),
+            "time_ms": round(db_ms / requests, 3)
+        }
+    }
+
+
+async def run_benchmark(routes: list, samples: list, concurrency: int, requests: int, warmup: int) -> list:
+    """Run every route in turn against the in-process app"""
+    import httpx
+    from api.main import app
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for route in routes:
+                if warmup:
+                    await run_route(client, route, samples, min(concurrency, warmup), warmup)
+                result = await run_route(client, route, samples, concurrency, requests)
+                results.append(result)
+                latency = result["latency_ms"]
+                print(
+                    f"{result['route']:<30} {latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f} "
+                    f"{result['throughput_rps']:>9.1f} {result['db_per_request']['queries']:>8.2f} {result['errors']:>7}"
+                )
+    return results
+
+
+def compare_with_baseline(results: list, baseline_path: str, tolerance: float = 0.10):
+    """Print per-route p95 changes against an earlier results file"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["route"]: r for r in json.load(f)["routes"]}
+
+    print(f"\nCompared with {os.path.basename(baseline_path)} (p95, flagged above +{tolerance:.0%}):")
+    for result in results:
+        previous = baseline.get(result["route"])
+        if previous is None:
+            continue
+        before, after = previous["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        change = (after - before) / before if before else 0.0
+        flag = "  REGRESSION" if change > tolerance else ""
+        print(f"  {result['route']:<30} {before:>9.2f} -> {after:>9.2f} ms ({change:+.1%}){flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the API routes in-process")
+    parser.add_argument("--database", default=DEFAULT_DATABASE, help="SQLite database file (created and seeded if empty)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients per route")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per route before measuring")
+    parser.add_argument("--seed-products", type=int, default=1000, help="Products to generate for an empty database")
+    parser.add_argument("--seed-days", type=int, default=90, help="Days of history to generate for an empty database")
+    parser.add_argument("--routes", help="Comma-separated route names to run (default: all)")
+    parser.add_argument("--include-rag", action="store_true", help="Also call the Azure AI Search spec tool")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/endpoints-<time>-<commit>.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare p95 latency against")
+    parser.add_argument("--verbose", action="store_true", help="Keep INFO/WARNING logs from the API")
+    args = parser.parse_args()
+
+    # Must be set before config is imported by the database modules
+    os.environ["DB_CONNECTION_STRING"] = f"sqlite:///{args.database}"
+
+    routes = ROUTES + ([RAG_ROUTE] if args.include_rag else [])
+    if args.routes:
+        wanted = set(args.routes.split(","))
+        routes = [route for route in routes if route[0] in wanted]
+
+    dataset = prepare_database(args.seed_products, args.seed_days)
+    samples = build_samples(max(args.requests, 1), seed=42)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.ERROR)
+        for name in ("api.main", "database.operations", "database.connection"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+    print("=" * 90)
+    print(
+        f"ENDPOINT BENCHMARK: {dataset['products']} products, {dataset['price_history_rows']:,} history rows, "
+        f"concurrency {args.concurrency}, {args.requests} requests/route"
+    )
+    print("=" * 90)
+    print(f"{'route':<30} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'queries':>8} {'errors':>7}")
+
+    results = asyncio.run(run_benchmark(routes, samples, args.concurrency, args.requests, args.warmup))
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"endpoints-{datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "benchmark": "endpoints",
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "database": {"backend": "sqlite", **dataset},
+            "config": {
+                "concurrency": args.concurrency,
+                "requests_per_route": args.requests,
+                "warmup": args.warmup
+            },
+            "routes": results
+        }, f, indent=2)
+    print(f"\n✓ Results written to {output}")
+
+    if args.baseline:
+        compare_with_baseline(results, args.baseline)
@@ -0,0 +1,255 @@
+"""
+Synthetic price-history generator for scale testing
+Populates products and price_history with a configurable catalog so every
+API endpoint and agent tool can be measured on production-like volumes
+(e.g. 10,000 products x 365 days x 3 scrapes a day is ~11M observations).
+
+Prices follow a mean-reverting random walk that moves at most once a day,
+with promotions (discount plus promo text) and stock-out periods, so the
+data has the same shape as real scrapes: long runs of identical
+observations, occasional jumps and missing availability.
+
+Rows are written straight to price_history with executemany in large
+batches (fast_executemany on SQL Server), already run-length compressed
+unless --no-compress is given; price_daily and current_prices are rebuilt
+once at the end.
+
+Run with: python -m benchmarks.generate_data [--products 1000] [--days 365]
+          [--scrapes-per-day 3] [--volatility 0.02] [--stockout-rate 0.02]
+          [--promo-rate 0.05] [--seed 42] [--replace]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from database.backends import backend
+from database.connection import db_connection
+from database.operations import backfill_price_daily, rebuild_current_prices
+
+PRODUCT_ID_PREFIX = "SYN-"
+BATCH_SIZE = 50000
+
+BRANDS = {
+    "HP": ["ProBook", "EliteBook", "Pavilion", "Envy", "Spectre", "OmniBook"],
+    "Dell": ["Latitude", "Inspiron", "XPS", "Vostro", "Precision"],
+    "Lenovo": ["ThinkPad", "IdeaPad", "Yoga", "Legion", "ThinkBook"],
+    "Apple": ["MacBook Air", "MacBook Pro"],
+    "ASUS": ["ZenBook", "VivoBook", "ROG Zephyrus", "ExpertBook"],
+    "Acer": ["Swift", "Aspire", "Nitro", "TravelMate"],
+    "Microsoft": ["Surface Laptop", "Surface Pro"],
+    "MSI": ["Prestige", "Modern", "Stealth"]
+}
+
+_INSERT_HISTORY_SQL = """
+    INSERT INTO price_history
+    (product_id, price, currency, availability, promo_text, scraped_at, last_seen_at, observation_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def generate_products(count: int, rng: random.Random) -> list:
+    """
+    Build synthetic catalog rows
+
+    Returns:
+        list: (product_id, brand, model, product_url, base_price) tuples
+    """
+    brands = list(BRANDS)
+    products = []
+    for i in range(count):
+        brand = brands[i % len(brands)]
+        family = rng.choice(BRANDS[brand])
+        model = f"{family} {rng.choice(['13', '14', '15', '16', '17'])} G{rng.randint(1, 12)} #{i:06d}"
+        product_id = f"{PRODUCT_ID_PREFIX}{brand.upper()}-{i:06d}"
+        product_url = f"https://example.com/{brand.lower()}/{product_id.lower()}"
+        base_price = round(rng.lognormvariate(7.0, 0.45), 2)   # median ~$1100
+        products.append((product_id, brand, model, product_url, base_price))
+    return products
+
+
+def generate_observations(product_id: str, base_price: float, start: datetime, days: int,
+                          scrapes_per_day: int, volatility: float, stockout_rate: float,
+                          promo_rate: float, rng: random.Random):
+    """
+    Yield one product's observations in time order
+
+    Yields:
+        tuple: (product_id, price, currency, availability, promo_text, scraped_at)
+    """
+    list_price = base_price
+    promo_days, promo_discount = 0, 0.0
+    stockout_days = 0
+    interval = timedelta(days=1) / scrapes_per_day
+    jitter = int(min(300, interval.total_seconds() / 2))
+
+    for day in range(days):
+        # Mean-reverting daily move keeps prices near the base over long histories
+        drift = 0.05 * (base_price - list_price) / base_price
+        list_price = max(base_price * 0.4, list_price * (1 + drift + rng.gauss(0, volatility)))
+
+        if promo_days == 0 and rng.random() < promo_rate:
+            promo_days, promo_discount = rng.randint(1, 7), rng.choice([0.05, 0.1, 0.15, 0.2, 0.25])
+        if stockout_days == 0 and rng.random() < stockout_rate:
+            stockout_days = rng.randint(1, 14)
+
+        price = round(list_price * (1 - promo_discount) if promo_days else list_price, 2)
+        promo = f"Save ${round(list_price - price):,} - limited time" if promo_days else None
+        availability = "Out of Stock" if stockout_days else "In Stock"
+
+        day_start = start + timedelta(days=day)
+        for scrape in range(scrapes_per_day):
+            scraped_at = day_start + interval * scrape + timedelta(seconds=rng.randint(0, jitter))
+            # Failed scrapes occasionally miss the price
+            observed_price = None if rng.random() < 0.002 else price
+            yield (product_id, observed_price, "USD", availability, promo, scraped_at)
+
+        promo_days = max(0, promo_days - 1)
+        stockout_days = max(0, stockout_days - 1)
+
+
+def compress_runs(observations):
+    """
+    Merge identical consecutive same-day observations into runs
+
+    Mirrors the ingest path's run-length compression.
+
+    Yields:
+        tuple: price_history row parameters including last_seen_at and observation_count
+    """
+    run = None
+    for product_id, price, currency, availability, promo, scraped_at in observations:
+        if (run is not None and run[1:5] == [price, currency, availability, promo]
+                and run[5].date() == scraped_at.date()):
+            run[6] = scraped_at
+            run[7] += 1
+            continue
+        if run is not None:
+            yield tuple(run)
+        run = [product_id, price, currency, availability, promo, scraped_at, scraped_at, 1]
+    if run is not None:
+        yield tuple(run)
+
+
+def delete_synthetic_data():
+    """Remove previously generated products and everything that references them"""
+    pattern = f"{PRODUCT_ID_PREFIX}%"
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        for table in ("current_prices", "price_daily", "price_history", "products"):
+            cursor.execute(f"DELETE FROM {table} WHERE product_id LIKE ?", (pattern,))
+        conn.commit()
+
+
+def generate(products: int = 1000, days: int = 365, scrapes_per_day: int = 3,
+             volatility: float = 0.02, stockout_rate: float = 0.02, promo_rate: float = 0.05,
+             seed: int = 42, compress: bool = True, replace: bool = False,
+             batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Populate the database with synthetic products and price history
+
+    Args:
+        products: Number of products to create
+        days: Days of history per product, ending now
+        scrapes_per_day: Observations per product per day
+        volatility: Standard deviation of the daily relative price move
+        stockout_rate: Daily probability that an in-stock product sells out
+        promo_rate: Daily probability that a promotion starts
+        seed: Random seed, so datasets are reproducible
+        compress: Store run-length compressed rows like the ingest path
+        replace: Delete previously generated data first
+        batch_size: Rows per executemany call and transaction
+
+    Returns:
+        dict: products, observations, rows written and timings
+    """
+    rng = random.Random(seed)
+    start = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=days)
+    catalog = generate_products(products, rng)
+    summary = {"backend": backend.NAME, "products": products, "observations": 0, "rows": 0}
+
+    began = time.perf_counter()
+    if replace:
+        delete_synthetic_data()
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.fast_executemany = True
+
+        cursor.executemany(backend.SQL["merge_product"], [row[:4] for row in catalog])
+        conn.commit()
+
+        batch = []
+        for product_id, _, _, _, base_price in catalog:
+            observations = generate_observations(
+                product_id, base_price, start, days, scrapes_per_day,
+                volatility, stockout_rate, promo_rate, rng
+            )
+            if compress:
+                rows = compress_runs(observations)
+            else:
+                rows = ((*obs, obs[5], 1) for obs in observations)
+
+            for row in rows:
+                batch.append(row)
+                summary["observations"] += row[7]
+                if len(batch) >= batch_size:
+                    cursor.executemany(_INSERT_HISTORY_SQL, batch)
+                    conn.commit()
+                    summary["rows"] += len(batch)
+                    batch = []
+
+        if batch:
+            cursor.executemany(_INSERT_HISTORY_SQL, batch)
+            conn.commit()
+            summary["rows"] += len(batch)
+
+    summary["load_s"] = round(time.perf_counter() - began, 2)
+
+    began = time.perf_counter()
+    if backfill_price_daily(start.date(), datetime.now().date()) < 0 or rebuild_current_prices() < 0:
+        raise RuntimeError("Rebuilding price_daily/current_prices failed")
+    summary["rollup_s"] = round(time.perf_counter() - began, 2)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic products and price history")
+    parser.add_argument("--products", type=int, default=1000, help="Number of products")
+    parser.add_argument("--days", type=int, default=365, help="Days of history per product")
+    parser.add_argument("--scrapes-per-day", type=int, default=3, help="Observations per product per day")
+    parser.add_argument("--volatility", type=float, default=0.02, help="Std. dev. of the daily relative price move")
+    parser.add_argument("--stockout-rate", type=float, default=0.02, help="Daily probability of a stock-out starting")
+    parser.add_argument("--promo-rate", type=float, default=0.05, help="Daily probability of a promotion starting")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--no-compress", action="store_true", help="Store one row per observation")
+    parser.add_argument("--replace", action="store_true", help="Delete previously generated data first")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per insert batch")
+    args = parser.parse_args()
+
+    print(f"Generating {args.products} products x {args.days} days x {args.scrapes_per_day} scrapes/day...")
+    result = generate(
+        products=args.products,
+        days=args.days,
+        scrapes_per_day=args.scrapes_per_day,
+        volatility=args.volatility,
+        stockout_rate=args.stockout_rate,
+        promo_rate=args.promo_rate,
+        seed=args.seed,
+        compress=not args.no_compress,
+        replace=args.replace,
+        batch_size=args.batch_size
+    )
+    rate = result["rows"] / result["load_s"] if result["load_s"] else 0
+    print(
+        f"✓ {result['products']} products, {result['observations']:,} observations in "
+        f"{result['rows']:,} price_history rows ({result['backend']}); "
+        f"load {result['load_s']}s ({rate:,.0f} rows/s), rollups {result['rollup_s']}s"
+    )
@@ -0,0 +1,157 @@
+"""
+Response serialization and compression benchmark
+Captures the payloads of the largest read endpoints (raw price history,
+price comparison, search) from the in-process app, then measures per
+payload:
+
+- serialization time with FastAPI's default path (jsonable_encoder +
+  json.dumps) and with orjson (api.responses.render_fast)
+- bytes on the wire uncompressed, gzip and brotli (if installed), plus the
+  time spent compressing
+
+Uses the same SQLite benchmark database as benchmarks.endpoints and writes
+a JSON results file next to its results.
+
+Run with: python -m benchmarks.serialization [--database data/benchmark.db]
+          [--repeat 50] [--history-limit 1000]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import statistics
+from datetime import datetime
+from unittest import mock
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.endpoints import DEFAULT_DATABASE, RESULTS_DIR, git_commit, prepare_database, build_samples
+
+# (name, path); {product_id} is filled from the benchmark sample
+PAYLOADS = [
+    ("price_history_raw", "/api/v1/products/{product_id}/price-history?limit={history_limit}"),
+    ("price_comparison", "/api/v1/analytics/price-comparison"),
+    ("search", "/api/v1/search"),
+]
+
+
+def time_ms(func, arg, repeat: int) -> float:
+    """Median wall time of func(arg) in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        func(arg)
+        timings.append((time.perf_counter() - began) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+async def capture_payloads(paths: list) -> dict:
+    """
+    Request each path from the in-process app and keep the payload passed to json_response
+
+    Returns:
+        dict: name -> payload (the dict the endpoint returned, before serialization)
+    """
+    import httpx
+    import api.main
+
+    payloads = {}
+    async with api.main.app.router.lifespan_context(api.main.app):
+        transport = httpx.ASGITransport(app=api.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for name, path in paths:
+                with mock.patch.object(api.main, "json_response", wraps=api.main.json_response) as spy:
+                    response = await client.get(path)
+                if response.status_code != 200 or not spy.called:
+                    raise RuntimeError(f"{path} returned {response.status_code}")
+                payloads[name] = spy.call_args.args[0]
+    return payloads
+
+
+def measure(name: str, payload, repeat: int) -> dict:
+    """Serialization time and encoded sizes for one payload"""
+    from api.responses import render_default, render_fast, orjson
+    from api.compression import compress, supported_encodings
+
+    body = render_default(payload)
+    result = {
+        "payload": name,
+        "default_ms": time_ms(render_default, payload, repeat),
+        "orjson_ms": None,
+        "identity_bytes": len(body),
+        "encodings": {}
+    }
+    if orjson is not None:
+        fast_body = render_fast(payload)
+        if json.loads(fast_body) != json.loads(body):
+            raise RuntimeError(f"{name}: orjson output differs from the default encoder")
+        result["orjson_ms"] = time_ms(render_fast, payload, repeat)
+
+    for encoding in supported_encodings():
+        result["encodings"][encoding] = {
+            "bytes": len(compress(body, encoding)),
+            "compress_ms": time_ms(lambda b: compress(b, encoding), body, repeat)
+        }
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure JSON serialization time and compressed response sizes")
+    parser.add_argument("--database", default=DEFAULT_DATABASE, help="SQLite database file (created and seeded if empty)")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed repetitions per measurement")
+    parser.add_argument("--history-limit", type=int, default=1000, help="Rows in the price-history payload")
+    parser.add_argument("--seed-products", type=int, default=1000, help="Products to generate for an empty database")
+    parser.add_argument("--seed-days", type=int, default=90, help="Days of history to generate for an empty database")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/serialization-<time>-<commit>.json)")
+    args = parser.parse_args()
+
+    # Must be set before config is imported by the database modules
+    os.environ["DB_CONNECTION_STRING"] = f"sqlite:///{args.database}"
+
+    dataset = prepare_database(args.seed_products, args.seed_days)
+    sample = build_samples(1, seed=42)[0]
+    logging.getLogger().setLevel(logging.ERROR)
+
+    paths = [
+        (name, path.format(product_id=sample["product_id"], history_limit=args.history_limit))
+        for name, path in PAYLOADS
+    ]
+    payloads = asyncio.run(capture_payloads(paths))
+
+    print("=" * 90)
+    print(f"SERIALIZATION BENCHMARK: {dataset['products']} products, median of {args.repeat} runs")
+    print("=" * 90)
+    print(f"{'payload':<20} {'default ms':>11} {'orjson ms':>10} {'speedup':>8} {'bytes':>10} {'gzip':>9} {'br':>9}")
+
+    results = []
+    for name, payload in payloads.items():
+        result = measure(name, payload, args.repeat)
+        results.append(result)
+        speedup = f"{result['default_ms'] / result['orjson_ms']:.1f}x" if result["orjson_ms"] else "-"
+        sizes = {enc: f"{data['bytes']:,}" for enc, data in result["encodings"].items()}
+        print(
+            f"{name:<20} {result['default_ms']:>11.3f} {result['orjson_ms'] or 0:>10.3f} {speedup:>8} "
+            f"{result['identity_bytes']:>10,} {sizes.get('gzip', '-'):>9} {sizes.get('br', '-'):>9}"
+        )
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"serialization-{datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "benchmark": "serialization",
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "database": {"backend": "sqlite", **dataset},
+            "config": {"repeat": args.repeat, "history_limit": args.history_limit},
+            "payloads": results
+        }, f, indent=2)
+    print(f"\n✓ Results written to {output}")
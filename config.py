@@ -78,8 +78,67 @@ PRODUCTS = {
 # Database configuration
 # Add your Azure SQL connection string to .env file
 # Format: Server=tcp:your-server.database.windows.net,1433;Initial Catalog=laptop-insights-db;User ID=sqladmin;Password=your_password;Encrypt=True;
+# For local runs and benchmarks use an embedded SQLite database instead: sqlite:///data/laptop_insights.db
 DB_CONNECTION_STRING = os.getenv("DB_CONNECTION_STRING", "")
 
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # Max open connections per process
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Max connection lifetime in seconds
+DB_POOL_IDLE_TIMEOUT = int(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))  # Close connections idle this long
+DB_POOL_VALIDATE_AFTER = float(os.getenv("DB_POOL_VALIDATE_AFTER", "30"))  # Ping connections idle this long on checkout
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_SIZE)))  # Threads running DB calls for async endpoints
+
+# Optional read replica for read-only queries (e.g. the primary string with ApplicationIntent=ReadOnly)
+DB_READ_REPLICA_CONNECTION_STRING = os.getenv("DB_READ_REPLICA_CONNECTION_STRING", "")
+DB_READ_REPLICA_POOL_SIZE = int(os.getenv("DB_READ_REPLICA_POOL_SIZE", str(DB_POOL_SIZE)))
+DB_REPLICA_MAX_STALENESS = float(os.getenv("DB_REPLICA_MAX_STALENESS", "30"))  # Seconds behind the primary before reads fall back to it
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))  # Seconds between staleness checks
+
+# Fault handling: login timeout, retries of transient connect errors, circuit breaker
+DB_LOGIN_TIMEOUT = int(os.getenv("DB_LOGIN_TIMEOUT", "15"))  # Seconds before a connect attempt gives up (SQLite: lock wait)
+DB_CONNECT_RETRIES = int(os.getenv("DB_CONNECT_RETRIES", "2"))  # Extra attempts for transient connect errors
+DB_RETRY_BACKOFF = float(os.getenv("DB_RETRY_BACKOFF", "0.5"))  # Base backoff in seconds (full jitter, doubled per attempt)
+DB_RETRY_BACKOFF_MAX = float(os.getenv("DB_RETRY_BACKOFF_MAX", "4"))  # Backoff cap in seconds
+DB_BREAKER_FAILURE_THRESHOLD = int(os.getenv("DB_BREAKER_FAILURE_THRESHOLD", "5"))  # Consecutive transient failures that open the circuit
+DB_BREAKER_RESET_TIMEOUT = float(os.getenv("DB_BREAKER_RESET_TIMEOUT", "30"))  # Seconds the circuit stays open before a trial call
+
+# Query instrumentation: per-request summaries are logged when a request spends
+# this long in the database, or calls one operation this many times (N+1)
+DB_SLOW_REQUEST_MS = float(os.getenv("DB_SLOW_REQUEST_MS", "500"))
+DB_REPEATED_OPERATION_THRESHOLD = int(os.getenv("DB_REPEATED_OPERATION_THRESHOLD", "5"))
+
+# Apply pending schema migrations when the API starts (otherwise only checked)
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "false").lower() == "true"
+
+# In-process catalog/latest-price cache: seconds between data-version probes (0 disables)
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))
+# Seconds to wait before re-probing after a failed data-version probe
+CATALOG_CACHE_PROBE_BACKOFF = float(os.getenv("CATALOG_CACHE_PROBE_BACKOFF", "5"))
+# Serve the last good catalog while the database circuit is open
+CATALOG_CACHE_SERVE_STALE = os.getenv("CATALOG_CACHE_SERVE_STALE", "true").lower() == "true"
+
+# HTTP caching of /api/v1 GET responses: ETags follow the data version, so clients
+# revalidate cheaply. max-age lets them skip revalidation for that many seconds (0 = always revalidate)
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+
+# API responses: /api/v1 payloads are serialized with orjson when it is installed,
+# and bodies of at least API_COMPRESSION_MIN_SIZE bytes are compressed
+# (brotli when the Brotli package is installed and accepted, otherwise gzip)
+API_FAST_JSON = os.getenv("API_FAST_JSON", "true").lower() == "true"
+API_COMPRESSION_ENABLED = os.getenv("API_COMPRESSION_ENABLED", "true").lower() == "true"
+API_COMPRESSION_MIN_SIZE = int(os.getenv("API_COMPRESSION_MIN_SIZE", "1024"))
+API_GZIP_LEVEL = int(os.getenv("API_GZIP_LEVEL", "6"))
+API_BROTLI_QUALITY = int(os.getenv("API_BROTLI_QUALITY", "4"))
+
+# price_history retention: older rows are moved to Parquet by python -m database.archive
+PRICE_HISTORY_RETENTION_DAYS = int(os.getenv("PRICE_HISTORY_RETENTION_DAYS", "400"))
+PRICE_ARCHIVE_DIR = os.getenv("PRICE_ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive", "price_history"))
+
+# Extend the latest price_history row instead of inserting an identical observation
+PRICE_HISTORY_COMPRESSION = os.getenv("PRICE_HISTORY_COMPRESSION", "true").lower() == "true"
+
 # Scraping settings
 HEADLESS = True  # Set to False for debugging
 TIMEOUT = 90000  # 90 seconds
@@ -0,0 +1,581 @@
+"""
+Parquet archive for old price_history rows
+Run with: python -m database.archive [--retention-days N] [--archive-dir DIR] [--dry-run]
+
+Rows older than the retention window are exported to one Parquet file per
+month (hive layout: <archive_dir>/month=YYYY-MM/part-0.parquet), verified
+against the database and only then deleted from price_history. price_daily
+and current_prices are left untouched, so dashboards and the lifetime price
+statistics (which read price_daily) keep covering archived days while the
+OLTP table only holds recent raw observations. Raw trend windows reaching
+archived days read the archive through get_long_range_trend_summary() and
+get_long_range_price_window().
+
+A watermark file (_archived_until, ignored by the Parquet reader) records
+the day before which every row is in the archive. Long-range reads take
+rows before it from the archive and rows from it on from price_history,
+whatever retention the archive ran with and even if a delete stopped
+partway.
+
+Run-length compressed rows never span midnight, so whole days older than
+the cutoff are immutable and safe to move.
+"""
+import os
+import sys
+import argparse
+import logging
+from decimal import Decimal
+from datetime import datetime, date, time, timedelta
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from database.backends import backend, DatabaseError, as_date
+from database.connection import db_connection
+from database.instrumentation import mark_request_degraded
+from database.operations import get_price_trend_summary, get_price_window, clip_observations, summarize_runs
+from database.records import PriceObservation
+from config import PRICE_HISTORY_RETENTION_DAYS, PRICE_ARCHIVE_DIR
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FILE_NAME = "part-0.parquet"
+WATERMARK_FILE_NAME = "_archived_until"
+ROW_GROUP_SIZE = 128 * 1024
+FETCH_BATCH_SIZE = 10000
+DELETE_BATCH_SIZE = 5000
+
+_COLUMNS = [
+    "id", "product_id", "price", "currency", "availability",
+    "promo_text", "scraped_at", "last_seen_at", "observation_count"
+]
+
+
+def _pyarrow():
+    """Import pyarrow lazily so the API does not need it installed"""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("The price_history archive requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _archive_schema(pa):
+    return pa.schema([
+        ("id", pa.int64()),
+        ("product_id", pa.string()),
+        ("price", pa.decimal128(10, 2)),
+        ("currency", pa.string()),
+        ("availability", pa.string()),
+        ("promo_text", pa.string()),
+        ("scraped_at", pa.timestamp("us")),
+        ("last_seen_at", pa.timestamp("us")),
+        ("observation_count", pa.int32())
+    ])
+
+
+def _month_ranges(first_day: date, cutoff: date):
+    """Yield (month_start, end_exclusive) pairs covering [first_day, cutoff)"""
+    month_start = first_day.replace(day=1)
+    while month_start < cutoff:
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        yield max(month_start, first_day), min(next_month, cutoff)
+        month_start = next_month
+
+
+def _partition_path(archive_dir: str, month_start: date) -> str:
+    return os.path.join(archive_dir, f"month={month_start:%Y-%m}", ARCHIVE_FILE_NAME)
+
+
+def _fetch_month(cursor, pa, start: datetime, end: datetime, max_id: int):
+    """
+    Read one month of price_history rows into a pyarrow Table
+
+    Rows are fetched FETCH_BATCH_SIZE at a time, but the whole month is
+    held in memory: the partition is merged and sorted as a whole before
+    it is written.
+    """
+    cursor.execute(f"""
+        SELECT {', '.join(_COLUMNS)}
+        FROM price_history
+        WHERE scraped_at >= ? AND scraped_at < ? AND id <= ?
+    """, [start, end, max_id])
+
+    columns = {name: [] for name in _COLUMNS}
+    while True:
+        rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+        if not rows:
+            break
+        for row in rows:
+            for name, value in zip(_COLUMNS, row):
+                columns[name].append(value)
+
+    # SQLite has no DECIMAL type and returns prices as floats
+    columns["price"] = [
+        Decimal(f"{value:.2f}") if isinstance(value, float) else value
+        for value in columns["price"]
+    ]
+
+    return pa.table(columns, schema=_archive_schema(pa))
+
+
+def _write_partition(pa, table, path: str) -> str:
+    """Sort and write a partition to a temporary file next to path"""
+    table = table.sort_by([("product_id", "ascending"), ("scraped_at", "ascending")])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    pa.parquet.write_table(
+        table,
+        tmp_path,
+        compression="zstd",
+        use_dictionary=["product_id", "currency", "availability", "promo_text"],
+        row_group_size=ROW_GROUP_SIZE,
+        write_statistics=True
+    )
+    return tmp_path
+
+
+def _write_watermark(archive_dir: str, day: date):
+    """Advance the archived-until watermark to day (it never moves back)"""
+    current = archived_until(archive_dir)
+    if current is not None and current.date() >= day:
+        return
+    path = os.path.join(archive_dir, WATERMARK_FILE_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(day.isoformat())
+    os.replace(path + ".tmp", path)
+
+
+def _newest_archived_day(archive_dir: str) -> datetime:
+    """Midnight after the newest archived scrape, from Parquet statistics (archives without a watermark)"""
+    months = sorted(
+        name for name in os.listdir(archive_dir)
+        if name.startswith("month=") and os.path.exists(os.path.join(archive_dir, name, ARCHIVE_FILE_NAME))
+    )
+    if not months:
+        return None
+
+    pa = _pyarrow()
+    metadata = pa.parquet.ParquetFile(os.path.join(archive_dir, months[-1], ARCHIVE_FILE_NAME)).metadata
+    column = metadata.schema.names.index("scraped_at")
+    newest = max(
+        metadata.row_group(i).column(column).statistics.max
+        for i in range(metadata.num_row_groups)
+    )
+    return datetime.combine(newest.date() + timedelta(days=1), time.min)
+
+
+def archived_until(archive_dir: str = PRICE_ARCHIVE_DIR) -> datetime:
+    """
+    Start of the first day whose rows are only in price_history
+
+    Every row scraped before it is in the archive (rows of a month whose
+    delete did not finish are in price_history too); none after it is.
+
+    Args:
+        archive_dir: Root directory of the Parquet archive
+
+    Returns:
+        datetime: Midnight of that day, or None if nothing is archived
+    """
+    if not os.path.isdir(archive_dir):
+        return None
+    try:
+        with open(os.path.join(archive_dir, WATERMARK_FILE_NAME), encoding="utf-8") as f:
+            return datetime.combine(date.fromisoformat(f.read().strip()), time.min)
+    except FileNotFoundError:
+        return _newest_archived_day(archive_dir)
+
+
+def _verify_partition(cursor, pa, tmp_path: str, exported_ids, expected_rows: int,
+                      start: datetime, end: datetime, max_id: int) -> bool:
+    """
+    Check the written file against the database before anything is deleted
+
+    The file must hold every previously archived row plus exactly the rows
+    selected from price_history (same count, id sum and observation total).
+    """
+    written = pa.parquet.read_table(tmp_path, columns=["id", "observation_count"])
+    if written.num_rows != expected_rows:
+        logger.error(f"{tmp_path}: wrote {written.num_rows} rows, expected {expected_rows}")
+        return False
+
+    exported = written.filter(pa.compute.is_in(written["id"], value_set=exported_ids))
+    file_count = exported.num_rows
+    file_id_sum = pa.compute.sum(exported["id"]).as_py() or 0
+    file_observations = pa.compute.sum(exported["observation_count"]).as_py() or 0
+
+    cursor.execute("""
+        SELECT COUNT(*), SUM(CAST(id AS BIGINT)), SUM(CAST(observation_count AS BIGINT))
+        FROM price_history
+        WHERE scraped_at >= ? AND scraped_at < ? AND id <= ?
+    """, [start, end, max_id])
+    db_count, db_id_sum, db_observations = cursor.fetchone()
+
+    if (file_count, file_id_sum, file_observations) != (db_count, db_id_sum or 0, db_observations or 0):
+        logger.error(
+            f"{tmp_path}: verification mismatch (file {file_count}/{file_id_sum}/{file_observations}, "
+            f"database {db_count}/{db_id_sum}/{db_observations})"
+        )
+        return False
+    return True
+
+
+def _delete_archived(conn, cursor, start: datetime, end: datetime, max_id: int) -> int:
+    """Delete archived rows in small batches so the log and locks stay bounded"""
+    deleted = 0
+    while True:
+        cursor.execute(
+            backend.SQL["delete_archived_batch"],
+            [DELETE_BATCH_SIZE, start, end, max_id]
+        )
+        batch = cursor.rowcount
+        conn.commit()
+        deleted += max(batch, 0)
+        if batch < DELETE_BATCH_SIZE:
+            return deleted
+
+
+def archive_price_history(retention_days: int = PRICE_HISTORY_RETENTION_DAYS,
+                          archive_dir: str = PRICE_ARCHIVE_DIR,
+                          dry_run: bool = False) -> dict:
+    """
+    Move price_history rows older than the retention window to Parquet
+
+    Each month is merged into its partition file (so re-running after a
+    failed delete never duplicates rows), written to a temporary file,
+    verified, atomically renamed into place and then deleted from the
+    database in batches. Once a month's file is in place (and every earlier
+    month succeeded) the watermark moves to the month's end, before the
+    delete, so readers never count its rows twice. Deleting the oldest rows
+    moves the price_history id low-water mark, which changes
+    operations.get_data_version(), so API caches and ETags built from the
+    deleted rows are dropped.
+
+    Args:
+        retention_days: Whole days of raw history to keep in the database
+        archive_dir: Root directory of the Parquet archive
+        dry_run: Only report what would be archived
+
+    Returns:
+        dict: cutoff, months, archived_rows, deleted_rows, failed_months
+    """
+    pa = _pyarrow()
+    cutoff = date.today() - timedelta(days=retention_days)
+    summary = {
+        "cutoff": cutoff.isoformat(),
+        "months": 0,
+        "archived_rows": 0,
+        "deleted_rows": 0,
+        "failed_months": []
+    }
+
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT MIN(scraped_at), MAX(id)
+                FROM price_history
+                WHERE scraped_at < ?
+            """, [datetime.combine(cutoff, time.min)])
+            first_seen, max_id = cursor.fetchone()
+            if first_seen is None:
+                logger.info(f"No price history older than {cutoff}")
+                return summary
+
+            contiguous = True
+            for month_start, month_end in _month_ranges(as_date(first_seen), cutoff):
+                start = datetime.combine(month_start, time.min)
+                end = datetime.combine(month_end, time.min)
+                label = f"{month_start:%Y-%m}"
+
+                table = _fetch_month(cursor, pa, start, end, max_id)
+                if table.num_rows == 0:
+                    continue
+                summary["months"] += 1
+
+                if dry_run:
+                    logger.info(f"[dry run] {label}: {table.num_rows} rows would be archived")
+                    summary["archived_rows"] += table.num_rows
+                    continue
+
+                path = _partition_path(archive_dir, month_start)
+                exported_ids = table["id"].combine_chunks()
+                if os.path.exists(path):
+                    previous = pa.parquet.read_table(path).cast(_archive_schema(pa))
+                    previous = previous.filter(pa.compute.invert(
+                        pa.compute.is_in(previous["id"], value_set=exported_ids)
+                    ))
+                    table = pa.concat_tables([previous, table])
+
+                tmp_path = _write_partition(pa, table, path)
+                if not _verify_partition(cursor, pa, tmp_path, exported_ids, table.num_rows, start, end, max_id):
+                    os.remove(tmp_path)
+                    summary["failed_months"].append(label)
+                    contiguous = False
+                    continue
+
+                os.replace(tmp_path, path)
+                if contiguous:
+                    _write_watermark(archive_dir, month_end)
+                summary["archived_rows"] += len(exported_ids)
+                summary["deleted_rows"] += _delete_archived(conn, cursor, start, end, max_id)
+                logger.info(f"Archived {len(exported_ids)} rows for {label} to {path}")
+
+        return summary
+
+    except DatabaseError as e:
+        logger.error(f"Error archiving price history: {str(e)}")
+        summary["failed_months"].append("database")
+        return summary
+
+
+def _archive_dataset(archive_dir: str):
+    """Open the archive as a hive-partitioned dataset, or None if it is empty"""
+    pa = _pyarrow()
+    if not os.path.isdir(archive_dir):
+        return None
+    return pa.dataset.dataset(
+        archive_dir,
+        format="parquet",
+        schema=_archive_schema(pa).append(pa.field("month", pa.string())),
+        partitioning=pa.dataset.partitioning(pa.schema([("month", pa.string())]), flavor="hive"),
+        exclude_invalid_files=True
+    )
+
+
+def _archive_filter(pa, product_ids: list = None, since: datetime = None, until: datetime = None):
+    """
+    Build a dataset filter that prunes month partitions and row groups
+
+    Mirrors the overlap predicate used for live windows: a run that started
+    before since but was still being observed inside the window counts.
+    Runs never span midnight, so pruning from the start of since's day is safe.
+    """
+    field = pa.dataset.field
+    conditions = []
+    if product_ids:
+        conditions.append(field("product_id").isin(list(product_ids)))
+    if since:
+        since_day = datetime.combine(since.date(), time.min)
+        conditions.append(field("month") >= f"{since_day:%Y-%m}")
+        conditions.append(field("scraped_at") >= since_day)
+        conditions.append(pa.compute.coalesce(field("last_seen_at"), field("scraped_at")) >= since)
+    if until:
+        conditions.append(field("month") <= f"{until:%Y-%m}")
+        conditions.append(field("scraped_at") <= until)
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_archived_history(product_ids: list = None, since: datetime = None,
+                          until: datetime = None, archive_dir: str = PRICE_ARCHIVE_DIR) -> list:
+    """
+    Read archived price_history rows with partition and row-group pruning
+
+    Runs crossing since or until are clipped to the window, as in
+    operations.get_price_window().
+
+    Args:
+        product_ids: Only these products (all if None)
+        since: Start of the window (inclusive, open if None)
+        until: End of the window (inclusive, open if None)
+        archive_dir: Root directory of the Parquet archive
+
+    Returns:
+        list: PriceObservation records, oldest first
+    """
+    pa = _pyarrow()
+    dataset = _archive_dataset(archive_dir)
+    if dataset is None:
+        return []
+
+    table = dataset.to_table(columns=_COLUMNS, filter=_archive_filter(pa, product_ids, since, until))
+    table = table.sort_by([("product_id", "ascending"), ("scraped_at", "ascending")])
+
+    records = [
+        PriceObservation(
+            id=row["id"],
+            product_id=row["product_id"],
+            price=float(row["price"]) if row["price"] else None,
+            currency=row["currency"],
+            availability=row["availability"],
+            promo=row["promo_text"],
+            scraped_at=row["scraped_at"],
+            last_seen_at=row["last_seen_at"] or row["scraped_at"],
+            observation_count=row["observation_count"]
+        )
+        for row in table.to_pylist()
+    ]
+    return clip_observations(records, since or datetime.min, until)
+
+
+def get_archived_trend_summary(product_id: str, since: datetime = None, until: datetime = None,
+                               archive_dir: str = PRICE_ARCHIVE_DIR) -> dict:
+    """
+    Aggregate a product's archived prices, same shape as get_price_trend_summary()
+
+    Args:
+        product_id: Product identifier
+        since: Start of the window (inclusive, open if None)
+        until: End of the window (inclusive, open if None)
+        archive_dir: Root directory of the Parquet archive
+
+    Returns:
+        dict: Trend summary over the archived rows (data_points is 0 if none)
+    """
+    runs = read_archived_history([product_id], since, until, archive_dir)
+    return summarize_runs(product_id, runs, since or datetime.min, until)
+
+
+_warned_archive_unavailable = False
+
+
+def _archive_unavailable(error: ImportError):
+    """Mark the request degraded and warn (once) that archived history is skipped"""
+    global _warned_archive_unavailable
+    mark_request_degraded()
+    if not _warned_archive_unavailable:
+        _warned_archive_unavailable = True
+        logger.warning(f"Archived price history is skipped: {str(error)}")
+
+
+def _before(boundary: datetime, until: datetime = None) -> datetime:
+    """End of the archived part of a window ending at until"""
+    end = boundary - timedelta(microseconds=1)
+    return end if until is None else min(until, end)
+
+
+def _archive_boundary(since: datetime, archive_dir: str) -> datetime:
+    """The archived_until watermark if a window starting at since reaches archived days, else None"""
+    try:
+        boundary = archived_until(archive_dir)
+    except ImportError as e:
+        _archive_unavailable(e)
+        return None
+    return boundary if boundary is not None and since < boundary else None
+
+
+def get_long_range_trend_summary(product_id: str, since: datetime, until: datetime = None,
+                                 archive_dir: str = PRICE_ARCHIVE_DIR) -> dict:
+    """
+    Trend summary spanning the Parquet archive and live price_history
+
+    Rows before the archived_until() watermark come from the archive, the
+    rest from price_history, so rows of a partly deleted month are counted
+    once. Without pyarrow the live summary is returned and the request is
+    marked degraded.
+
+    Args:
+        product_id: Product identifier
+        since: Start of the window (inclusive)
+        until: End of the window (inclusive, open-ended if None)
+        archive_dir: Root directory of the Parquet archive
+
+    Returns:
+        dict: Combined trend summary, or None if the live query fails
+    """
+    boundary = _archive_boundary(since, archive_dir)
+    if boundary is None:
+        return get_price_trend_summary(product_id, since, until)
+
+    # Runs never cross midnight, so no run straddles the boundary
+    if until is not None and until < boundary:
+        live = summarize_runs(product_id, [], boundary, until)
+    else:
+        live = get_price_trend_summary(product_id, boundary, until)
+    if live is None:
+        return None
+
+    try:
+        archived = get_archived_trend_summary(product_id, since, _before(boundary, until), archive_dir)
+    except ImportError as e:
+        _archive_unavailable(e)
+        return get_price_trend_summary(product_id, since, until)
+    if not archived["data_points"]:
+        return live
+    if not live["data_points"]:
+        return archived
+
+    priced_points = archived["priced_points"] + live["priced_points"]
+    weighted_sum = sum(
+        part["avg_price"] * part["priced_points"]
+        for part in (archived, live) if part["avg_price"] is not None
+    )
+    prices = [p for p in (archived["min_price"], archived["max_price"], live["min_price"], live["max_price"]) if p is not None]
+
+    return {
+        "product_id": product_id,
+        "data_points": archived["data_points"] + live["data_points"],
+        "first_price": archived["first_price"],
+        "first_date": archived["first_date"],
+        "latest_price": live["latest_price"],
+        "latest_date": live["latest_date"],
+        "min_price": min(prices) if prices else None,
+        "max_price": max(prices) if prices else None,
+        "avg_price": weighted_sum / priced_points if priced_points else None,
+        "priced_points": priced_points
+    }
+
+
+def get_long_range_price_window(product_id: str, since: datetime, until: datetime = None,
+                                archive_dir: str = PRICE_ARCHIVE_DIR) -> list:
+    """
+    Price window spanning the Parquet archive and live price_history
+
+    Same result as operations.get_price_window() over the whole history;
+    rows before the archived_until() watermark come from the archive, the
+    rest from price_history.
+
+    Args:
+        product_id: Product identifier
+        since: Start of the window (inclusive)
+        until: End of the window (inclusive, open-ended if None)
+        archive_dir: Root directory of the Parquet archive
+
+    Returns:
+        list: PriceObservation records, newest first
+    """
+    boundary = _archive_boundary(since, archive_dir)
+    if boundary is None:
+        return get_price_window(product_id, since, until)
+
+    live = get_price_window(product_id, boundary, until) if until is None or until >= boundary else []
+    try:
+        archived = read_archived_history([product_id], since, _before(boundary, until), archive_dir)
+    except ImportError as e:
+        _archive_unavailable(e)
+        return get_price_window(product_id, since, until)
+
+    return live + archived[::-1]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Archive old price_history rows to Parquet")
+    parser.add_argument("--retention-days", type=int, default=PRICE_HISTORY_RETENTION_DAYS,
+                        help=f"Days of raw history to keep in the database (default: {PRICE_HISTORY_RETENTION_DAYS})")
+    parser.add_argument("--archive-dir", default=PRICE_ARCHIVE_DIR, help="Archive root directory")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+    args = parser.parse_args()
+
+    print(f"Archiving price_history older than {args.retention_days} days to {args.archive_dir}...")
+    result = archive_price_history(args.retention_days, args.archive_dir, args.dry_run)
+
+    if result["failed_months"]:
+        print(f"✗ Archive incomplete, failed: {', '.join(result['failed_months'])}")
+        sys.exit(1)
+    print(
+        f"✓ Archived {result['archived_rows']} rows from {result['months']} months "
+        f"(deleted {result['deleted_rows']}, cutoff {result['cutoff']})"
+    )
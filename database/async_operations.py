@@ -0,0 +1,166 @@
+"""
+Async database operations for the API
+Runs the synchronous pyodbc operations on a dedicated, bounded thread pool
+so slow queries never block the event loop. Catalog and latest-price reads
+go through the in-process cache in database.cache.
+"""
+import os
+import sys
+import asyncio
+import functools
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from database import operations, cache, archive
+from config import DB_EXECUTOR_WORKERS
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared database executor, creating it on first use
+    
+    Worker count defaults to the connection pool size: extra threads
+    would only queue on the pool.
+    
+    Returns:
+        ThreadPoolExecutor: Executor reserved for database calls
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DB_EXECUTOR_WORKERS,
+                    thread_name_prefix="db"
+                )
+    return _executor
+
+
+def shutdown_executor(wait: bool = True):
+    """Shut down the database executor (called on application shutdown)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+
+async def run_in_db_executor(func, *args, **kwargs):
+    """
+    Run a blocking database call on the database executor
+    
+    The caller's context is copied into the worker thread so query
+    instrumentation lands in the current request's summary.
+    
+    Args:
+        func: Synchronous callable
+        *args, **kwargs: Arguments passed to func
+        
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(),
+        functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+async def get_all_products() -> list:
+    """Async version of cache.get_all_products"""
+    return await run_in_db_executor(cache.get_all_products)
+
+
+async def get_product_by_id(product_id: str):
+    """Async version of cache.get_product_by_id"""
+    return await run_in_db_executor(cache.get_product_by_id, product_id)
+
+
+async def get_latest_price(product_id: str) -> dict:
+    """Async version of cache.get_latest_price"""
+    return await run_in_db_executor(cache.get_latest_price, product_id)
+
+
+async def get_latest_prices(product_ids: list = None) -> dict:
+    """Async version of cache.get_latest_prices"""
+    return await run_in_db_executor(cache.get_latest_prices, product_ids)
+
+
+async def get_catalog(product_ids: list = None) -> list:
+    """Async version of cache.get_catalog"""
+    return await run_in_db_executor(cache.get_catalog, product_ids)
+
+
+async def get_product_snapshots(product_ids: list = None) -> list:
+    """Async version of cache.get_product_snapshots"""
+    return await run_in_db_executor(cache.get_product_snapshots, product_ids)
+
+
+async def get_data_version():
+    """Async version of cache.get_data_version"""
+    return await run_in_db_executor(cache.get_data_version)
+
+
+async def get_price_history(product_id: str, limit: int = 100, before: tuple = None) -> list:
+    """Async version of operations.get_price_history"""
+    return await run_in_db_executor(operations.get_price_history, product_id, limit, before)
+
+
+async def get_price_window(product_id: str, since, until=None, limit: int = None) -> list:
+    """Async version of operations.get_price_window"""
+    return await run_in_db_executor(operations.get_price_window, product_id, since, until, limit)
+
+
+async def get_price_trend_summary(product_id: str, since, until=None) -> dict:
+    """Async version of operations.get_price_trend_summary"""
+    return await run_in_db_executor(operations.get_price_trend_summary, product_id, since, until)
+
+
+async def get_long_range_price_window(product_id: str, since, until=None) -> list:
+    """Async version of archive.get_long_range_price_window"""
+    return await run_in_db_executor(archive.get_long_range_price_window, product_id, since, until)
+
+
+async def get_long_range_trend_summary(product_id: str, since, until=None) -> dict:
+    """Async version of archive.get_long_range_trend_summary"""
+    return await run_in_db_executor(archive.get_long_range_trend_summary, product_id, since, until)
+
+
+async def get_price_trend_summaries(product_ids: list, since, until=None) -> dict:
+    """Async version of operations.get_price_trend_summaries"""
+    return await run_in_db_executor(operations.get_price_trend_summaries, product_ids, since, until)
+
+
+async def get_price_rollup(product_id: str, since=None, until=None, resolution: str = "day", limit: int = None, before=None) -> list:
+    """Async version of operations.get_price_rollup"""
+    return await run_in_db_executor(operations.get_price_rollup, product_id, since, until, resolution, limit, before)
+
+
+async def get_price_rollups(product_ids: list, since=None, until=None, resolution: str = "day") -> dict:
+    """Async version of operations.get_price_rollups"""
+    return await run_in_db_executor(operations.get_price_rollups, product_ids, since, until, resolution)
+
+
+async def get_rollup_trend_summary(product_id: str, since, until=None) -> dict:
+    """Async version of operations.get_rollup_trend_summary"""
+    return await run_in_db_executor(operations.get_rollup_trend_summary, product_id, since, until)
+
+
+async def get_price_statistics(product_id: str) -> dict:
+    """Async version of operations.get_price_statistics"""
+    return await run_in_db_executor(operations.get_price_statistics, product_id)
+
+
+async def get_price_statistics_batch(product_ids: list) -> dict:
+    """Async version of operations.get_price_statistics_batch"""
+    return await run_in_db_executor(operations.get_price_statistics_batch, product_ids)
@@ -0,0 +1,95 @@
+"""
+Storage backends
+The backend is chosen from DB_CONNECTION_STRING: "sqlite:///path/to.db"
+(or "sqlite:///:memory:") selects the embedded SQLite backend for local runs,
+tests and benchmarks; anything else is an ODBC connection string for Azure
+SQL / SQL Server.
+
+Every backend module provides the same interface:
+    NAME, Error, connect(connection_string, timeout), is_transient_error(error),
+    limit_clauses(limit), ROLLUP_BUCKETS, BULK_STAGING, MIGRATIONS_DIR and SQL,
+    a dict of the statements that differ between dialects.
+Only the selected backend is imported, so SQLite runs do not need pyodbc.
+
+SQLite converts columns by their declared type only; computed datetimes
+(MIN/MAX over a column, CASE, GETDATE()) come back as ISO text. Read them
+through as_datetime()/as_date(), which pass pyodbc's values through.
+"""
+import os
+import sys
+import importlib
+from datetime import date, datetime
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from config import DB_CONNECTION_STRING
+
+SQLITE_PREFIX = "sqlite:///"
+
+
+def backend_name(connection_string: str = None) -> str:
+    """
+    Name of the backend serving a connection string
+
+    Args:
+        connection_string: Connection string (DB_CONNECTION_STRING if None)
+
+    Returns:
+        str: "sqlite" or "sqlserver"
+    """
+    connection_string = DB_CONNECTION_STRING if connection_string is None else connection_string
+    return "sqlite" if connection_string.startswith(SQLITE_PREFIX) else "sqlserver"
+
+
+def load_backend(connection_string: str = None):
+    """
+    Import the backend module serving a connection string
+
+    Args:
+        connection_string: Connection string (DB_CONNECTION_STRING if None)
+
+    Returns:
+        module: database.backends.sqlite or database.backends.sqlserver
+    """
+    return importlib.import_module(f"database.backends.{backend_name(connection_string)}")
+
+
+backend = load_backend()
+
+# Base class of the errors raised by the active backend's driver
+DatabaseError = backend.Error
+
+
+def as_datetime(value):
+    """
+    Computed datetime value as a datetime
+
+    Args:
+        value: datetime, ISO 8601 text or None
+
+    Returns:
+        datetime: The value (None stays None)
+    """
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def as_date(value):
+    """
+    Computed date value as a date
+
+    Args:
+        value: date, datetime, ISO 8601 text or None
+
+    Returns:
+        date: The value's date (None stays None)
+    """
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
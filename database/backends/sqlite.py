@@ -0,0 +1,322 @@
+"""
+Embedded SQLite storage backend
+Selected with DB_CONNECTION_STRING=sqlite:///path/to/laptop_insights.db so the
+API, agent tools, scrapers and benchmarks run without an Azure SQL instance.
+
+Connections use WAL journaling (readers never block the single writer) and
+synchronous=NORMAL. Datetimes are stored as ISO 8601 text, which sorts
+chronologically. Columns declared DATETIME or DATE come back as
+datetime/date objects like they do from pyodbc; computed values over them
+(MIN/MAX, CASE, GETDATE()) have no declared type and stay text, see
+database.backends.as_datetime(). GETDATE() is registered on every
+connection so shared statements work unchanged.
+"""
+import os
+import sqlite3
+from decimal import Decimal
+from datetime import datetime, date
+
+NAME = "sqlite"
+
+PREFIX = "sqlite:///"
+
+Error = sqlite3.Error
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations", "sqlite")
+
+# In-process statements are cheap, so bulk ingest simply goes row by row
+BULK_STAGING = False
+
+# Shared-cache URI so every pooled connection sees the same in-memory database
+_MEMORY_URI = "file:laptop_insights?mode=memory&cache=shared"
+
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON"
+)
+
+_TRANSIENT_MESSAGES = ("database is locked", "database table is locked", "database is busy")
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" ", "microseconds"))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(Decimal, float)
+
+# Applied by declared column type (detect_types=PARSE_DECLTYPES)
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+
+
+def _getdate() -> str:
+    """SQL Server's GETDATE(): local time in the stored datetime format"""
+    return datetime.now().isoformat(" ", "microseconds")
+
+
+class SqliteCursor:
+    """
+    sqlite3 cursor with the parts of the pyodbc cursor API operations use
+
+    Accepts (and ignores) fast_executemany.
+    """
+
+    __slots__ = ("_cursor", "fast_executemany")
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+        self.fast_executemany = False
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, sql: str, params=()):
+        self._cursor.execute(sql, params)
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        self._cursor.executemany(sql, seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int = None):
+        return self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class SqliteConnection:
+    """sqlite3 connection handing out SqliteCursor objects"""
+
+    __slots__ = ("_connection",)
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def cursor(self) -> SqliteCursor:
+        return SqliteCursor(self._connection.cursor())
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+
+def database_path(connection_string: str) -> str:
+    """Path part of a sqlite:/// connection string (":memory:" if empty)"""
+    return connection_string[len(PREFIX):] or ":memory:"
+
+
+def connect(connection_string: str, timeout: int) -> SqliteConnection:
+    """
+    Open a SQLite connection in WAL mode
+
+    Connections may be used from any thread (one at a time), as the
+    connection pool hands them to executor workers.
+
+    Args:
+        connection_string: sqlite:///path/to.db or sqlite:///:memory:
+        timeout: Seconds to wait for a lock held by another connection
+
+    Returns:
+        SqliteConnection: Database connection object
+    """
+    path = database_path(connection_string)
+    if path == ":memory:":
+        connection = sqlite3.connect(
+            _MEMORY_URI, timeout=timeout, uri=True, check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES
+        )
+    else:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES
+        )
+
+    connection.create_function("GETDATE", 0, _getdate)
+    for pragma in _PRAGMAS:
+        connection.execute(pragma)
+    return SqliteConnection(connection)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Check whether a sqlite3 error is lock contention that may clear on retry"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return any(text in message for text in _TRANSIENT_MESSAGES)
+
+
+def limit_clauses(limit: int = None) -> tuple:
+    """Return (select prefix, statement suffix) capping a query at limit rows"""
+    return "", (f"LIMIT {int(limit)}" if limit else "")
+
+
+# Bucket start expression per rollup resolution (1900-01-01 was a Monday)
+ROLLUP_BUCKETS = {
+    "day": "price_date",
+    "week": "date(price_date, '-' || (CAST(julianday(price_date) - julianday('1900-01-01') AS INTEGER) % 7) || ' days')",
+    "month": "date(price_date, 'start of month')"
+}
+
+
+SQL = {
+    "server_version": "SELECT 'SQLite ' || sqlite_version()",
+
+    # The sqlite3 module only opens transactions implicitly before DML, so
+    # DDL in a migration would otherwise autocommit statement by statement
+    "begin_transaction": "BEGIN",
+
+    "merge_product": """
+        INSERT INTO products (product_id, brand, model, product_url)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (product_id) DO UPDATE
+        SET brand = excluded.brand, model = excluded.model,
+            product_url = excluded.product_url, updated_at = GETDATE()
+    """,
+
+    # Same parameters as the SQL Server statement, referenced by position:
+    # product_id, scraped_at, price, currency, availability, promo_text,
+    # scraped_at, scraped_at. IS gives NULL-safe equality.
+    "extend_run": """
+        UPDATE price_history
+        SET last_seen_at = ?2, observation_count = observation_count + 1
+        WHERE id = (
+                SELECT id
+                FROM price_history
+                WHERE product_id = ?1
+                ORDER BY scraped_at DESC, id DESC
+                LIMIT 1
+            )
+            AND price IS ?3 AND currency IS ?4 AND availability IS ?5 AND promo_text IS ?6
+            AND COALESCE(last_seen_at, scraped_at) <= ?7
+            AND date(scraped_at) = date(?8)
+    """,
+
+    # {values}: one (?) row per product_id
+    "refresh_current_prices": """
+        INSERT INTO current_prices
+            (product_id, price_history_id, price, currency, availability,
+             promo_text, scraped_at, last_seen_at, updated_at)
+        SELECT
+            ph.product_id, ph.id, ph.price, ph.currency, ph.availability,
+            ph.promo_text, ph.scraped_at, COALESCE(ph.last_seen_at, ph.scraped_at), GETDATE()
+        FROM (VALUES {values}) AS ids
+        JOIN price_history ph ON ph.id = (
+            SELECT id
+            FROM price_history
+            WHERE product_id = ids.column1
+            ORDER BY scraped_at DESC, id DESC
+            LIMIT 1
+        )
+        WHERE true
+        ON CONFLICT (product_id) DO UPDATE
+        SET price_history_id = excluded.price_history_id, price = excluded.price,
+            currency = excluded.currency, availability = excluded.availability,
+            promo_text = excluded.promo_text, scraped_at = excluded.scraped_at,
+            last_seen_at = excluded.last_seen_at, updated_at = excluded.updated_at
+    """,
+
+    # {product_filter}: optional "product_id IN (...) AND " prefix
+    # Parameters: [product ids...], start, end
+    # The dominant availability is ranked with window functions in the same
+    # pass: SQLite would nested-loop a join between two CTEs.
+    "refresh_price_daily": """
+        WITH day_rows AS (
+            SELECT
+                product_id, date(scraped_at) AS price_date, price, availability,
+                scraped_at, observation_count
+            FROM price_history
+            WHERE {product_filter}scraped_at >= ? AND scraped_at < ?
+        ),
+        weighted AS (
+            SELECT
+                *,
+                SUM(observation_count) OVER (
+                    PARTITION BY product_id, price_date, availability
+                ) AS availability_weight,
+                MAX(scraped_at) OVER (
+                    PARTITION BY product_id, price_date, availability
+                ) AS availability_last_seen
+            FROM day_rows
+        ),
+        ranked AS (
+            SELECT
+                product_id, price_date, price, availability, observation_count,
+                ROW_NUMBER() OVER (
+                    PARTITION BY product_id, price_date
+                    ORDER BY CASE WHEN price IS NULL THEN 1 ELSE 0 END, scraped_at ASC
+                ) AS rn_open,
+                ROW_NUMBER() OVER (
+                    PARTITION BY product_id, price_date
+                    ORDER BY CASE WHEN price IS NULL THEN 1 ELSE 0 END, scraped_at DESC
+                ) AS rn_close,
+                ROW_NUMBER() OVER (
+                    PARTITION BY product_id, price_date
+                    ORDER BY availability_weight DESC, availability_last_seen DESC
+                ) AS rn_availability
+            FROM weighted
+        )
+        INSERT INTO price_daily
+            (product_id, price_date, open_price, high_price, low_price, close_price,
+             price_sum, price_count, sample_count, availability, updated_at)
+        SELECT
+            product_id, price_date,
+            MAX(CASE WHEN rn_open = 1 THEN price END),
+            MAX(price),
+            MIN(price),
+            MAX(CASE WHEN rn_close = 1 THEN price END),
+            SUM(price * observation_count),
+            SUM(CASE WHEN price IS NOT NULL THEN observation_count ELSE 0 END),
+            SUM(observation_count),
+            MAX(CASE WHEN rn_availability = 1 THEN availability END),
+            GETDATE()
+        FROM ranked
+        GROUP BY product_id, price_date
+        ON CONFLICT (product_id, price_date) DO UPDATE
+        SET open_price = excluded.open_price, high_price = excluded.high_price,
+            low_price = excluded.low_price, close_price = excluded.close_price,
+            price_sum = excluded.price_sum, price_count = excluded.price_count,
+            sample_count = excluded.sample_count, availability = excluded.availability,
+            updated_at = excluded.updated_at
+    """,
+
+    # Parameters: batch size, start, end, max_id
+    "delete_archived_batch": """
+        DELETE FROM price_history
+        WHERE id IN (
+            SELECT id
+            FROM price_history
+            WHERE scraped_at >= ?2 AND scraped_at < ?3 AND id <= ?4
+            LIMIT ?1
+        )
+    """,
+
+    "create_migrations_table": """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version     INTEGER  NOT NULL PRIMARY KEY,
+            name        TEXT     NOT NULL,
+            applied_at  DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+        )
+    """,
+
+    # One row: NULL if the migrations table does not exist
+    "migrations_table_exists": """
+        SELECT (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations')
+    """
+}
@@ -0,0 +1,281 @@
+"""
+Azure SQL / SQL Server storage backend
+Connects through pyodbc; holds the T-SQL statements that have no portable
+equivalent (MERGE upserts, TOP, CROSS APPLY, temp-table bulk staging).
+"""
+import os
+import re
+import pyodbc
+
+NAME = "sqlserver"
+
+Error = pyodbc.Error
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+# Bulk ingest stages rows in #temp tables and extends runs set-based
+BULK_STAGING = True
+
+# Azure SQL errors worth retrying: service busy/paused, failover, throttling
+TRANSIENT_ERROR_CODES = {
+    1205,                       # deadlock victim
+    4060, 4221,                 # database not available / login timeout during failover
+    10053, 10054, 10060,        # transport-level network errors
+    10928, 10929,               # resource limits reached
+    40143, 40197, 40501, 40540, 40613,
+    42108, 42109,
+    49918, 49919, 49920
+}
+TRANSIENT_SQLSTATES = {"08S01", "08001", "HYT00", "HYT01", "40001"}
+
+_NATIVE_ERROR_PATTERN = re.compile(r"\((\d{4,5})\)")
+
+
+def connect(connection_string: str, timeout: int):
+    """
+    Open a pyodbc connection
+
+    Args:
+        connection_string: ODBC connection string
+        timeout: Login timeout in seconds
+
+    Returns:
+        pyodbc.Connection: Database connection object
+    """
+    return pyodbc.connect(connection_string, timeout=timeout)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check whether a pyodbc error is a transient Azure SQL condition
+
+    pyodbc errors carry (sqlstate, message); the native SQL Server error
+    number appears in parentheses inside the message.
+    """
+    if not isinstance(error, pyodbc.Error) or not error.args:
+        return False
+    if error.args[0] in TRANSIENT_SQLSTATES:
+        return True
+    message = str(error.args[-1])
+    return any(int(code) in TRANSIENT_ERROR_CODES for code in _NATIVE_ERROR_PATTERN.findall(message))
+
+
+def limit_clauses(limit: int = None) -> tuple:
+    """Return (select prefix, statement suffix) capping a query at limit rows"""
+    return (f"TOP {int(limit)}" if limit else ""), ""
+
+
+# Bucket start expression per rollup resolution (1900-01-01 was a Monday)
+ROLLUP_BUCKETS = {
+    "day": "price_date",
+    "week": "DATEADD(day, -(DATEDIFF(day, '19000101', price_date) % 7), price_date)",
+    "month": "DATEFROMPARTS(YEAR(price_date), MONTH(price_date), 1)"
+}
+
+
+SQL = {
+    "server_version": "SELECT @@VERSION",
+
+    # pyodbc connections (autocommit off) are always inside a transaction
+    "begin_transaction": None,
+
+    "merge_product": """
+        MERGE products WITH (HOLDLOCK) AS target
+        USING (SELECT ? AS product_id, ? AS brand, ? AS model, ? AS product_url) AS source
+        ON target.product_id = source.product_id
+        WHEN MATCHED THEN
+            UPDATE SET brand = source.brand, model = source.model,
+                       product_url = source.product_url, updated_at = GETDATE()
+        WHEN NOT MATCHED THEN
+            INSERT (product_id, brand, model, product_url)
+            VALUES (source.product_id, source.brand, source.model, source.product_url);
+    """,
+
+    # Run-length compression: an observation identical to the product's latest
+    # row (INTERSECT gives NULL-safe equality) extends that row's run instead of
+    # adding a new one. Runs never cross midnight so price_daily stays exact.
+    # Parameters: product_id, scraped_at, price, currency, availability,
+    # promo_text, scraped_at, scraped_at
+    "extend_run": """
+        WITH latest AS (
+            SELECT TOP 1 *
+            FROM price_history
+            WHERE product_id = ?
+            ORDER BY scraped_at DESC, id DESC
+        )
+        UPDATE latest
+        SET last_seen_at = ?, observation_count = observation_count + 1
+        WHERE EXISTS (
+                SELECT price, currency, availability, promo_text
+                INTERSECT
+                SELECT CAST(? AS DECIMAL(10,2)), CAST(? AS NVARCHAR(10)),
+                       CAST(? AS NVARCHAR(50)), CAST(? AS NVARCHAR(1000))
+            )
+            AND COALESCE(last_seen_at, scraped_at) <= ?
+            AND CAST(scraped_at AS DATE) = CAST(? AS DATE)
+    """,
+
+    "create_staging_tables": """
+        CREATE TABLE #incoming (
+            row_no INT NOT NULL,
+            product_id NVARCHAR(100) NOT NULL,
+            price DECIMAL(10,2) NULL,
+            currency NVARCHAR(10) NOT NULL,
+            availability NVARCHAR(50) NOT NULL,
+            promo_text NVARCHAR(1000) NULL,
+            scraped_at DATETIME2 NOT NULL
+        );
+        CREATE TABLE #absorbed (row_no INT NOT NULL);
+    """,
+
+    "stage_row": "INSERT INTO #incoming VALUES (?, ?, ?, ?, ?, ?, ?)",
+
+    "bulk_extend_runs": """
+        UPDATE ph
+        SET last_seen_at = i.scraped_at, observation_count = ph.observation_count + 1
+        OUTPUT i.row_no INTO #absorbed (row_no)
+        FROM #incoming i
+        CROSS APPLY (
+            SELECT TOP 1 id
+            FROM price_history
+            WHERE product_id = i.product_id
+            ORDER BY scraped_at DESC, id DESC
+        ) latest
+        JOIN price_history ph ON ph.id = latest.id
+        WHERE EXISTS (
+                SELECT ph.price, ph.currency, ph.availability, ph.promo_text
+                INTERSECT
+                SELECT i.price, i.currency, i.availability, i.promo_text
+            )
+            AND COALESCE(ph.last_seen_at, ph.scraped_at) <= i.scraped_at
+            AND CAST(ph.scraped_at AS DATE) = CAST(i.scraped_at AS DATE)
+    """,
+
+    "insert_unabsorbed": """
+        INSERT INTO price_history
+        (product_id, price, currency, availability, promo_text, scraped_at)
+        SELECT product_id, price, currency, availability, promo_text, scraped_at
+        FROM #incoming
+        WHERE row_no NOT IN (SELECT row_no FROM #absorbed)
+    """,
+
+    "drop_staging_tables": "DROP TABLE IF EXISTS #incoming; DROP TABLE IF EXISTS #absorbed;",
+
+    # {values}: one (?) row per product_id
+    "refresh_current_prices": """
+        MERGE current_prices WITH (HOLDLOCK) AS target
+        USING (
+            SELECT latest.*
+            FROM (VALUES {values}) AS ids (product_id)
+            CROSS APPLY (
+                SELECT TOP 1
+                    id, product_id, price, currency, availability, promo_text, scraped_at,
+                    COALESCE(last_seen_at, scraped_at) AS last_seen_at
+                FROM price_history ph
+                WHERE ph.product_id = ids.product_id
+                ORDER BY ph.scraped_at DESC, ph.id DESC
+            ) latest
+        ) AS source
+        ON target.product_id = source.product_id
+        WHEN MATCHED THEN
+            UPDATE SET price_history_id = source.id, price = source.price,
+                       currency = source.currency, availability = source.availability,
+                       promo_text = source.promo_text, scraped_at = source.scraped_at,
+                       last_seen_at = source.last_seen_at, updated_at = GETDATE()
+        WHEN NOT MATCHED THEN
+            INSERT (product_id, price_history_id, price, currency, availability,
+                    promo_text, scraped_at, last_seen_at)
+            VALUES (source.product_id, source.id, source.price, source.currency,
+                    source.availability, source.promo_text, source.scraped_at,
+                    source.last_seen_at);
+    """,
+
+    # {product_filter}: optional "product_id IN (...) AND " prefix
+    # Parameters: [product ids...], start, end
+    "refresh_price_daily": """
+        WITH day_rows AS (
+            SELECT
+                product_id, CAST(scraped_at AS DATE) AS price_date, price, availability,
+                scraped_at, observation_count
+            FROM price_history
+            WHERE {product_filter}scraped_at >= ? AND scraped_at < ?
+        ),
+        ranked AS (
+            SELECT
+                product_id, price_date, price, observation_count,
+                ROW_NUMBER() OVER (
+                    PARTITION BY product_id, price_date
+                    ORDER BY CASE WHEN price IS NULL THEN 1 ELSE 0 END, scraped_at ASC
+                ) AS rn_open,
+                ROW_NUMBER() OVER (
+                    PARTITION BY product_id, price_date
+                    ORDER BY CASE WHEN price IS NULL THEN 1 ELSE 0 END, scraped_at DESC
+                ) AS rn_close
+            FROM day_rows
+        ),
+        daily AS (
+            SELECT
+                product_id, price_date,
+                MAX(CASE WHEN rn_open = 1 THEN price END) AS open_price,
+                MAX(price) AS high_price,
+                MIN(price) AS low_price,
+                MAX(CASE WHEN rn_close = 1 THEN price END) AS close_price,
+                SUM(price * observation_count) AS price_sum,
+                SUM(CASE WHEN price IS NOT NULL THEN observation_count ELSE 0 END) AS price_count,
+                SUM(observation_count) AS sample_count
+            FROM ranked
+            GROUP BY product_id, price_date
+        ),
+        dominant_availability AS (
+            SELECT
+                product_id, price_date, availability,
+                ROW_NUMBER() OVER (
+                    PARTITION BY product_id, price_date
+                    ORDER BY SUM(observation_count) DESC, MAX(scraped_at) DESC
+                ) AS rn
+            FROM day_rows
+            GROUP BY product_id, price_date, availability
+        )
+        MERGE price_daily WITH (HOLDLOCK) AS target
+        USING (
+            SELECT d.*, a.availability
+            FROM daily d
+            JOIN dominant_availability a
+                ON a.product_id = d.product_id AND a.price_date = d.price_date AND a.rn = 1
+        ) AS source
+        ON target.product_id = source.product_id AND target.price_date = source.price_date
+        WHEN MATCHED THEN
+            UPDATE SET open_price = source.open_price, high_price = source.high_price,
+                       low_price = source.low_price, close_price = source.close_price,
+                       price_sum = source.price_sum, price_count = source.price_count,
+                       sample_count = source.sample_count, availability = source.availability,
+                       updated_at = GETDATE()
+        WHEN NOT MATCHED THEN
+            INSERT (product_id, price_date, open_price, high_price, low_price, close_price,
+                    price_sum, price_count, sample_count, availability)
+            VALUES (source.product_id, source.price_date, source.open_price, source.high_price,
+                    source.low_price, source.close_price, source.price_sum, source.price_count,
+                    source.sample_count, source.availability);
+    """,
+
+    # Parameters: batch size, start, end, max_id
+    "delete_archived_batch": """
+        DELETE TOP (?) FROM price_history
+        WHERE scraped_at >= ? AND scraped_at < ? AND id <= ?
+    """,
+
+    "create_migrations_table": """
+        IF OBJECT_ID('dbo.schema_migrations', 'U') IS NULL
+        CREATE TABLE dbo.schema_migrations (
+            version     INT           NOT NULL PRIMARY KEY,
+            name        NVARCHAR(200) NOT NULL,
+            applied_at  DATETIME2     NOT NULL DEFAULT GETDATE()
+        )
+    """,
+
+    # One row: NULL if the migrations table does not exist
+    "migrations_table_exists": """
+        SELECT CASE WHEN OBJECT_ID('dbo.schema_migrations', 'U') IS NULL
+                    THEN NULL ELSE 1 END
+    """
+}
@@ -0,0 +1,31 @@
+"""
+Backfill the price_daily rollup from existing price_history
+Run with: python -m database.backfill_rollup [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+"""
+import os
+import sys
+import argparse
+from datetime import date
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from database.operations import backfill_price_daily
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build price_daily from price_history")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day to build (default: earliest history)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day to build (default: latest history)")
+    parser.add_argument("--days-per-batch", type=int, default=30, help="Days per transaction")
+    args = parser.parse_args()
+
+    print("Backfilling price_daily...")
+    slices = backfill_price_daily(args.start, args.end, args.days_per_batch)
+
+    if slices < 0:
+        print("✗ Backfill failed!")
+        sys.exit(1)
+    print(f"✓ Backfill complete ({slices} batches)")
@@ -0,0 +1,301 @@
+"""
+Read-through cache for catalog and latest-price reads
+The products table and current_prices only change when the scraper runs,
+so full catalog/snapshot reads are kept in process and revalidated with a
+cheap data-version probe at most once per CATALOG_CACHE_TTL seconds.
+Between probes, reads do not touch the database at all.
+
+Functions mirror the signatures in database.operations; filtered and
+single-product calls are answered from the cached full result through a
+product_id index built with it. While the database circuit breaker is
+open, the last good result is served instead (CATALOG_CACHE_SERVE_STALE).
+"""
+import os
+import sys
+import time
+import threading
+import logging
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from database import operations
+from database.connection import DatabaseUnavailableError
+from database.instrumentation import mark_request_degraded
+from config import CATALOG_CACHE_TTL, CATALOG_CACHE_PROBE_BACKOFF, CATALOG_CACHE_SERVE_STALE
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogCache:
+    """
+    Version-validated read-through cache
+
+    Entries are loaded on first use and dropped together whenever the
+    data version reported by operations.get_data_version() changes.
+    The probe runs outside the lock and only one thread probes at a time;
+    the others keep reading the current entries meanwhile.
+    """
+
+    def __init__(
+        self,
+        ttl: float = CATALOG_CACHE_TTL,
+        serve_stale: bool = CATALOG_CACHE_SERVE_STALE,
+        probe_backoff: float = CATALOG_CACHE_PROBE_BACKOFF
+    ):
+        self.ttl = ttl
+        self.serve_stale = serve_stale
+        self.probe_backoff = probe_backoff
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._last_good = {}
+        self._version = None
+        self._version_known = False
+        self._next_probe_at = None
+        self._probing = False
+        self._generation = 0
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._probes = 0
+        self._invalidations = 0
+        self._stale_served = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _revalidate(self):
+        """Probe the data version if it is due and no other thread is probing"""
+        with self._lock:
+            now = time.monotonic()
+            if self._probing or (self._next_probe_at is not None and now < self._next_probe_at):
+                return
+            self._probing = True
+            self._probes += 1
+
+        version = None
+        try:
+            version = operations.get_data_version()
+        finally:
+            with self._lock:
+                self._probing = False
+                now = time.monotonic()
+                if version is None:
+                    # Unknown: keep entries only if stale data is acceptable,
+                    # and back off instead of probing on every read
+                    if not self.serve_stale:
+                        self._drop_entries()
+                    self._version_known = False
+                    self._next_probe_at = now + min(self.probe_backoff, self.ttl)
+                else:
+                    if version != self._version:
+                        self._drop_entries()
+                    self._version = version
+                    self._version_known = True
+                    self._next_probe_at = now + self.ttl
+
+    def _drop_entries(self):
+        """Clear current entries (caller holds the lock)"""
+        if self._entries:
+            self._invalidations += 1
+        self._entries.clear()
+        self._generation += 1
+
+    def _stale(self, key: str, error: DatabaseUnavailableError):
+        """Return the last good value for key, or re-raise (caller holds the lock)"""
+        if self.serve_stale and key in self._last_good:
+            self._stale_served += 1
+            mark_request_degraded()
+            return self._last_good[key]
+        raise error
+
+    def get(self, key: str, loader):
+        """
+        Return the cached value for key, loading it on a miss
+
+        Empty results are not cached: operations return [] on database
+        errors too, and an error must not stick for a whole TTL.
+
+        Args:
+            key: Cache entry name
+            loader: Zero-argument callable producing the value
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        if not self.enabled:
+            return loader()
+
+        try:
+            self._revalidate()
+        except DatabaseUnavailableError as e:
+            with self._lock:
+                return self._stale(key, e)
+
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+            generation = self._generation
+
+        try:
+            value = loader()
+        except DatabaseUnavailableError as e:
+            with self._lock:
+                return self._stale(key, e)
+
+        with self._lock:
+            if value:
+                self._last_good[key] = value
+                # Skip the store if the data changed while we were loading,
+                # or if the version is unknown and must not be served stale
+                if generation == self._generation and (self._version_known or self.serve_stale):
+                    self._entries[key] = value
+        return value
+
+    def version(self):
+        """
+        Current data version, probed at most once per TTL
+
+        Returns:
+            The version tuple, or None if it is unknown (probe failed and
+            stale data is not acceptable)
+        """
+        if not self.enabled:
+            return operations.get_data_version()
+
+        try:
+            self._revalidate()
+        except DatabaseUnavailableError:
+            pass
+
+        with self._lock:
+            if not self._version_known and not self.serve_stale:
+                return None
+            return self._version
+
+    def invalidate(self):
+        """Drop all entries and force a version probe on the next read"""
+        with self._lock:
+            self._drop_entries()
+            self._next_probe_at = None
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of cache counters
+
+        Returns:
+            dict: Hit/miss counts and ratio, version probes, invalidations
+                  and stale results served during outages
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl,
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+                "version_probes": self._probes,
+                "invalidations": self._invalidations,
+                "stale_served": self._stale_served
+            }
+
+
+class _IndexedRows(list):
+    """Cached result rows plus a product_id -> position index"""
+    __slots__ = ("positions",)
+
+    def __init__(self, rows: list, product_id):
+        super().__init__(rows)
+        self.positions = {product_id(row): i for i, row in enumerate(rows)}
+
+    def select(self, product_ids: list) -> list:
+        """Rows for product_ids, in cached order, via index lookups"""
+        positions = sorted({self.positions[pid] for pid in product_ids if pid in self.positions})
+        return [self[i] for i in positions]
+
+
+_cache = CatalogCache()
+
+
+def _load_catalog() -> _IndexedRows:
+    return _IndexedRows(operations.get_catalog(), lambda pair: pair[0].product_id)
+
+
+def _load_snapshots() -> _IndexedRows:
+    return _IndexedRows(operations.get_product_snapshots(), lambda snapshot: snapshot.product_id)
+
+
+def get_catalog(product_ids: list = None) -> list:
+    """Cached operations.get_catalog"""
+    if not _cache.enabled and product_ids is not None:
+        return operations.get_catalog(product_ids)
+    catalog = _cache.get("catalog", _load_catalog)
+    if product_ids is None:
+        return catalog
+    return catalog.select(product_ids)
+
+
+def get_product_by_id(product_id: str):
+    """Cached operations.get_product_by_id: one lookup in the catalog index"""
+    if not _cache.enabled:
+        return operations.get_product_by_id(product_id)
+    catalog = _cache.get("catalog", _load_catalog)
+    position = catalog.positions.get(product_id)
+    return catalog[position][0] if position is not None else None
+
+
+def get_all_products() -> list:
+    """Cached operations.get_all_products"""
+    return [product for product, _ in get_catalog()]
+
+
+def get_latest_prices(product_ids: list = None) -> dict:
+    """Cached operations.get_latest_prices"""
+    return {
+        product.product_id: latest
+        for product, latest in get_catalog(product_ids)
+        if latest is not None
+    }
+
+
+def get_latest_price(product_id: str):
+    """Cached operations.get_latest_price"""
+    return get_latest_prices([product_id]).get(product_id)
+
+
+def get_product_snapshots(product_ids: list = None) -> list:
+    """Cached operations.get_product_snapshots"""
+    if not _cache.enabled and product_ids is not None:
+        return operations.get_product_snapshots(product_ids)
+    snapshots = _cache.get("snapshots", _load_snapshots)
+    if product_ids is None:
+        return snapshots
+    return snapshots.select(product_ids)
+
+
+def get_data_version():
+    """Data version as last validated by the cache (see CatalogCache.version)"""
+    return _cache.version()
+
+
+def invalidate_cache():
+    """Drop cached catalog data (e.g. after writing in this process)"""
+    _cache.invalidate()
+
+
+def get_cache_metrics() -> dict:
+    """
+    Get metrics for the catalog cache
+
+    Returns:
+        dict: Cache metrics (see CatalogCache.metrics)
+    """
+    return _cache.metrics()
@@ -1,46 +1,838 @@
 """
 Database connection management
-Handles Azure SQL Database connections
+Handles Azure SQL Database (or embedded SQLite) connections
 """
 import os
 import sys
-import pyodbc
+import time
+import random
+import threading
+import functools
 import logging
+from collections import deque
+from contextlib import contextmanager, ExitStack
 
 # Add the project root directory to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from config import DB_CONNECTION_STRING
+from database.backends import backend, DatabaseError, as_datetime
+from database.instrumentation import current_timer, InstrumentedConnection
+from config import (
+    DB_CONNECTION_STRING,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_IDLE_TIMEOUT,
+    DB_POOL_VALIDATE_AFTER,
+    DB_LOGIN_TIMEOUT,
+    DB_CONNECT_RETRIES,
+    DB_RETRY_BACKOFF,
+    DB_RETRY_BACKOFF_MAX,
+    DB_BREAKER_FAILURE_THRESHOLD,
+    DB_BREAKER_RESET_TIMEOUT,
+    DB_READ_REPLICA_CONNECTION_STRING,
+    DB_READ_REPLICA_POOL_SIZE,
+    DB_REPLICA_MAX_STALENESS,
+    DB_REPLICA_CHECK_INTERVAL
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def get_connection():
+def get_connection(connection_string: str = None):
     """
     Get database connection
     
+    Opens a new, unpooled connection. Operations should use
+    db_connection() instead so connections are reused.
+    
+    Args:
+        connection_string: ODBC or sqlite:/// connection string (DB_CONNECTION_STRING if None)
+    
     Returns:
-        pyodbc.Connection: Database connection object
+        Database connection object of the active backend
         
     Raises:
         Exception: If connection fails
     """
-    if not DB_CONNECTION_STRING:
+    connection_string = connection_string or DB_CONNECTION_STRING
+    if not connection_string:
         raise ValueError("DB_CONNECTION_STRING not set in .env file")
     
     try:
-        logger.info("Connecting to Azure SQL Database...")
-        connection = pyodbc.connect(DB_CONNECTION_STRING)
-        logger.info("✓ Connected successfully")
+        logger.debug(f"Connecting to {backend.NAME} database...")
+        connection = backend.connect(connection_string, DB_LOGIN_TIMEOUT)
+        logger.debug("✓ Connected successfully")
         return connection
-    except pyodbc.Error as e:
+    except DatabaseError as e:
         logger.error(f"✗ Database connection failed: {str(e)}")
         raise
 
 
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class DatabaseUnavailableError(Exception):
+    """Raised without touching the database while the circuit breaker is open"""
+
+    def __init__(self, message: str, retry_after: float = 0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check whether a database error is transient and worth retrying
+    
+    Azure SQL: failover, throttling and network errors; SQLite: lock
+    contention. See the backend's is_transient_error.
+    """
+    return backend.is_transient_error(error)
+
+
+def connect_with_retry(
+    connect=get_connection,
+    retries: int = DB_CONNECT_RETRIES,
+    backoff: float = DB_RETRY_BACKOFF,
+    backoff_max: float = DB_RETRY_BACKOFF_MAX
+):
+    """
+    Open a connection, retrying transient errors with jittered backoff
+    
+    Uses full jitter (a random delay up to the doubled, capped backoff) so
+    workers that failed together do not retry in lockstep. Non-transient
+    errors are raised immediately.
+    
+    Returns:
+        Database connection object of the active backend
+    """
+    attempt = 0
+    while True:
+        try:
+            return connect()
+        except DatabaseError as e:
+            if attempt >= retries or not is_transient_error(e):
+                raise
+            delay = random.uniform(0, min(backoff_max, backoff * (2 ** attempt)))
+            attempt += 1
+            logger.warning(f"Transient connect error, retry {attempt}/{retries} in {delay:.2f}s: {str(e)}")
+            time.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the database is down
+    
+    - closed: calls go through; consecutive transient failures are counted.
+    - open: after `failure_threshold` failures, calls raise
+      DatabaseUnavailableError immediately for `reset_timeout` seconds.
+    - half-open: then a single trial call is let through; success closes
+      the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = DB_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = DB_BREAKER_RESET_TIMEOUT
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+        # Metrics
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def before_call(self):
+        """
+        Admit or reject a call
+        
+        Raises:
+            DatabaseUnavailableError: If the circuit is open
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+
+            now = time.monotonic()
+            if self._state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+
+            self._rejected += 1
+            retry_after = max(0.0, self.reset_timeout - (now - self._opened_at))
+            raise DatabaseUnavailableError(
+                f"Database circuit is {self._state}; failing fast",
+                retry_after=retry_after
+            )
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Database circuit closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                    logger.error(f"Database circuit opened after {self._failures} transient failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def release_trial(self):
+        """Free the half-open trial slot after a call that proved nothing either way"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of breaker state
+        
+        Returns:
+            dict: State, consecutive failures, times opened, rejected calls
+        """
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "times_opened": self._times_opened,
+                "rejected_calls": self._rejected
+            }
+
+
+class _PooledConnection:
+    """Bookkeeping wrapper around a raw driver connection"""
+
+    __slots__ = ("connection", "created_at", "last_used_at")
+
+    def __init__(self, connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used_at = now
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of database connections
+    
+    - At most `size` connections exist at once; callers wait up to
+      `timeout` seconds for one to be returned.
+    - Connections idle longer than `validate_after` seconds are validated
+      with a cheap query on checkout; recently used ones are handed out
+      as is. One that died meanwhile fails its first query and is closed
+      on checkin instead of returning to the pool.
+    - Connections older than `recycle` seconds, or idle longer than
+      `idle_timeout` seconds, are closed and replaced.
+    """
+
+    def __init__(
+        self,
+        connect=connect_with_retry,
+        size: int = DB_POOL_SIZE,
+        timeout: float = DB_POOL_TIMEOUT,
+        recycle: int = DB_POOL_RECYCLE,
+        idle_timeout: int = DB_POOL_IDLE_TIMEOUT,
+        validate_after: float = DB_POOL_VALIDATE_AFTER
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.idle_timeout = idle_timeout
+        self.validate_after = validate_after
+
+        self._idle = deque()
+        self._open_count = 0
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+
+        # Metrics
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._connections_created = 0
+        self._connections_recycled = 0
+        self._validation_failures = 0
+
+    def _is_stale(self, pooled: _PooledConnection, now: float) -> bool:
+        """Check whether a connection exceeded its lifetime or idle limit"""
+        if self.recycle and now - pooled.created_at > self.recycle:
+            return True
+        if self.idle_timeout and now - pooled.last_used_at > self.idle_timeout:
+            return True
+        return False
+
+    def _validate(self, pooled: _PooledConnection) -> bool:
+        """Run a cheap round trip to confirm the connection is alive"""
+        try:
+            cursor = pooled.connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except DatabaseError:
+            return False
+
+    def _discard(self, pooled: _PooledConnection):
+        """Close a connection and free its slot"""
+        try:
+            pooled.connection.close()
+        except DatabaseError:
+            pass
+        with self._lock:
+            self._open_count -= 1
+            self._available.notify()
+
+    def _acquire(self) -> _PooledConnection:
+        """Take an idle connection or reserve a slot for a new one"""
+        start = time.monotonic()
+        waited = False
+
+        with self._lock:
+            while not self._idle and self._open_count >= self.size:
+                waited = True
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool size {self.size})"
+                    )
+                self._available.wait(remaining)
+
+            wait_time = time.monotonic() - start
+            self._checkouts += 1
+            self._wait_time_total += wait_time
+            self._wait_time_max = max(self._wait_time_max, wait_time)
+            if waited:
+                self._waits += 1
+
+            if self._idle:
+                # LIFO keeps the hottest connections in use and lets
+                # rarely used ones age out through idle_timeout
+                return self._idle.pop()
+
+            self._open_count += 1
+
+        try:
+            pooled = _PooledConnection(self._connect())
+        except Exception:
+            with self._lock:
+                self._open_count -= 1
+                self._available.notify()
+            raise
+
+        with self._lock:
+            self._connections_created += 1
+        return pooled
+
+    def checkout(self) -> _PooledConnection:
+        """
+        Check out a validated connection
+        
+        Returns:
+            _PooledConnection: Wrapper holding a live connection
+            
+        Raises:
+            PoolTimeoutError: If the pool stays saturated past the timeout
+        """
+        while True:
+            pooled = self._acquire()
+            now = time.monotonic()
+
+            if self._is_stale(pooled, now):
+                with self._lock:
+                    self._connections_recycled += 1
+                self._discard(pooled)
+                continue
+
+            # Freshly opened connections have just completed a handshake,
+            # and recently used ones answered a query moments ago
+            if (
+                pooled.last_used_at != pooled.created_at
+                and now - pooled.last_used_at > self.validate_after
+                and not self._validate(pooled)
+            ):
+                logger.warning("Discarding dead pooled connection")
+                with self._lock:
+                    self._validation_failures += 1
+                self._discard(pooled)
+                continue
+
+            pooled.last_used_at = now
+            return pooled
+
+    def checkin(self, pooled: _PooledConnection, broken: bool = False):
+        """
+        Return a connection to the pool
+        
+        Args:
+            pooled: Connection previously returned by checkout()
+            broken: Close the connection instead of reusing it
+        """
+        if not broken:
+            try:
+                # Never hand an open transaction to the next caller
+                pooled.connection.rollback()
+            except DatabaseError:
+                broken = True
+
+        if broken:
+            self._discard(pooled)
+            return
+
+        pooled.last_used_at = time.monotonic()
+        with self._lock:
+            self._idle.append(pooled)
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager yielding a pooled connection
+        
+        The connection is rolled back and returned to the pool on exit,
+        or closed if a database error was raised while it was in use.
+        """
+        pooled = self.checkout()
+        broken = False
+        try:
+            yield pooled.connection
+        except DatabaseError:
+            broken = True
+            raise
+        finally:
+            self.checkin(pooled, broken=broken)
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of pool usage counters
+        
+        Returns:
+            dict: Pool size, utilisation, checkout wait times and churn
+        """
+        with self._lock:
+            in_use = self._open_count - len(self._idle)
+            return {
+                "size": self.size,
+                "open": self._open_count,
+                "idle": len(self._idle),
+                "in_use": in_use,
+                "saturation": round(in_use / self.size, 3),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_total_ms": round(self._wait_time_total * 1000, 3),
+                "wait_time_avg_ms": round(self._wait_time_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "wait_time_max_ms": round(self._wait_time_max * 1000, 3),
+                "connections_created": self._connections_created,
+                "connections_recycled": self._connections_recycled,
+                "validation_failures": self._validation_failures
+            }
+
+
+# Catalog writes stamp updated_at on both tables, so the newest stamp tells
+# how far a replica has caught up
+_FRESHNESS_SQL = """
+    SELECT 
+        (SELECT MAX(updated_at) FROM current_prices),
+        (SELECT MAX(updated_at) FROM products),
+        GETDATE()
+"""
+
+
+def _freshness_marker(connection) -> tuple:
+    """Return (newest updated_at, server time) seen through a connection"""
+    cursor = connection.cursor()
+    cursor.execute(_FRESHNESS_SQL)
+    prices_updated, products_updated, now = cursor.fetchone()
+    cursor.close()
+    stamps = [as_datetime(stamp) for stamp in (prices_updated, products_updated) if stamp is not None]
+    return (max(stamps) if stamps else None), as_datetime(now)
+
+
+class ReplicaRouter:
+    """
+    Decide whether a read-only query may run on the read replica
+    
+    Every `check_interval` seconds one caller compares the newest
+    updated_at stamp visible on the replica with the primary's. If the
+    replica is behind, its staleness is bounded by the primary's clock
+    minus the replica's newest stamp; reads go to the replica only while
+    that bound is within `max_staleness`. Failed checks or replica errors
+    send reads to the primary for at least `check_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        max_staleness: float = DB_REPLICA_MAX_STALENESS,
+        check_interval: float = DB_REPLICA_CHECK_INTERVAL
+    ):
+        self.max_staleness = max_staleness
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._healthy = False
+        self._checking = False
+        self._checked_at = None
+        self._staleness = None
+
+        # Metrics
+        self._replica_reads = 0
+        self._primary_reads = 0
+        self._replica_failures = 0
+        self._checks = 0
+        self._check_failures = 0
+
+    def _measure(self) -> float:
+        """Seconds the replica may be behind the primary (raises on error)"""
+        with get_pool().connection() as conn:
+            primary_marker, primary_now = _freshness_marker(conn)
+        with get_replica_pool().connection() as conn:
+            replica_marker, _ = _freshness_marker(conn)
+
+        if primary_marker is None or (replica_marker is not None and replica_marker >= primary_marker):
+            return 0.0
+        if replica_marker is None:
+            return float("inf")
+        return max(0.0, (primary_now - replica_marker).total_seconds())
+
+    def _check(self):
+        """Refresh the routing decision (only one caller at a time)"""
+        try:
+            staleness = self._measure()
+            healthy = staleness <= self.max_staleness
+            if not healthy:
+                logger.warning(f"Read replica is up to {staleness:.1f}s behind; reading from primary")
+        except (DatabaseError, PoolTimeoutError) as e:
+            logger.warning(f"Read replica check failed; reading from primary: {str(e)}")
+            staleness, healthy = None, False
+            with self._lock:
+                self._check_failures += 1
+
+        with self._lock:
+            self._checks += 1
+            self._staleness = staleness
+            self._healthy = healthy
+            self._checked_at = time.monotonic()
+            self._checking = False
+
+    def use_replica(self) -> bool:
+        """
+        Route one read-only query
+        
+        Returns:
+            bool: True to use the replica pool, False for the primary
+        """
+        with self._lock:
+            now = time.monotonic()
+            due = self._checked_at is None or now - self._checked_at >= self.check_interval
+            if due and not self._checking:
+                self._checking = True
+            else:
+                due = False
+
+        if due:
+            self._check()
+
+        with self._lock:
+            if self._healthy:
+                self._replica_reads += 1
+            else:
+                self._primary_reads += 1
+            return self._healthy
+
+    def mark_unhealthy(self):
+        """Send reads to the primary until the next check, check_interval from now"""
+        with self._lock:
+            self._healthy = False
+            self._replica_failures += 1
+            self._checked_at = time.monotonic()
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of routing state
+        
+        Returns:
+            dict: Routing decision, measured staleness and read counts
+        """
+        with self._lock:
+            return {
+                "enabled": True,
+                "routing_to_replica": self._healthy,
+                "staleness_seconds": round(self._staleness, 3) if self._staleness not in (None, float("inf")) else None,
+                "max_staleness_seconds": self.max_staleness,
+                "replica_reads": self._replica_reads,
+                "primary_reads": self._primary_reads,
+                "replica_failures": self._replica_failures,
+                "checks": self._checks,
+                "check_failures": self._check_failures
+            }
+
+
+_pool = None
+_replica_pool = None
+_pool_lock = threading.Lock()
+_breaker = CircuitBreaker()
+# Separate breaker so a failing replica never fails primary reads fast
+_replica_breaker = CircuitBreaker()
+_router = ReplicaRouter() if DB_READ_REPLICA_CONNECTION_STRING else None
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Get the process-wide connection pool, creating it on first use
+    
+    Returns:
+        ConnectionPool: Shared connection pool
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def get_replica_pool() -> ConnectionPool:
+    """
+    Get the read-replica connection pool, creating it on first use
+    
+    Returns:
+        ConnectionPool: Pool of connections to DB_READ_REPLICA_CONNECTION_STRING
+    """
+    global _replica_pool
+    if _replica_pool is None:
+        with _pool_lock:
+            if _replica_pool is None:
+                _replica_pool = ConnectionPool(
+                    connect=functools.partial(
+                        connect_with_retry,
+                        functools.partial(get_connection, DB_READ_REPLICA_CONNECTION_STRING)
+                    ),
+                    size=DB_READ_REPLICA_POOL_SIZE
+                )
+    return _replica_pool
+
+
+def close_pools():
+    """Close idle connections of the primary and replica pools"""
+    for pool in (_pool, _replica_pool):
+        if pool is not None:
+            pool.close()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Get the process-wide database circuit breaker"""
+    return _breaker
+
+
+@contextmanager
+def _borrow(pool: ConnectionPool):
+    """
+    Check out a pooled connection for the running instrumented operation
+    
+    Pool wait and connect time count as the operation's connect phase and
+    the connection is wrapped so statements and fetches are timed. Outside
+    an instrumented operation the raw connection is yielded.
+    """
+    timer = current_timer()
+    if timer is None:
+        with pool.connection() as conn:
+            yield conn
+        return
+    
+    start = time.perf_counter()
+    try:
+        with pool.connection() as conn:
+            timer.connect += time.perf_counter() - start
+            yield InstrumentedConnection(conn, timer)
+    except (DatabaseError, PoolTimeoutError):
+        timer.errors += 1
+        raise
+
+
+def _replica_error(error: Exception) -> bool:
+    """
+    Record a replica failure with the replica breaker and router
+
+    Returns:
+        bool: True if the replica is unusable (connectivity, pool
+              exhaustion) and the read should move to the primary
+    """
+    if isinstance(error, DatabaseError) and not is_transient_error(error):
+        # The replica answered, the query itself failed; it would fail on the primary too
+        _replica_breaker.record_success()
+        return False
+    _replica_breaker.record_failure()
+    _router.mark_unhealthy()
+    logger.warning(f"Read replica failed; reading from primary: {str(error)}")
+    return True
+
+
+def _replica_connection(stack: ExitStack):
+    """
+    Check out a replica connection onto stack
+
+    Returns:
+        Connection, or None if the replica circuit is open or the checkout
+        failed and the read should go to the primary
+    """
+    try:
+        _replica_breaker.before_call()
+    except DatabaseUnavailableError:
+        return None
+    timer = current_timer()
+    errors = timer.errors if timer is not None else 0
+    try:
+        return stack.enter_context(_borrow(get_replica_pool()))
+    except (DatabaseError, PoolTimeoutError) as e:
+        if not _replica_error(e):
+            raise
+        if timer is not None:
+            # Served by the primary instead; not an operation error
+            timer.errors = errors
+        return None
+
+
+@contextmanager
+def db_connection(read_only: bool = False):
+    """
+    Borrow a connection from the shared pool, guarded by the circuit breaker
+    
+    Transient database errors (on connect or inside the block) count
+    towards opening the circuit; once open, this raises
+    DatabaseUnavailableError immediately instead of waiting on a login
+    timeout. Operations only catch DatabaseError, so that error reaches
+    the caller rather than turning into an empty result.
+    
+    Args:
+        read_only: The block only reads; it may run on the read replica
+            when one is configured and within DB_REPLICA_MAX_STALENESS.
+            Replica failures have their own breaker and send reads to the
+            primary: a failed checkout falls back at once, a failure inside
+            the block is rerun by the instrumented operation.
+    
+    Example:
+        >>> with db_connection(read_only=True) as conn:
+        ...     cursor = conn.cursor()
+        ...     cursor.execute("SELECT 1")
+    """
+    if read_only and _router is not None and _router.use_replica():
+        with ExitStack() as stack:
+            conn = _replica_connection(stack)
+            if conn is not None:
+                try:
+                    yield conn
+                except (DatabaseError, PoolTimeoutError) as e:
+                    if not _replica_error(e):
+                        raise
+                    # The block cannot be replayed here; the instrumented
+                    # operation reruns it, and the router now picks the primary
+                    timer = current_timer()
+                    if timer is not None:
+                        timer.replica_failed = True
+                    raise
+                except BaseException:
+                    _replica_breaker.release_trial()
+                    raise
+                else:
+                    _replica_breaker.record_success()
+                return
+    
+    _breaker.before_call()
+    try:
+        with _borrow(get_pool()) as conn:
+            yield conn
+    except DatabaseError as e:
+        if is_transient_error(e):
+            _breaker.record_failure()
+        else:
+            # The server answered, so it is reachable
+            _breaker.record_success()
+        raise
+    except BaseException:
+        _breaker.release_trial()
+        raise
+    else:
+        _breaker.record_success()
+
+
+def get_pool_metrics() -> dict:
+    """
+    Get metrics for the shared connection pool
+    
+    Returns:
+        dict: Pool metrics (see ConnectionPool.metrics)
+    """
+    return get_pool().metrics()
+
+
+def get_circuit_metrics() -> dict:
+    """
+    Get metrics for the database circuit breaker
+    
+    Returns:
+        dict: Breaker metrics (see CircuitBreaker.metrics)
+    """
+    return _breaker.metrics()
+
+
+def get_replica_metrics() -> dict:
+    """
+    Get read-replica routing metrics
+    
+    Returns:
+        dict: Routing metrics (see ReplicaRouter.metrics), or
+              {"enabled": False} without a replica
+    """
+    if _router is None:
+        return {"enabled": False}
+    return {**_router.metrics(), "circuit": _replica_breaker.metrics()}
+
+
 def test_connection():
     """
     Test database connection
@@ -49,12 +841,11 @@ def test_connection():
         bool: True if connection successful
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT @@VERSION")
-        version = cursor.fetchone()[0]
-        logger.info(f"Database version: {version[:50]}...")
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(backend.SQL["server_version"])
+            version = cursor.fetchone()[0]
+            logger.info(f"Database version: {version[:50]}...")
         return True
     except Exception as e:
         logger.error(f"Connection test failed: {str(e)}")
@@ -0,0 +1,330 @@
+"""
+Query instrumentation for database operations
+Records per-operation wall time, split into connect / execute / fetch time,
+rows returned, statement count and errors. Results feed process-wide
+histograms (exported in Prometheus text format by /metrics) and, when a
+request summary is active, a per-request list used to spot slow queries and
+N+1 patterns.
+
+Operations opt in with the @instrumented decorator; db_connection() and the
+cursor proxies below attribute time to the operation running in the
+current context.
+"""
+import time
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+
+# Upper bounds in seconds; rows use their own buckets
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+PHASES = ("total", "connect", "execute", "fetch")
+
+_current_operation = contextvars.ContextVar("db_current_operation", default=None)
+_request_summary = contextvars.ContextVar("db_request_summary", default=None)
+
+
+class _Histogram:
+    """Cumulative-bucket histogram (caller holds the registry lock)"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        """Yield (upper bound, cumulative count) pairs, ending with +Inf"""
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield bound, running
+        yield "+Inf", self.count
+
+
+class OperationTimer:
+    """Timings of one instrumented operation call"""
+
+    __slots__ = ("name", "connect", "execute", "fetch", "rows", "queries", "errors", "replica_failed")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.connect = 0.0
+        self.execute = 0.0
+        self.fetch = 0.0
+        self.rows = 0
+        self.queries = 0
+        self.errors = 0
+        # Set by db_connection when a read on the replica failed mid-query
+        self.replica_failed = False
+
+
+class QueryMetrics:
+    """Thread-safe per-operation histograms and counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._rows = {}
+        self._calls = {}
+        self._queries = {}
+        self._errors = {}
+
+    def record(self, timer: OperationTimer, total: float):
+        with self._lock:
+            name = timer.name
+            if name not in self._calls:
+                self._durations[name] = {phase: _Histogram(DURATION_BUCKETS) for phase in PHASES}
+                self._rows[name] = _Histogram(ROW_BUCKETS)
+                self._calls[name] = 0
+                self._queries[name] = 0
+                self._errors[name] = 0
+
+            durations = self._durations[name]
+            durations["total"].observe(total)
+            durations["connect"].observe(timer.connect)
+            durations["execute"].observe(timer.execute)
+            durations["fetch"].observe(timer.fetch)
+            self._rows[name].observe(timer.rows)
+            self._calls[name] += 1
+            self._queries[name] += timer.queries
+            self._errors[name] += 1 if timer.errors else 0
+
+    def render_prometheus(self) -> str:
+        """
+        Export all metrics in the Prometheus text exposition format
+
+        Returns:
+            str: Metric families for db operation durations, rows, calls,
+                 statements and errors
+        """
+        lines = [
+            "# HELP db_operation_duration_seconds Database operation time by phase",
+            "# TYPE db_operation_duration_seconds histogram"
+        ]
+        with self._lock:
+            names = sorted(self._calls)
+            for name in names:
+                for phase in PHASES:
+                    histogram = self._durations[name][phase]
+                    labels = f'operation="{name}",phase="{phase}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'db_operation_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f"db_operation_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+                    lines.append(f"db_operation_duration_seconds_count{{{labels}}} {histogram.count}")
+
+            lines.append("# HELP db_operation_rows Rows fetched per database operation call")
+            lines.append("# TYPE db_operation_rows histogram")
+            for name in names:
+                histogram = self._rows[name]
+                labels = f'operation="{name}"'
+                for bound, count in histogram.cumulative():
+                    lines.append(f'db_operation_rows_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"db_operation_rows_sum{{{labels}}} {int(histogram.sum)}")
+                lines.append(f"db_operation_rows_count{{{labels}}} {histogram.count}")
+
+            for metric, help_text, values in (
+                ("db_operation_calls_total", "Database operation calls", self._calls),
+                ("db_operation_queries_total", "SQL statements executed by database operations", self._queries),
+                ("db_operation_errors_total", "Database operation calls that hit a database error", self._errors)
+            ):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                for name in names:
+                    lines.append(f'{metric}{{operation="{name}"}} {values[name]}')
+
+        return "\n".join(lines) + "\n"
+
+
+_metrics = QueryMetrics()
+
+
+def get_query_metrics() -> QueryMetrics:
+    """Get the process-wide query metrics registry"""
+    return _metrics
+
+
+def instrumented(func):
+    """
+    Record timings for a database operation
+
+    Nested instrumented calls are attributed to the outermost operation.
+    If a read failed on the replica (whether the operation raised or
+    turned the error into an empty result), the operation runs once more;
+    db_connection sends that run to the primary.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _current_operation.get() is not None:
+            return func(*args, **kwargs)
+
+        timer = OperationTimer(func.__name__)
+        token = _current_operation.set(timer)
+        start = time.perf_counter()
+        try:
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                if not timer.replica_failed:
+                    raise
+            else:
+                if not timer.replica_failed:
+                    return result
+            timer.replica_failed = False
+            timer.errors = 0
+            return func(*args, **kwargs)
+        except Exception:
+            timer.errors += 1
+            raise
+        finally:
+            total = time.perf_counter() - start
+            _current_operation.reset(token)
+            _metrics.record(timer, total)
+            summary = _request_summary.get()
+            if summary is not None:
+                summary.append({
+                    "operation": timer.name,
+                    "total_ms": round(total * 1000, 3),
+                    "connect_ms": round(timer.connect * 1000, 3),
+                    "execute_ms": round(timer.execute * 1000, 3),
+                    "fetch_ms": round(timer.fetch * 1000, 3),
+                    "rows": timer.rows,
+                    "queries": timer.queries,
+                    "error": bool(timer.errors)
+                })
+    return wrapper
+
+
+def current_timer():
+    """The OperationTimer of the operation running in this context, or None"""
+    return _current_operation.get()
+
+
+class RequestSummary(list):
+    """Operations run while handling one request, plus a degraded-result flag"""
+    __slots__ = ("degraded",)
+
+    def __init__(self):
+        super().__init__()
+        self.degraded = False
+
+
+@contextmanager
+def request_summary():
+    """
+    Collect the operations run while handling one request
+
+    Yields:
+        RequestSummary: One dict per instrumented operation call, in completion order
+    """
+    summary = RequestSummary()
+    token = _request_summary.set(summary)
+    try:
+        yield summary
+    finally:
+        _request_summary.reset(token)
+
+
+def mark_request_degraded():
+    """Flag the current request's result as incomplete (e.g. served from stale data)"""
+    summary = _request_summary.get()
+    if summary is not None:
+        summary.degraded = True
+
+
+def request_degraded() -> bool:
+    """
+    Check whether the current request's result may be incomplete
+
+    Operations turn database errors into empty results, so a failed
+    operation anywhere in the request counts, as does mark_request_degraded().
+
+    Returns:
+        bool: False outside a request_summary() block
+    """
+    summary = _request_summary.get()
+    if summary is None:
+        return False
+    return summary.degraded or any(op["error"] for op in summary)
+
+
+class InstrumentedCursor:
+    """pyodbc cursor proxy that times statements and counts fetched rows"""
+
+    __slots__ = ("_cursor", "_timer")
+
+    def __init__(self, cursor, timer: OperationTimer):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_timer", timer)
+
+    def _timed(self, phase: str, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        except Exception:
+            self._timer.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            if phase == "execute":
+                self._timer.execute += elapsed
+                self._timer.queries += 1
+            else:
+                self._timer.fetch += elapsed
+
+    def execute(self, *args):
+        self._timed("execute", self._cursor.execute, *args)
+        return self
+
+    def executemany(self, *args):
+        self._timed("execute", self._cursor.executemany, *args)
+        return self
+
+    def fetchone(self):
+        row = self._timed("fetch", self._cursor.fetchone)
+        if row is not None:
+            self._timer.rows += 1
+        return row
+
+    def fetchmany(self, size: int = None):
+        rows = self._timed("fetch", self._cursor.fetchmany, *(() if size is None else (size,)))
+        self._timer.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed("fetch", self._cursor.fetchall)
+        self._timer.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+
+class InstrumentedConnection:
+    """pyodbc connection proxy handing out InstrumentedCursor objects"""
+
+    __slots__ = ("_connection", "_timer")
+
+    def __init__(self, connection, timer: OperationTimer):
+        self._connection = connection
+        self._timer = timer
+
+    def cursor(self):
+        return InstrumentedCursor(self._connection.cursor(), self._timer)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
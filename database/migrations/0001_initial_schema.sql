@@ -0,0 +1,25 @@
+-- Core catalog and price history tables
+-- Guarded so databases created before migrations existed are adopted as-is
+
+IF OBJECT_ID('dbo.products', 'U') IS NULL
+CREATE TABLE dbo.products (
+    product_id   NVARCHAR(100)  NOT NULL PRIMARY KEY,
+    brand        NVARCHAR(50)   NOT NULL,
+    model        NVARCHAR(200)  NOT NULL,
+    product_url  NVARCHAR(1000) NOT NULL,
+    created_at   DATETIME2      NOT NULL DEFAULT GETDATE(),
+    updated_at   DATETIME2      NOT NULL DEFAULT GETDATE()
+);
+GO
+
+IF OBJECT_ID('dbo.price_history', 'U') IS NULL
+CREATE TABLE dbo.price_history (
+    id            INT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+    product_id    NVARCHAR(100)  NOT NULL REFERENCES dbo.products(product_id),
+    price         DECIMAL(10,2)  NULL,
+    currency      NVARCHAR(10)   NOT NULL DEFAULT 'USD',
+    availability  NVARCHAR(50)   NOT NULL DEFAULT 'Unknown',
+    promo_text    NVARCHAR(1000) NULL,
+    scraped_at    DATETIME2      NOT NULL DEFAULT GETDATE()
+);
+GO
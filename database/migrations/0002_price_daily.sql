@@ -0,0 +1,19 @@
+-- Daily OHLC rollup of price_history, one row per product per day.
+-- Maintained by the ingest path; rebuild with: python -m database.backfill_rollup
+
+IF OBJECT_ID('dbo.price_daily', 'U') IS NULL
+CREATE TABLE dbo.price_daily (
+    product_id    NVARCHAR(100)  NOT NULL REFERENCES dbo.products(product_id),
+    price_date    DATE           NOT NULL,
+    open_price    DECIMAL(10,2)  NULL,
+    high_price    DECIMAL(10,2)  NULL,
+    low_price     DECIMAL(10,2)  NULL,
+    close_price   DECIMAL(10,2)  NULL,
+    price_sum     DECIMAL(18,2)  NULL,
+    price_count   INT            NOT NULL,
+    sample_count  INT            NOT NULL,
+    availability  NVARCHAR(50)   NULL,
+    updated_at    DATETIME2      NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_price_daily PRIMARY KEY (product_id, price_date)
+);
+GO
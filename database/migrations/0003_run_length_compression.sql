@@ -0,0 +1,11 @@
+-- Run-length compression: identical consecutive observations on the
+-- same day extend one price_history row instead of adding new ones
+
+IF COL_LENGTH('dbo.price_history', 'last_seen_at') IS NULL
+    ALTER TABLE dbo.price_history ADD last_seen_at DATETIME2 NULL;
+GO
+
+IF COL_LENGTH('dbo.price_history', 'observation_count') IS NULL
+    ALTER TABLE dbo.price_history ADD observation_count INT NOT NULL
+        CONSTRAINT DF_price_history_observation_count DEFAULT 1;
+GO
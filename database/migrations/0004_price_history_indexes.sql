@@ -0,0 +1,29 @@
+-- Covering index for the hot reads: latest price per product, snapshots,
+-- trend windows and keyset-paginated history all seek on
+-- (product_id, scraped_at DESC). History pages order by
+-- (scraped_at DESC, id DESC), so id is an explicit descending key column;
+-- the clustered key carried as the row locator is ascending and could not
+-- serve that order.
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_price_history_product_scraped_id'
+               AND object_id = OBJECT_ID('dbo.price_history'))
+CREATE NONCLUSTERED INDEX IX_price_history_product_scraped_id
+    ON dbo.price_history (product_id, scraped_at DESC, id DESC)
+    INCLUDE (price, currency, availability, promo_text, last_seen_at, observation_count);
+GO
+
+-- Date-range scans across all products (rollup backfill, retention)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_price_history_scraped'
+               AND object_id = OBJECT_ID('dbo.price_history'))
+CREATE NONCLUSTERED INDEX IX_price_history_scraped
+    ON dbo.price_history (scraped_at)
+    INCLUDE (product_id);
+GO
+
+-- Catalog listing order
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_products_brand_model'
+               AND object_id = OBJECT_ID('dbo.products'))
+CREATE NONCLUSTERED INDEX IX_products_brand_model
+    ON dbo.products (brand, model)
+    INCLUDE (product_url, created_at, updated_at);
+GO
@@ -0,0 +1,32 @@
+-- Materialized latest observation per product, kept up to date by the
+-- ingest path in the same transaction as the price_history write
+
+IF OBJECT_ID('dbo.current_prices', 'U') IS NULL
+CREATE TABLE dbo.current_prices (
+    product_id        NVARCHAR(100)  NOT NULL PRIMARY KEY REFERENCES dbo.products(product_id),
+    price_history_id  INT            NOT NULL,
+    price             DECIMAL(10,2)  NULL,
+    currency          NVARCHAR(10)   NOT NULL,
+    availability      NVARCHAR(50)   NOT NULL,
+    promo_text        NVARCHAR(1000) NULL,
+    scraped_at        DATETIME2      NOT NULL,
+    last_seen_at      DATETIME2      NOT NULL,
+    updated_at        DATETIME2      NOT NULL DEFAULT GETDATE()
+);
+GO
+
+-- Seed from existing history
+INSERT INTO dbo.current_prices
+    (product_id, price_history_id, price, currency, availability, promo_text, scraped_at, last_seen_at)
+SELECT 
+    latest.product_id, latest.id, latest.price, latest.currency, latest.availability,
+    latest.promo_text, latest.scraped_at, COALESCE(latest.last_seen_at, latest.scraped_at)
+FROM dbo.products p
+CROSS APPLY (
+    SELECT TOP 1 *
+    FROM dbo.price_history ph
+    WHERE ph.product_id = p.product_id
+    ORDER BY ph.scraped_at DESC, ph.id DESC
+) latest
+WHERE NOT EXISTS (SELECT 1 FROM dbo.current_prices cp WHERE cp.product_id = p.product_id);
+GO
@@ -0,0 +1,18 @@
+-- Keyset-paginated history orders by (scraped_at DESC, id DESC) and pages
+-- with scraped_at <= ? AND (scraped_at < ? OR id < ?). With id as an
+-- explicit descending key column both the seek and the order come from
+-- this index, so a page costs the same however long the history is.
+-- 0004 now creates it; databases that applied the earlier 0004 get it
+-- here, replacing IX_price_history_product_scraped (no id key).
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_price_history_product_scraped_id'
+               AND object_id = OBJECT_ID('dbo.price_history'))
+CREATE NONCLUSTERED INDEX IX_price_history_product_scraped_id
+    ON dbo.price_history (product_id, scraped_at DESC, id DESC)
+    INCLUDE (price, currency, availability, promo_text, last_seen_at, observation_count);
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_price_history_product_scraped'
+           AND object_id = OBJECT_ID('dbo.price_history'))
+DROP INDEX IX_price_history_product_scraped ON dbo.price_history;
+GO
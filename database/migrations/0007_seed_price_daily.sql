@@ -0,0 +1,63 @@
+-- Seed price_daily from existing history. 0002 created the rollup empty
+-- and ingest only refreshes the days it touches, so lifetime statistics,
+-- snapshots and rollups read nothing for older days until this runs.
+-- Only (product, day) pairs missing from price_daily are built; days the
+-- ingest path already refreshed are left as they are. Same aggregates as
+-- the refresh_price_daily statement.
+
+WITH day_rows AS (
+    SELECT
+        product_id, CAST(scraped_at AS DATE) AS price_date, price, availability,
+        scraped_at, observation_count
+    FROM dbo.price_history ph
+    WHERE NOT EXISTS (
+        SELECT 1 FROM dbo.price_daily pd
+        WHERE pd.product_id = ph.product_id AND pd.price_date = CAST(ph.scraped_at AS DATE)
+    )
+),
+ranked AS (
+    SELECT
+        product_id, price_date, price, observation_count,
+        ROW_NUMBER() OVER (
+            PARTITION BY product_id, price_date
+            ORDER BY CASE WHEN price IS NULL THEN 1 ELSE 0 END, scraped_at ASC
+        ) AS rn_open,
+        ROW_NUMBER() OVER (
+            PARTITION BY product_id, price_date
+            ORDER BY CASE WHEN price IS NULL THEN 1 ELSE 0 END, scraped_at DESC
+        ) AS rn_close
+    FROM day_rows
+),
+daily AS (
+    SELECT
+        product_id, price_date,
+        MAX(CASE WHEN rn_open = 1 THEN price END) AS open_price,
+        MAX(price) AS high_price,
+        MIN(price) AS low_price,
+        MAX(CASE WHEN rn_close = 1 THEN price END) AS close_price,
+        SUM(price * observation_count) AS price_sum,
+        SUM(CASE WHEN price IS NOT NULL THEN observation_count ELSE 0 END) AS price_count,
+        SUM(observation_count) AS sample_count
+    FROM ranked
+    GROUP BY product_id, price_date
+),
+dominant_availability AS (
+    SELECT
+        product_id, price_date, availability,
+        ROW_NUMBER() OVER (
+            PARTITION BY product_id, price_date
+            ORDER BY SUM(observation_count) DESC, MAX(scraped_at) DESC
+        ) AS rn
+    FROM day_rows
+    GROUP BY product_id, price_date, availability
+)
+INSERT INTO dbo.price_daily
+    (product_id, price_date, open_price, high_price, low_price, close_price,
+     price_sum, price_count, sample_count, availability)
+SELECT
+    d.product_id, d.price_date, d.open_price, d.high_price, d.low_price, d.close_price,
+    d.price_sum, d.price_count, d.sample_count, a.availability
+FROM daily d
+JOIN dominant_availability a
+    ON a.product_id = d.product_id AND a.price_date = d.price_date AND a.rn = 1;
+GO
@@ -0,0 +1,162 @@
+"""
+Versioned schema migrations
+Numbered SQL files (NNNN_name.sql) are applied in order, each in its own
+transaction together with its schema_migrations row, so a failing script
+leaves no partial schema behind. SQL Server scripts live in this package,
+SQLite scripts with the same versions in sqlite/.
+"""
+import os
+import re
+import sys
+import logging
+from collections import namedtuple
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from database.backends import backend, DatabaseError
+from database.connection import db_connection
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = backend.MIGRATIONS_DIR
+
+Migration = namedtuple("Migration", ["version", "name", "path"])
+
+_MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+_BATCH_SEPARATOR = re.compile(r"^\s*GO\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+def load_migrations() -> list:
+    """
+    Discover migration files
+    
+    Returns:
+        list: Migration tuples sorted by version
+    """
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append(Migration(
+                version=int(match.group(1)),
+                name=match.group(2),
+                path=os.path.join(MIGRATIONS_DIR, filename)
+            ))
+    migrations.sort(key=lambda m: m.version)
+    
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError("Duplicate migration version numbers")
+    
+    return migrations
+
+
+def latest_version() -> int:
+    """Version the code expects the database to be at"""
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def _split_batches(sql: str) -> list:
+    """Split a script on GO separators, as sqlcmd/SSMS do"""
+    return [batch.strip() for batch in _BATCH_SEPARATOR.split(sql) if batch.strip()]
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute(backend.SQL["create_migrations_table"])
+
+
+def _applied_version(cursor) -> int:
+    """Highest applied version, 0 if migrations have never run"""
+    cursor.execute(backend.SQL["migrations_table_exists"])
+    if cursor.fetchone()[0] is None:
+        return 0
+    cursor.execute("SELECT MAX(version) FROM schema_migrations")
+    return cursor.fetchone()[0] or 0
+
+
+def get_applied_version() -> int:
+    """
+    Get the schema version recorded in the database
+    
+    Returns:
+        int: Highest applied migration version (0 if none)
+    """
+    with db_connection() as conn:
+        return _applied_version(conn.cursor())
+
+
+def apply_migrations(target: int = None) -> list:
+    """
+    Apply pending migrations up to target (latest if None)
+    
+    Args:
+        target: Version to migrate to
+        
+    Returns:
+        list: Versions applied by this call
+        
+    Raises:
+        DatabaseError: If a migration fails; it is rolled back and later
+            migrations are not attempted
+    """
+    migrations = load_migrations()
+    if target is None:
+        target = migrations[-1].version if migrations else 0
+    
+    applied = []
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        _ensure_migrations_table(cursor)
+        conn.commit()
+        
+        current = _applied_version(cursor)
+        for migration in migrations:
+            if migration.version <= current or migration.version > target:
+                continue
+            
+            logger.info(f"Applying migration {migration.version:04d}_{migration.name}...")
+            with open(migration.path, encoding="utf-8") as f:
+                batches = _split_batches(f.read())
+            
+            try:
+                # Explicit BEGIN where the driver would otherwise autocommit DDL
+                if backend.SQL["begin_transaction"]:
+                    cursor.execute(backend.SQL["begin_transaction"])
+                for batch in batches:
+                    cursor.execute(batch)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (?, ?)",
+                    (migration.version, migration.name)
+                )
+                conn.commit()
+            except DatabaseError as e:
+                conn.rollback()
+                logger.error(f"✗ Migration {migration.version:04d}_{migration.name} failed: {str(e)}")
+                raise
+            
+            applied.append(migration.version)
+            logger.info(f"✓ Applied migration {migration.version:04d}_{migration.name}")
+    
+    return applied
+
+
+def check_schema_version() -> dict:
+    """
+    Compare the database schema version with the migrations in the code
+    
+    Returns:
+        dict: applied, expected and up_to_date; applied is None and
+              error is set if the database could not be reached
+    """
+    expected = latest_version()
+    try:
+        applied = get_applied_version()
+    except Exception as e:
+        return {"applied": None, "expected": expected, "up_to_date": False, "error": str(e)}
+    
+    return {"applied": applied, "expected": expected, "up_to_date": applied >= expected}
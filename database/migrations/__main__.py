@@ -0,0 +1,32 @@
+"""
+Schema migration command
+Run with: python -m database.migrations [--check] [--target N]
+"""
+import sys
+import argparse
+
+from database.migrations import apply_migrations, check_schema_version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--check", action="store_true", help="Only report the applied and expected versions")
+    parser.add_argument("--target", type=int, help="Migrate up to this version (default: latest)")
+    args = parser.parse_args()
+
+    status = check_schema_version()
+    print(f"Schema version: applied={status['applied']} expected={status['expected']}")
+
+    if args.check:
+        sys.exit(0 if status["up_to_date"] else 1)
+
+    try:
+        applied = apply_migrations(args.target)
+    except Exception as e:
+        print(f"✗ Migration failed: {str(e)}")
+        sys.exit(1)
+
+    if applied:
+        print(f"✓ Applied migrations: {', '.join(f'{v:04d}' for v in applied)}")
+    else:
+        print("✓ Schema already up to date")
@@ -0,0 +1,27 @@
+-- Core catalog and price history tables
+-- Datetimes are ISO 8601 text ("YYYY-MM-DD HH:MM:SS.ffffff", local time),
+-- which sorts chronologically. Their columns are declared DATETIME (DATE
+-- for days) so the sqlite3 module converts them on read; that type's
+-- NUMERIC affinity leaves ISO text as text. AUTOINCREMENT keeps ids
+-- monotonic like IDENTITY, so MAX(id) stays a valid high-water mark after deletes.
+
+CREATE TABLE IF NOT EXISTS products (
+    product_id   TEXT     NOT NULL PRIMARY KEY,
+    brand        TEXT     NOT NULL,
+    model        TEXT     NOT NULL,
+    product_url  TEXT     NOT NULL,
+    created_at   DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    updated_at   DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+);
+GO
+
+CREATE TABLE IF NOT EXISTS price_history (
+    id            INTEGER  PRIMARY KEY AUTOINCREMENT,
+    product_id    TEXT     NOT NULL REFERENCES products(product_id),
+    price         REAL     NULL,
+    currency      TEXT     NOT NULL DEFAULT 'USD',
+    availability  TEXT     NOT NULL DEFAULT 'Unknown',
+    promo_text    TEXT     NULL,
+    scraped_at    DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+);
+GO
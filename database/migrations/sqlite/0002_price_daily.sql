@@ -0,0 +1,18 @@
+-- Daily OHLC rollup of price_history, one row per product per day.
+-- Maintained by the ingest path; rebuild with: python -m database.backfill_rollup
+
+CREATE TABLE IF NOT EXISTS price_daily (
+    product_id    TEXT     NOT NULL REFERENCES products(product_id),
+    price_date    DATE     NOT NULL,
+    open_price    REAL     NULL,
+    high_price    REAL     NULL,
+    low_price     REAL     NULL,
+    close_price   REAL     NULL,
+    price_sum     REAL     NULL,
+    price_count   INTEGER  NOT NULL,
+    sample_count  INTEGER  NOT NULL,
+    availability  TEXT     NULL,
+    updated_at    DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+    PRIMARY KEY (product_id, price_date)
+);
+GO
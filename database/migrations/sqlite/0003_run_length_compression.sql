@@ -0,0 +1,8 @@
+-- Run-length compression: identical consecutive observations on the
+-- same day extend one price_history row instead of adding new ones
+
+ALTER TABLE price_history ADD COLUMN last_seen_at DATETIME NULL;
+GO
+
+ALTER TABLE price_history ADD COLUMN observation_count INTEGER NOT NULL DEFAULT 1;
+GO
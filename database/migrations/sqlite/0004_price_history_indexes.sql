@@ -0,0 +1,19 @@
+-- Same indexes as the SQL Server schema. SQLite has no INCLUDE, so the
+-- included columns are trailing key columns, which makes the indexes
+-- covering. id is an explicit descending key column so history pages,
+-- ordered by (scraped_at DESC, id DESC), need no sort.
+
+CREATE INDEX IF NOT EXISTS IX_price_history_product_scraped_id
+    ON price_history (product_id, scraped_at DESC, id DESC, price, currency, availability,
+                      promo_text, last_seen_at, observation_count);
+GO
+
+-- Date-range scans across all products (rollup backfill, retention)
+CREATE INDEX IF NOT EXISTS IX_price_history_scraped
+    ON price_history (scraped_at, product_id);
+GO
+
+-- Catalog listing order
+CREATE INDEX IF NOT EXISTS IX_products_brand_model
+    ON products (brand, model, product_url, created_at, updated_at);
+GO
@@ -0,0 +1,32 @@
+-- Materialized latest observation per product, kept up to date by the
+-- ingest path in the same transaction as the price_history write
+
+CREATE TABLE IF NOT EXISTS current_prices (
+    product_id        TEXT     NOT NULL PRIMARY KEY REFERENCES products(product_id),
+    price_history_id  INTEGER  NOT NULL,
+    price             REAL     NULL,
+    currency          TEXT     NOT NULL,
+    availability      TEXT     NOT NULL,
+    promo_text        TEXT     NULL,
+    scraped_at        DATETIME NOT NULL,
+    last_seen_at      DATETIME NOT NULL,
+    updated_at        DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+);
+GO
+
+-- Seed from existing history
+INSERT INTO current_prices
+    (product_id, price_history_id, price, currency, availability, promo_text, scraped_at, last_seen_at)
+SELECT
+    ph.product_id, ph.id, ph.price, ph.currency, ph.availability,
+    ph.promo_text, ph.scraped_at, COALESCE(ph.last_seen_at, ph.scraped_at)
+FROM products p
+JOIN price_history ph ON ph.id = (
+    SELECT id
+    FROM price_history
+    WHERE product_id = p.product_id
+    ORDER BY scraped_at DESC, id DESC
+    LIMIT 1
+)
+WHERE NOT EXISTS (SELECT 1 FROM current_prices cp WHERE cp.product_id = p.product_id);
+GO
@@ -0,0 +1,13 @@
+-- Same index as the SQL Server schema: (product_id, scraped_at DESC,
+-- id DESC) serves both the keyset seek and the ORDER BY of paginated
+-- history. Included columns trail the key to keep it covering. 0004 now
+-- creates it; databases that applied the earlier 0004 get it here,
+-- replacing IX_price_history_product_scraped (no id key).
+
+CREATE INDEX IF NOT EXISTS IX_price_history_product_scraped_id
+    ON price_history (product_id, scraped_at DESC, id DESC, price, currency, availability,
+                      promo_text, last_seen_at, observation_count);
+GO
+
+DROP INDEX IF EXISTS IX_price_history_product_scraped;
+GO
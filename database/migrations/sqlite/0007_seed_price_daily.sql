@@ -0,0 +1,58 @@
+-- Seed price_daily from existing history, as in the SQL Server script:
+-- only (product, day) pairs missing from price_daily are built, with the
+-- aggregates of the refresh_price_daily statement.
+
+WITH day_rows AS (
+    SELECT
+        product_id, date(scraped_at) AS price_date, price, availability,
+        scraped_at, observation_count
+    FROM price_history ph
+    WHERE NOT EXISTS (
+        SELECT 1 FROM price_daily pd
+        WHERE pd.product_id = ph.product_id AND pd.price_date = date(ph.scraped_at)
+    )
+),
+weighted AS (
+    SELECT
+        *,
+        SUM(observation_count) OVER (
+            PARTITION BY product_id, price_date, availability
+        ) AS availability_weight,
+        MAX(scraped_at) OVER (
+            PARTITION BY product_id, price_date, availability
+        ) AS availability_last_seen
+    FROM day_rows
+),
+ranked AS (
+    SELECT
+        product_id, price_date, price, availability, observation_count,
+        ROW_NUMBER() OVER (
+            PARTITION BY product_id, price_date
+            ORDER BY CASE WHEN price IS NULL THEN 1 ELSE 0 END, scraped_at ASC
+        ) AS rn_open,
+        ROW_NUMBER() OVER (
+            PARTITION BY product_id, price_date
+            ORDER BY CASE WHEN price IS NULL THEN 1 ELSE 0 END, scraped_at DESC
+        ) AS rn_close,
+        ROW_NUMBER() OVER (
+            PARTITION BY product_id, price_date
+            ORDER BY availability_weight DESC, availability_last_seen DESC
+        ) AS rn_availability
+    FROM weighted
+)
+INSERT INTO price_daily
+    (product_id, price_date, open_price, high_price, low_price, close_price,
+     price_sum, price_count, sample_count, availability)
+SELECT
+    product_id, price_date,
+    MAX(CASE WHEN rn_open = 1 THEN price END),
+    MAX(price),
+    MIN(price),
+    MAX(CASE WHEN rn_close = 1 THEN price END),
+    SUM(price * observation_count),
+    SUM(CASE WHEN price IS NOT NULL THEN observation_count ELSE 0 END),
+    SUM(observation_count),
+    MAX(CASE WHEN rn_availability = 1 THEN availability END)
+FROM ranked
+GROUP BY product_id, price_date;
+GO
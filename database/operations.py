@@ -4,21 +4,26 @@ CRUD operations for products and price history
 """
 import os
 import sys
-import pyodbc
 import logging
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, date, time, timedelta
 
 # Add the project root directory to the Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from database.connection import get_connection
+from database.backends import backend, DatabaseError, as_date, as_datetime
+from database.connection import db_connection
+from database.instrumentation import instrumented
+from database.records import Product, LatestPrice, PriceObservation, ProductSnapshot
+from config import PRICE_HISTORY_COMPRESSION
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@instrumented
 def insert_product(product_data: dict) -> bool:
     """
     Insert or update product in database
@@ -30,85 +35,89 @@ def insert_product(product_data: dict) -> bool:
         bool: True if successful
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Check if product exists
-        cursor.execute(
-            "SELECT product_id FROM products WHERE product_id = ?",
-            (product_data['product_id'],)
-        )
-        exists = cursor.fetchone()
-        
-        if exists:
-            # Update existing product
-            cursor.execute("""
-                UPDATE products 
-                SET brand = ?, model = ?, product_url = ?, updated_at = GETDATE()
-                WHERE product_id = ?
-            """, (
-                product_data['brand'],
-                product_data['model'],
-                product_data['product_url'],
-                product_data['product_id']
-            ))
-            logger.info(f"Updated product: {product_data['product_id']}")
-        else:
-            # Insert new product
-            cursor.execute("""
-                INSERT INTO products (product_id, brand, model, product_url)
-                VALUES (?, ?, ?, ?)
-            """, (
-                product_data['product_id'],
-                product_data['brand'],
-                product_data['model'],
-                product_data['product_url']
-            ))
-            logger.info(f"Inserted product: {product_data['product_id']}")
-        
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Check if product exists
+            cursor.execute(
+                "SELECT product_id FROM products WHERE product_id = ?",
+                (product_data['product_id'],)
+            )
+            exists = cursor.fetchone()
+            
+            if exists:
+                # Update existing product
+                cursor.execute("""
+                    UPDATE products 
+                    SET brand = ?, model = ?, product_url = ?, updated_at = GETDATE()
+                    WHERE product_id = ?
+                """, (
+                    product_data['brand'],
+                    product_data['model'],
+                    product_data['product_url'],
+                    product_data['product_id']
+                ))
+                logger.info(f"Updated product: {product_data['product_id']}")
+            else:
+                # Insert new product
+                cursor.execute("""
+                    INSERT INTO products (product_id, brand, model, product_url)
+                    VALUES (?, ?, ?, ?)
+                """, (
+                    product_data['product_id'],
+                    product_data['brand'],
+                    product_data['model'],
+                    product_data['product_url']
+                ))
+                logger.info(f"Inserted product: {product_data['product_id']}")
+            
+            conn.commit()
         return True
         
-    except pyodbc.Error as e:
+    except DatabaseError as e:
         logger.error(f"Error inserting product: {str(e)}")
         return False
 
 
-def insert_price_history(price_data: dict) -> bool:
+@instrumented
+def insert_price_history(price_data: dict, compress: bool = PRICE_HISTORY_COMPRESSION) -> bool:
     """
     Insert price history record
     
     Args:
         price_data: Dictionary with product_id, price, currency, availability, promo, scraped_at
+        compress: Extend the current run instead of inserting when nothing changed
         
     Returns:
         bool: True if successful
     """
+    scraped_at = price_data.get('scraped_at', datetime.now())
+    if isinstance(scraped_at, str):
+        scraped_at = datetime.fromisoformat(scraped_at)
+    
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO price_history 
-            (product_id, price, currency, availability, promo_text, scraped_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            price_data['product_id'],
-            price_data.get('price'),
-            price_data.get('currency', 'USD'),
-            price_data.get('availability', 'Unknown'),
-            price_data.get('promo'),
-            price_data.get('scraped_at', datetime.now())
-        ))
-        
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            _append_observation(cursor, (
+                price_data['product_id'],
+                price_data.get('price'),
+                price_data.get('currency', 'USD'),
+                price_data.get('availability', 'Unknown'),
+                price_data.get('promo'),
+                scraped_at
+            ), compress)
+            
+            # Keep the derived tables in step with raw history
+            _refresh_current_prices(cursor, [price_data['product_id']])
+            _refresh_price_daily(cursor, [price_data['product_id']], scraped_at.date(), scraped_at.date())
+            
+            conn.commit()
         
         logger.info(f"Inserted price history: {price_data['product_id']} - ${price_data.get('price')}")
         return True
         
-    except pyodbc.Error as e:
+    except DatabaseError as e:
         logger.error(f"Error inserting price history: {str(e)}")
         return False
 
@@ -116,7 +125,7 @@ def insert_price_history(price_data: dict) -> bool:
 def save_scraped_data(scraped_data: dict) -> bool:
     """
     Save complete scraped data to database
-    Inserts both product info and price history
+    Inserts both product info and price history in one transaction
     
     Args:
         scraped_data: Complete scraped data dictionary
@@ -124,20 +133,366 @@ def save_scraped_data(scraped_data: dict) -> bool:
     Returns:
         bool: True if successful
     """
+    result = save_scraped_batch([scraped_data])
+    return result["saved"] == 1
+
+
+_MERGE_PRODUCT_SQL = backend.SQL["merge_product"]
+
+_INSERT_PRICE_SQL = """
+    INSERT INTO price_history 
+    (product_id, price, currency, availability, promo_text, scraped_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Run-length compression: an observation identical to the product's latest
+# row extends that row's run instead of adding a new one. Runs never cross
+# midnight so price_daily stays exact.
+_EXTEND_RUN_SQL = backend.SQL["extend_run"]
+
+
+def _append_observation(cursor, price_params: tuple, compress: bool):
+    """
+    Record one observation, extending the current run when compressing
+    
+    Args:
+        cursor: Open cursor inside the caller's transaction
+        price_params: (product_id, price, currency, availability, promo_text, scraped_at)
+        compress: Try to extend the latest run before inserting
+    """
+    if compress:
+        product_id, price, currency, availability, promo_text, scraped_at = price_params
+        cursor.execute(_EXTEND_RUN_SQL, (
+            product_id, scraped_at,
+            price, currency, availability, promo_text,
+            scraped_at, scraped_at
+        ))
+        if cursor.rowcount == 1:
+            return
+    cursor.execute(_INSERT_PRICE_SQL, price_params)
+
+
+def _bulk_append_observations(cursor, price_rows: list, compress: bool):
+    """
+    Record many observations with set-based statements
+    
+    Rows are staged in a temp table with fast_executemany; one UPDATE
+    extends every run that is unchanged and one INSERT adds the rest.
+    
+    Args:
+        cursor: Open cursor inside the caller's transaction
+        price_rows: List of (product_id, price, currency, availability, promo_text, scraped_at)
+        compress: Extend unchanged runs instead of inserting
+    """
+    cursor.fast_executemany = True
+    
+    if not compress:
+        cursor.executemany(_INSERT_PRICE_SQL, price_rows)
+        return
+    
+    # One UPDATE cannot chain several observations of the same product;
+    # backends without temp-table staging extend runs one row at a time
+    if not backend.BULK_STAGING or len({row[0] for row in price_rows}) != len(price_rows):
+        for row in sorted(price_rows, key=lambda r: r[5]):
+            _append_observation(cursor, row, compress)
+        return
+    
+    cursor.execute(backend.SQL["create_staging_tables"])
     try:
-        # Insert/update product
-        product_inserted = insert_product(scraped_data)
+        cursor.executemany(
+            backend.SQL["stage_row"],
+            [(i, *row) for i, row in enumerate(price_rows)]
+        )
+        cursor.execute(backend.SQL["bulk_extend_runs"])
+        cursor.execute(backend.SQL["insert_unabsorbed"])
+    finally:
+        cursor.execute(backend.SQL["drop_staging_tables"])
+
+
+def _prepare_scrape_result(scraped_data: dict) -> tuple:
+    """
+    Validate a scrape result and build its statement parameters
+    
+    Returns:
+        tuple: (product_params, price_params)
         
-        # Insert price history
-        price_inserted = insert_price_history(scraped_data)
+    Raises:
+        ValueError: If the result is a failed scrape or is malformed
+    """
+    if scraped_data.get('error'):
+        raise ValueError(f"Scrape failed: {scraped_data['error']}")
+    
+    missing = [k for k in ('product_id', 'brand', 'model', 'product_url') if not scraped_data.get(k)]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    
+    price = scraped_data.get('price')
+    if price is not None:
+        price = float(price)
+    
+    scraped_at = scraped_data.get('scraped_at') or datetime.now()
+    if isinstance(scraped_at, str):
+        scraped_at = datetime.fromisoformat(scraped_at)
+    
+    product_params = (
+        scraped_data['product_id'],
+        scraped_data['brand'],
+        scraped_data['model'],
+        scraped_data['product_url']
+    )
+    price_params = (
+        scraped_data['product_id'],
+        price,
+        scraped_data.get('currency') or 'USD',
+        scraped_data.get('availability') or 'Unknown',
+        scraped_data.get('promo'),
+        scraped_at
+    )
+    return product_params, price_params
+
+
+@instrumented
+def save_scraped_batch(results: list, compress: bool = PRICE_HISTORY_COMPRESSION) -> dict:
+    """
+    Save many scrape results in a single transaction
+    
+    Products are upserted with MERGE and price history rows are inserted
+    with fast_executemany; current_prices and the touched price_daily
+    buckets are refreshed in the same transaction. Invalid results are reported and skipped. If the
+    bulk statements fail, the batch is retried row by row in a fresh
+    transaction so one bad row does not discard the rest.
+    
+    Args:
+        results: List of scraped data dictionaries
+        compress: Extend unchanged price runs instead of inserting duplicates
         
-        return product_inserted and price_inserted
+    Returns:
+        dict: total, saved, and failed (list of {index, product_id, error})
+    """
+    failed = []
+    prepared = []
+    
+    for index, scraped_data in enumerate(results):
+        try:
+            prepared.append((index, scraped_data.get('product_id'), *_prepare_scrape_result(scraped_data)))
+        except (ValueError, TypeError) as e:
+            failed.append({"index": index, "product_id": scraped_data.get('product_id'), "error": str(e)})
+    
+    saved = 0
+    if prepared:
+        try:
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                
+                try:
+                    # Last result wins when a product appears more than once
+                    product_rows = list({row[2][0]: row[2] for row in prepared}.values())
+                    price_rows = [row[3] for row in prepared]
+                    
+                    cursor.fast_executemany = True
+                    cursor.executemany(_MERGE_PRODUCT_SQL, product_rows)
+                    _bulk_append_observations(cursor, price_rows, compress)
+                    saved_rows = price_rows
+                    
+                except DatabaseError as e:
+                    conn.rollback()
+                    logger.warning(f"Bulk ingest failed, retrying row by row: {str(e)}")
+                    
+                    cursor = conn.cursor()
+                    saved_rows = []
+                    for index, product_id, product_params, price_params in prepared:
+                        try:
+                            # A failed price insert leaves the (idempotent) product upsert in place
+                            cursor.execute(_MERGE_PRODUCT_SQL, product_params)
+                            _append_observation(cursor, price_params, compress)
+                            saved_rows.append(price_params)
+                        except DatabaseError as row_error:
+                            failed.append({"index": index, "product_id": product_id, "error": str(row_error)})
+                
+                if saved_rows:
+                    saved_product_ids = list(dict.fromkeys(row[0] for row in saved_rows))
+                    days = [row[5].date() for row in saved_rows]
+                    _refresh_current_prices(cursor, saved_product_ids)
+                    _refresh_price_daily(cursor, saved_product_ids, min(days), max(days))
+                
+                conn.commit()
+                saved = len(saved_rows)
+                
+        except Exception as e:
+            logger.error(f"Error saving scrape batch: {str(e)}")
+            failed_indexes = {f["index"] for f in failed}
+            failed.extend(
+                {"index": index, "product_id": product_id, "error": str(e)}
+                for index, product_id, _, _ in prepared
+                if index not in failed_indexes
+            )
+            saved = 0
+    
+    failed.sort(key=lambda f: f["index"])
+    logger.info(f"Saved scrape batch: {saved}/{len(results)} results, {len(failed)} failed")
+    
+    return {
+        "total": len(results),
+        "saved": saved,
+        "failed": failed
+    }
+
+
+# ==================== Current Prices ====================
+
+_REFRESH_CURRENT_PRICES_SQL = backend.SQL["refresh_current_prices"]
+
+
+def _refresh_current_prices(cursor, product_ids: list):
+    """
+    Point current_prices at the latest price_history row of each product
+    
+    One latest-row index seek per product; runs on the caller's cursor so it
+    shares the ingest transaction.
+    
+    Args:
+        cursor: Open cursor inside the caller's transaction
+        product_ids: Products whose history changed
+    """
+    for _, chunk in _chunked(product_ids):
+        values = ", ".join("(?)" for _ in chunk)
+        cursor.execute(_REFRESH_CURRENT_PRICES_SQL.format(values=values), chunk)
+
+
+@instrumented
+def rebuild_current_prices() -> int:
+    """
+    Rebuild current_prices for every product from price_history
+
+    For bulk loads that write price_history directly rather than through
+    the ingest path.
+
+    Returns:
+        int: Number of products refreshed, or -1 on error
+    """
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT product_id FROM products")
+            product_ids = [row[0] for row in cursor.fetchall()]
+            _refresh_current_prices(cursor, product_ids)
+
+            conn.commit()
+        return len(product_ids)
+
+    except DatabaseError as e:
+        logger.error(f"Error rebuilding current prices: {str(e)}")
+        return -1
+
+
+# ==================== Daily Rollup ====================
+
+_REFRESH_PRICE_DAILY_SQL = backend.SQL["refresh_price_daily"]
+
+
+def _refresh_price_daily(cursor, product_ids: list, start_date: date, end_date: date):
+    """
+    Recompute price_daily rows for the given products and days
+    
+    Buckets are rebuilt from raw price_history, so late or out-of-order
+    observations land correctly. Runs on the caller's cursor so it shares
+    the ingest transaction.
+    
+    Args:
+        cursor: Open cursor inside the caller's transaction
+        product_ids: Products to refresh (all products if None)
+        start_date: First day to refresh (inclusive)
+        end_date: Last day to refresh (inclusive)
+    """
+    start = datetime.combine(start_date, time.min)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+    
+    if product_ids is None:
+        cursor.execute(_REFRESH_PRICE_DAILY_SQL.format(product_filter=""), (start, end))
+        return
+    
+    for placeholders, chunk in _chunked(product_ids):
+        cursor.execute(
+            _REFRESH_PRICE_DAILY_SQL.format(product_filter=f"product_id IN ({placeholders}) AND "),
+            [*chunk, start, end]
+        )
+
+
+@instrumented
+def backfill_price_daily(start_date: date = None, end_date: date = None, days_per_batch: int = 30) -> int:
+    """
+    Build price_daily from existing price_history
+    
+    Processes the range in slices of days_per_batch, committing each
+    slice so large histories do not run in one huge transaction.
+    
+    Args:
+        start_date: First day to build (earliest history if None)
+        end_date: Last day to build (latest history if None)
+        days_per_batch: Days per transaction
         
-    except Exception as e:
-        logger.error(f"Error saving scraped data: {str(e)}")
-        return False
+    Returns:
+        int: Number of slices processed, or -1 on error
+    """
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            if start_date is None or end_date is None:
+                cursor.execute("SELECT MIN(scraped_at), MAX(scraped_at) FROM price_history")
+                first_seen, last_seen = cursor.fetchone()
+                if first_seen is None:
+                    logger.info("No price history to backfill")
+                    return 0
+                start_date = start_date or as_date(first_seen)
+                end_date = end_date or as_date(last_seen)
+            
+            slices = 0
+            slice_start = start_date
+            while slice_start <= end_date:
+                slice_end = min(slice_start + timedelta(days=days_per_batch - 1), end_date)
+                _refresh_price_daily(cursor, None, slice_start, slice_end)
+                conn.commit()
+                slices += 1
+                logger.info(f"Backfilled price_daily {slice_start} to {slice_end}")
+                slice_start = slice_end + timedelta(days=1)
+        
+        return slices
+        
+    except DatabaseError as e:
+        logger.error(f"Error backfilling price_daily: {str(e)}")
+        return -1
+
+
+def _history_row_to_record(row) -> PriceObservation:
+    """Convert an (id, product_id, price, currency, availability, promo_text, scraped_at, last_seen_at, observation_count) row"""
+    return PriceObservation(
+        id=row[0],
+        product_id=row[1],
+        price=float(row[2]) if row[2] else None,
+        currency=row[3],
+        availability=row[4],
+        promo=row[5],
+        scraped_at=row[6],
+        last_seen_at=row[7] or row[6],
+        observation_count=row[8]
+    )
+
+
+def _price_row_to_record(row) -> LatestPrice:
+    """Convert a (product_id, price, currency, availability, promo_text, scraped_at) row"""
+    return LatestPrice(
+        product_id=row[0],
+        price=float(row[1]) if row[1] else None,
+        currency=row[2],
+        availability=row[3],
+        promo=row[4],
+        scraped_at=row[5]
+    )
 
 
+@instrumented
 def get_latest_price(product_id: str) -> dict:
     """
     Get latest price for a product
@@ -146,125 +501,1015 @@ def get_latest_price(product_id: str) -> dict:
         product_id: Product identifier
         
     Returns:
-        dict: Latest price data or None
+        LatestPrice: Latest price record or None
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT TOP 1 
-                product_id, price, currency, availability, promo_text, scraped_at
-            FROM price_history
-            WHERE product_id = ?
-            ORDER BY scraped_at DESC
-        """, (product_id,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT product_id, price, currency, availability, promo_text, last_seen_at
+                FROM current_prices
+                WHERE product_id = ?
+            """, (product_id,))
+            
+            row = cursor.fetchone()
         
         if row:
-            return {
-                "product_id": row[0],
-                "price": float(row[1]) if row[1] else None,
-                "currency": row[2],
-                "availability": row[3],
-                "promo": row[4],
-                "scraped_at": row[5].isoformat() if row[5] else None
-            }
+            return _price_row_to_record(row)
         return None
         
-    except pyodbc.Error as e:
+    except DatabaseError as e:
         logger.error(f"Error getting latest price: {str(e)}")
         return None
 
 
-def get_price_history(product_id: str, limit: int = 100) -> list:
+# SQL Server caps a statement at 2100 parameters
+MAX_IN_CLAUSE_PARAMS = 1000
+
+
+def _chunked(values: list, size: int = MAX_IN_CLAUSE_PARAMS):
+    """Yield (placeholders, chunk) pairs for building IN (...) clauses"""
+    for i in range(0, len(values), size):
+        chunk = values[i:i + size]
+        yield ", ".join("?" for _ in chunk), chunk
+
+
+@instrumented
+def get_latest_prices(product_ids: list = None) -> dict:
+    """
+    Get latest price for many products in one round trip
+    
+    Reads the materialized current_prices table, so cost does not depend
+    on history depth.
+    
+    Args:
+        product_ids: Product identifiers to look up (all products if None)
+        
+    Returns:
+        dict: LatestPrice records keyed by product_id; products without
+              any price history are absent
+    """
+    if product_ids is not None:
+        product_ids = list(dict.fromkeys(product_ids))
+        if not product_ids:
+            return {}
+    
+    query = """
+        SELECT product_id, price, currency, availability, promo_text, last_seen_at
+        FROM current_prices
+        {where}
+    """
+    
+    try:
+        latest = {}
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            if product_ids is None:
+                cursor.execute(query.format(where=""))
+                rows = cursor.fetchall()
+            else:
+                rows = []
+                for placeholders, chunk in _chunked(product_ids):
+                    cursor.execute(
+                        query.format(where=f"WHERE product_id IN ({placeholders})"),
+                        chunk
+                    )
+                    rows.extend(cursor.fetchall())
+        
+        for row in rows:
+            latest[row[0]] = _price_row_to_record(row)
+        
+        return latest
+        
+    except DatabaseError as e:
+        logger.error(f"Error getting latest prices: {str(e)}")
+        return {}
+
+
+@instrumented
+def get_catalog(product_ids: list = None) -> list:
+    """
+    Get products joined with their current price in one narrow scan
+    
+    Args:
+        product_ids: Product identifiers to include (all products if None)
+        
+    Returns:
+        list: (Product, LatestPrice) pairs ordered by brand, model; latest
+              is None if the product has no price history
+    """
+    if product_ids is not None:
+        product_ids = list(dict.fromkeys(product_ids))
+        if not product_ids:
+            return []
+    
+    query = """
+        SELECT 
+            p.product_id, p.brand, p.model, p.product_url, p.created_at, p.updated_at,
+            cp.price, cp.currency, cp.availability, cp.promo_text, cp.last_seen_at
+        FROM products p
+        LEFT JOIN current_prices cp ON cp.product_id = p.product_id
+        {where}
+        ORDER BY p.brand, p.model
+    """
+    
+    try:
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            if product_ids is None:
+                cursor.execute(query.format(where=""))
+                rows = cursor.fetchall()
+            else:
+                rows = []
+                for placeholders, chunk in _chunked(product_ids):
+                    cursor.execute(query.format(where=f"WHERE p.product_id IN ({placeholders})"), chunk)
+                    rows.extend(cursor.fetchall())
+                rows.sort(key=lambda r: (r[1], r[2]))
+        
+        catalog = []
+        for row in rows:
+            product = Product(*row[:6])
+            latest = _price_row_to_record((row[0], *row[6:])) if row[10] else None
+            catalog.append((product, latest))
+        
+        return catalog
+        
+    except DatabaseError as e:
+        logger.error(f"Error getting catalog: {str(e)}")
+        return []
+
+
+@instrumented
+def get_product_snapshots(product_ids: list = None) -> list:
+    """
+    Get product metadata, latest price and lifetime statistics in one query
+    
+    The statistics are aggregated from price_daily (observation-weighted,
+    and still covering days archived out of price_history); the latest
+    observation comes from current_prices.
+    
+    Args:
+        product_ids: Product identifiers to include (all products if None)
+        
+    Returns:
+        list: ProductSnapshot records ordered by brand, model
+    """
+    if product_ids is not None:
+        product_ids = list(dict.fromkeys(product_ids))
+        if not product_ids:
+            return []
+    
+    query = """
+        WITH stats AS (
+            SELECT 
+                product_id,
+                MIN(low_price) AS min_price,
+                MAX(high_price) AS max_price,
+                SUM(price_sum) / NULLIF(SUM(price_count), 0) AS avg_price,
+                SUM(price_count) AS total_records
+            FROM price_daily
+            {history_where}
+            GROUP BY product_id
+        )
+        SELECT 
+            p.product_id, p.brand, p.model, p.product_url,
+            cp.price, cp.currency, cp.availability, cp.promo_text, cp.last_seen_at,
+            s.min_price, s.max_price, s.avg_price, s.total_records
+        FROM products p
+        LEFT JOIN current_prices cp ON cp.product_id = p.product_id
+        LEFT JOIN stats s ON s.product_id = p.product_id
+        {products_where}
+        ORDER BY p.brand, p.model
+    """
+    
+    try:
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            if product_ids is None:
+                cursor.execute(query.format(history_where="", products_where=""))
+                rows = cursor.fetchall()
+            else:
+                rows = []
+                for placeholders, chunk in _chunked(product_ids):
+                    cursor.execute(
+                        query.format(
+                            history_where=f"WHERE product_id IN ({placeholders})",
+                            products_where=f"WHERE p.product_id IN ({placeholders})"
+                        ),
+                        chunk + chunk
+                    )
+                    rows.extend(cursor.fetchall())
+                rows.sort(key=lambda r: (r[1], r[2]))
+        
+        return [
+            ProductSnapshot(
+                product_id=row[0],
+                brand=row[1],
+                model=row[2],
+                product_url=row[3],
+                price=float(row[4]) if row[4] else None,
+                currency=row[5],
+                availability=row[6],
+                promo=row[7],
+                scraped_at=row[8],
+                min_price=float(row[9]) if row[9] else None,
+                max_price=float(row[10]) if row[10] else None,
+                avg_price=float(row[11]) if row[11] else None,
+                total_records=row[12] or 0
+            )
+            for row in rows
+        ]
+        
+    except DatabaseError as e:
+        logger.error(f"Error getting product snapshots: {str(e)}")
+        return []
+
+
+@instrumented
+def get_price_history(product_id: str, limit: int = 100, before: tuple = None) -> list:
     """
     Get price history for a product
     
+    With run-length compression a row covers every identical observation
+    from scraped_at to last_seen_at (observation_count of them).
+    
+    Rows are ordered by (scraped_at, id) descending. Pass the position of
+    the last row of a page as `before` to fetch the next page with an
+    index seek rather than an OFFSET scan.
+    
     Args:
         product_id: Product identifier
         limit: Maximum number of records to return
+        before: Optional (scraped_at, id) keyset position; only older rows are returned
         
     Returns:
-        list: List of price history dictionaries
+        list: PriceObservation records
     """
+    keyset, params = "", [product_id]
+    if before is not None:
+        before_scraped_at, before_id = before
+        # Equivalent to (scraped_at, id) < (?, ?), written so the leading
+        # scraped_at bound is an index seek
+        keyset = "AND scraped_at <= ? AND (scraped_at < ? OR id < ?)"
+        params += [before_scraped_at, before_scraped_at, before_id]
+    
+    top, limit_clause = backend.limit_clauses(limit)
+    
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f"""
+                SELECT {top}
+                    id, product_id, price, currency, availability, promo_text, scraped_at,
+                    last_seen_at, observation_count
+                FROM price_history
+                WHERE product_id = ? {keyset}
+                ORDER BY scraped_at DESC, id DESC
+                {limit_clause}
+            """, params)
+            
+            rows = cursor.fetchall()
         
-        cursor.execute(f"""
-            SELECT TOP {limit}
-                id, product_id, price, currency, availability, promo_text, scraped_at
-            FROM price_history
-            WHERE product_id = ?
-            ORDER BY scraped_at DESC
-        """, (product_id,))
+        return [_history_row_to_record(row) for row in rows]
         
-        rows = cursor.fetchall()
-        conn.close()
-        
-        history = []
-        for row in rows:
-            history.append({
-                "id": row[0],
-                "product_id": row[1],
-                "price": float(row[2]) if row[2] else None,
-                "currency": row[3],
-                "availability": row[4],
-                "promo": row[5],
-                "scraped_at": row[6].isoformat() if row[6] else None
-            })
-        
-        return history
-        
-    except pyodbc.Error as e:
+    except DatabaseError as e:
         logger.error(f"Error getting price history: {str(e)}")
         return []
 
 
+def _window_filter(since: datetime, until: datetime = None) -> tuple:
+    """
+    Build the predicate matching runs that overlap [since, until], and its parameters
+    
+    Runs never cross midnight, so a run reaching since started no earlier
+    than since's day; that scraped_at bound keeps the read an index seek.
+    """
+    since_day = datetime.combine(since.date(), time.min)
+    if until is None:
+        return "scraped_at >= ? AND COALESCE(last_seen_at, scraped_at) >= ?", [since_day, since]
+    return (
+        "scraped_at >= ? AND scraped_at <= ? AND COALESCE(last_seen_at, scraped_at) >= ?",
+        [since_day, until, since]
+    )
+
+
+def _interior_filter(since: datetime, until: datetime = None) -> tuple:
+    """Build the predicate matching runs that lie entirely inside [since, until], and its parameters"""
+    if until is None:
+        return "scraped_at >= ?", [since]
+    return "scraped_at >= ? AND scraped_at <= ? AND COALESCE(last_seen_at, scraped_at) <= ?", [since, until, until]
+
+
+def _boundary_filter(since: datetime, until: datetime = None) -> tuple:
+    """
+    Build the predicate matching runs that cross since or until, and its parameters
+    
+    Runs never cross midnight, so a run crossing a bound started on the
+    bound's day; the scraped_at range keeps both halves index seeks. The
+    halves are disjoint, so a run spanning the whole window matches once.
+    """
+    since_day = datetime.combine(since.date(), time.min)
+    predicate = "(scraped_at >= ? AND scraped_at < ? AND COALESCE(last_seen_at, scraped_at) >= ?)"
+    params = [since_day, since, since]
+    if until is not None:
+        until_day = max(datetime.combine(until.date(), time.min), since)
+        predicate += " OR (scraped_at >= ? AND scraped_at <= ? AND COALESCE(last_seen_at, scraped_at) > ?)"
+        params += [until_day, until, until]
+    return f"({predicate})", params
+
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _clip_run(scraped_at: datetime, last_seen_at: datetime, count: int, since: datetime, until: datetime = None) -> tuple:
+    """
+    Clip a compressed run to the observations inside [since, until]
+    
+    A run only stores its first and last timestamp, so its observations are
+    taken as evenly spaced between them (scrapes run on a fixed schedule).
+    
+    Args:
+        scraped_at: First observation of the run
+        last_seen_at: Last observation of the run (None: a single observation)
+        count: observation_count of the run
+        since: Start of the window (inclusive)
+        until: End of the window (inclusive, open-ended if None)
+        
+    Returns:
+        tuple: (first, last, count) of the observations inside the window,
+               or None if none of them is
+    """
+    last_seen_at = last_seen_at or scraped_at
+    span = (last_seen_at - scraped_at) // _MICROSECOND
+    if count <= 1 or span <= 0:
+        inside = scraped_at >= since and (until is None or scraped_at <= until)
+        return (scraped_at, last_seen_at, count) if inside else None
+    
+    steps = count - 1
+    # Observation k is at scraped_at + span * k / steps
+    first_k = max(0, -(-((since - scraped_at) // _MICROSECOND) * steps // span))
+    last_k = steps if until is None else min(steps, ((until - scraped_at) // _MICROSECOND) * steps // span)
+    if first_k > last_k:
+        return None
+    return (
+        scraped_at + timedelta(microseconds=span * first_k // steps),
+        scraped_at + timedelta(microseconds=span * last_k // steps),
+        last_k - first_k + 1
+    )
+
+
+def clip_observations(records: list, since: datetime, until: datetime = None) -> list:
+    """
+    Clip PriceObservation runs to the observations inside [since, until]
+    
+    Runs crossing a bound are shortened (see _clip_run); runs with no
+    observation inside the window are dropped.
+    
+    Args:
+        records: PriceObservation records overlapping the window
+        since: Start of the window (inclusive)
+        until: End of the window (inclusive, open-ended if None)
+        
+    Returns:
+        list: Clipped records, in the input order
+    """
+    clipped_records = []
+    for record in records:
+        if record.scraped_at < since or (until is not None and record.last_seen_at > until):
+            clipped = _clip_run(record.scraped_at, record.last_seen_at, record.observation_count, since, until)
+            if clipped is None:
+                continue
+            first, last, count = clipped
+            record = replace(record, scraped_at=first, last_seen_at=last, observation_count=count)
+        clipped_records.append(record)
+    return clipped_records
+
+
+@instrumented
+def get_price_window(product_id: str, since: datetime, until: datetime = None, limit: int = None) -> list:
+    """
+    Get price history for a product within a date window
+    
+    Runs crossing a window bound are clipped to the observations inside
+    the window (see _clip_run), so the records match what an uncompressed
+    history would return.
+    
+    Args:
+        product_id: Product identifier
+        since: Start of the window (inclusive)
+        until: End of the window (inclusive, open-ended if None)
+        limit: Maximum number of records, newest first (all if None)
+        
+    Returns:
+        list: PriceObservation records, newest first
+    """
+    predicate, params = _window_filter(since, until)
+    # Only the two boundary runs can clip to nothing
+    top, limit_clause = backend.limit_clauses(limit + 2 if limit is not None else None)
+    
+    try:
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f"""
+                SELECT {top}
+                    id, product_id, price, currency, availability, promo_text, scraped_at,
+                    last_seen_at, observation_count
+                FROM price_history
+                WHERE product_id = ? AND {predicate}
+                ORDER BY scraped_at DESC
+                {limit_clause}
+            """, [product_id, *params])
+            
+            rows = cursor.fetchall()
+        
+        records = clip_observations([_history_row_to_record(row) for row in rows], since, until)
+        return records[:limit] if limit is not None else records
+        
+    except DatabaseError as e:
+        logger.error(f"Error getting price window: {str(e)}")
+        return []
+
+
+# {product_filter}: "product_id = ?" or "product_id IN (...)"; {predicate}: interior filter
+_TREND_SUMMARY_SQL = """
+    WITH window_rows AS (
+        SELECT 
+            product_id, price, scraped_at, observation_count,
+            COALESCE(last_seen_at, scraped_at) AS last_seen_at,
+            ROW_NUMBER() OVER (PARTITION BY product_id ORDER BY scraped_at ASC) AS rn_first,
+            ROW_NUMBER() OVER (PARTITION BY product_id ORDER BY scraped_at DESC) AS rn_last
+        FROM price_history
+        WHERE {product_filter} AND {predicate}
+    )
+    SELECT 
+        product_id,
+        SUM(observation_count) AS data_points,
+        MAX(CASE WHEN rn_first = 1 THEN price END) AS first_price,
+        MAX(CASE WHEN rn_first = 1 THEN scraped_at END) AS first_date,
+        MAX(CASE WHEN rn_last = 1 THEN price END) AS latest_price,
+        MAX(CASE WHEN rn_last = 1 THEN last_seen_at END) AS latest_date,
+        MIN(price) AS min_price,
+        MAX(price) AS max_price,
+        SUM(price * observation_count)
+            / NULLIF(SUM(CASE WHEN price IS NOT NULL THEN observation_count ELSE 0 END), 0) AS avg_price,
+        SUM(CASE WHEN price IS NOT NULL THEN observation_count ELSE 0 END) AS priced_points
+    FROM window_rows
+    GROUP BY product_id
+"""
+
+# Runs crossing a window bound, clipped in Python; {predicate}: boundary filter
+_BOUNDARY_RUNS_SQL = """
+    SELECT product_id, price, scraped_at, last_seen_at, observation_count
+    FROM price_history
+    WHERE {product_filter} AND {predicate}
+"""
+
+
+def _trend_summary_row(product_id: str, row, boundary_runs: list = (), since: datetime = None, until: datetime = None) -> dict:
+    """
+    Build a trend summary dict from a _TREND_SUMMARY_SQL row (None: no data in the window)
+    
+    boundary_runs are _BOUNDARY_RUNS_SQL rows; their observations inside
+    [since, until] are merged into the aggregates.
+    """
+    row = row or (product_id, None, None, None, None, None, None, None, None, None)
+    data_points = row[1] or 0
+    first_price, first_date = row[2], as_datetime(row[3])
+    latest_price, latest_date = row[4], as_datetime(row[5])
+    min_price, max_price = row[6], row[7]
+    priced_points = row[9] or 0
+    price_total = float(row[8]) * priced_points if row[8] is not None else 0.0
+    
+    for _, price, scraped_at, last_seen_at, count in boundary_runs:
+        clipped = _clip_run(scraped_at, last_seen_at, count, since, until)
+        if clipped is None:
+            continue
+        first, last, count = clipped
+        data_points += count
+        if first_date is None or first < first_date:
+            first_price, first_date = price, first
+        if latest_date is None or last > latest_date:
+            latest_price, latest_date = price, last
+        if price is not None:
+            min_price = price if min_price is None else min(min_price, price)
+            max_price = price if max_price is None else max(max_price, price)
+            price_total += float(price) * count
+            priced_points += count
+    
+    return {
+        "product_id": product_id,
+        "data_points": data_points,
+        "first_price": float(first_price) if first_price else None,
+        "first_date": first_date.isoformat() if first_date else None,
+        "latest_price": float(latest_price) if latest_price else None,
+        "latest_date": latest_date.isoformat() if latest_date else None,
+        "min_price": float(min_price) if min_price else None,
+        "max_price": float(max_price) if max_price else None,
+        "avg_price": price_total / priced_points if priced_points else None,
+        "priced_points": priced_points
+    }
+
+
+def summarize_runs(product_id: str, runs: list, since: datetime, until: datetime = None) -> dict:
+    """
+    Trend summary over PriceObservation runs, clipped to [since, until]
+    
+    Same result as get_price_trend_summary for history that is not in the
+    database (e.g. the Parquet archive).
+    
+    Args:
+        product_id: Product identifier
+        runs: PriceObservation records overlapping the window
+        since: Start of the window (inclusive)
+        until: End of the window (inclusive, open-ended if None)
+        
+    Returns:
+        dict: Trend summary (same shape as get_price_trend_summary)
+    """
+    boundary_runs = [
+        (product_id, run.price, run.scraped_at, run.last_seen_at, run.observation_count)
+        for run in runs
+    ]
+    return _trend_summary_row(product_id, None, boundary_runs, since, until)
+
+
+@instrumented
+def get_price_trend_summary(product_id: str, since: datetime, until: datetime = None) -> dict:
+    """
+    Aggregate a product's prices over a date window
+    
+    Runs inside the window are aggregated in SQL; the at most two runs
+    crossing a window bound are clipped (see _clip_run) and merged in, so
+    counts and first/latest dates match an uncompressed history.
+    
+    Args:
+        product_id: Product identifier
+        since: Start of the window (inclusive)
+        until: End of the window (inclusive, open-ended if None)
+        
+    Returns:
+        dict: data_points, first/latest price and date, min/max/avg price,
+              priced_points (observations with a price), or None on error
+    """
+    interior, interior_params = _interior_filter(since, until)
+    boundary, boundary_params = _boundary_filter(since, until)
+    
+    try:
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                _TREND_SUMMARY_SQL.format(product_filter="product_id = ?", predicate=interior),
+                [product_id, *interior_params]
+            )
+            row = cursor.fetchone()
+            
+            cursor.execute(
+                _BOUNDARY_RUNS_SQL.format(product_filter="product_id = ?", predicate=boundary),
+                [product_id, *boundary_params]
+            )
+            boundary_runs = cursor.fetchall()
+        
+        return _trend_summary_row(product_id, row, boundary_runs, since, until)
+        
+    except DatabaseError as e:
+        logger.error(f"Error getting price trend summary: {str(e)}")
+        return None
+
+
+@instrumented
+def get_price_trend_summaries(product_ids: list, since: datetime, until: datetime = None) -> dict:
+    """
+    Aggregate many products' prices over a date window with set-based queries
+    
+    Args:
+        product_ids: Product identifiers
+        since: Start of the window (inclusive)
+        until: End of the window (inclusive, open-ended if None)
+        
+    Returns:
+        dict: product_id -> trend summary (same shape as get_price_trend_summary),
+              or None on error
+    """
+    product_ids = list(dict.fromkeys(product_ids))
+    interior, interior_params = _interior_filter(since, until)
+    boundary, boundary_params = _boundary_filter(since, until)
+    
+    try:
+        rows, boundary_runs = {}, {}
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            for placeholders, chunk in _chunked(product_ids):
+                product_filter = f"product_id IN ({placeholders})"
+                cursor.execute(
+                    _TREND_SUMMARY_SQL.format(product_filter=product_filter, predicate=interior),
+                    [*chunk, *interior_params]
+                )
+                rows.update((row[0], row) for row in cursor.fetchall())
+                
+                cursor.execute(
+                    _BOUNDARY_RUNS_SQL.format(product_filter=product_filter, predicate=boundary),
+                    [*chunk, *boundary_params]
+                )
+                for run in cursor.fetchall():
+                    boundary_runs.setdefault(run[0], []).append(run)
+        
+        return {
+            product_id: _trend_summary_row(product_id, rows.get(product_id), boundary_runs.get(product_id, ()), since, until)
+            for product_id in product_ids
+        }
+        
+    except DatabaseError as e:
+        logger.error(f"Error getting price trend summaries: {str(e)}")
+        return None
+
+
+# Bucket start expression per rollup resolution
+ROLLUP_BUCKETS = backend.ROLLUP_BUCKETS
+
+
+def _rollup_filter(since: datetime = None, until: datetime = None) -> tuple:
+    """Build the price_date range predicate and its parameters"""
+    predicate, params = "", []
+    if since is not None:
+        predicate += " AND price_date >= ?"
+        params.append(since.date() if isinstance(since, datetime) else since)
+    if until is not None:
+        predicate += " AND price_date <= ?"
+        params.append(until.date() if isinstance(until, datetime) else until)
+    return predicate, params
+
+
+# {bucket}: ROLLUP_BUCKETS expression; {product_filter}: "product_id = ?" or
+# "product_id IN (...)"; {predicate}, {top}, {limit_clause}: optional filters
+_ROLLUP_SQL = """
+    WITH days AS (
+        SELECT *, {bucket} AS period_start
+        FROM price_daily
+        WHERE {product_filter}{predicate}
+    ),
+    ranked AS (
+        SELECT 
+            *,
+            ROW_NUMBER() OVER (
+                PARTITION BY product_id, period_start
+                ORDER BY CASE WHEN open_price IS NULL THEN 1 ELSE 0 END, price_date ASC
+            ) AS rn_open,
+            ROW_NUMBER() OVER (
+                PARTITION BY product_id, period_start
+                ORDER BY CASE WHEN close_price IS NULL THEN 1 ELSE 0 END, price_date DESC
+            ) AS rn_close
+        FROM days
+    ),
+    dominant_availability AS (
+        SELECT 
+            product_id, period_start, availability,
+            ROW_NUMBER() OVER (
+                PARTITION BY product_id, period_start
+                ORDER BY SUM(sample_count) DESC, MAX(price_date) DESC
+            ) AS rn
+        FROM days
+        GROUP BY product_id, period_start, availability
+    )
+    SELECT {top}
+        r.product_id,
+        r.period_start,
+        MAX(CASE WHEN r.rn_open = 1 THEN r.open_price END) AS open_price,
+        MAX(r.high_price) AS high_price,
+        MIN(r.low_price) AS low_price,
+        MAX(CASE WHEN r.rn_close = 1 THEN r.close_price END) AS close_price,
+        SUM(r.price_sum) / NULLIF(SUM(r.price_count), 0) AS avg_price,
+        SUM(r.sample_count) AS sample_count,
+        MAX(a.availability) AS availability
+    FROM ranked r
+    JOIN dominant_availability a
+        ON a.product_id = r.product_id AND a.period_start = r.period_start AND a.rn = 1
+    GROUP BY r.product_id, r.period_start
+    ORDER BY r.product_id, r.period_start DESC
+    {limit_clause}
+"""
+
+
+def _rollup_row_to_dict(row, resolution: str) -> dict:
+    """Build a bucket dict from a _ROLLUP_SQL row"""
+    return {
+        "product_id": row[0],
+        "resolution": resolution,
+        "period_start": as_date(row[1]).isoformat() if row[1] else None,
+        "open_price": float(row[2]) if row[2] else None,
+        "high_price": float(row[3]) if row[3] else None,
+        "low_price": float(row[4]) if row[4] else None,
+        "close_price": float(row[5]) if row[5] else None,
+        "avg_price": float(row[6]) if row[6] else None,
+        "sample_count": row[7],
+        "availability": row[8]
+    }
+
+
+@instrumented
+def get_price_rollup(
+    product_id: str,
+    since: datetime = None,
+    until: datetime = None,
+    resolution: str = "day",
+    limit: int = None,
+    before: date = None
+) -> list:
+    """
+    Get OHLC price buckets from the price_daily rollup
+    
+    Args:
+        product_id: Product identifier
+        since: First day to include (all history if None)
+        until: Last day to include (open-ended if None)
+        resolution: "day", "week" or "month"
+        limit: Maximum number of buckets, newest first (all if None)
+        before: Optional keyset position: only buckets starting before this day
+        
+    Returns:
+        list: Bucket dictionaries, newest first
+    """
+    if resolution not in ROLLUP_BUCKETS:
+        raise ValueError(f"Unsupported resolution '{resolution}'")
+    
+    predicate, params = _rollup_filter(since, until)
+    if before is not None:
+        # Buckets are aligned, so every day of an older bucket precedes its start
+        predicate += " AND price_date < ?"
+        params.append(before)
+    top, limit_clause = backend.limit_clauses(limit)
+    
+    try:
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(_ROLLUP_SQL.format(
+                bucket=ROLLUP_BUCKETS[resolution],
+                product_filter="product_id = ?",
+                predicate=predicate,
+                top=top,
+                limit_clause=limit_clause
+            ), [product_id, *params])
+            
+            rows = cursor.fetchall()
+        
+        return [_rollup_row_to_dict(row, resolution) for row in rows]
+        
+    except DatabaseError as e:
+        logger.error(f"Error getting price rollup: {str(e)}")
+        return []
+
+
+@instrumented
+def get_price_rollups(
+    product_ids: list,
+    since: datetime = None,
+    until: datetime = None,
+    resolution: str = "day"
+) -> dict:
+    """
+    Get OHLC price buckets for many products with set-based queries
+    
+    Args:
+        product_ids: Product identifiers
+        since: First day to include (all history if None)
+        until: Last day to include (open-ended if None)
+        resolution: "day", "week" or "month"
+        
+    Returns:
+        dict: product_id -> bucket dictionaries, newest first (empty lists on error)
+    """
+    if resolution not in ROLLUP_BUCKETS:
+        raise ValueError(f"Unsupported resolution '{resolution}'")
+    
+    product_ids = list(dict.fromkeys(product_ids))
+    predicate, params = _rollup_filter(since, until)
+    rollups = {product_id: [] for product_id in product_ids}
+    
+    try:
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            for placeholders, chunk in _chunked(product_ids):
+                cursor.execute(_ROLLUP_SQL.format(
+                    bucket=ROLLUP_BUCKETS[resolution],
+                    product_filter=f"product_id IN ({placeholders})",
+                    predicate=predicate,
+                    top="",
+                    limit_clause=""
+                ), [*chunk, *params])
+                
+                for row in cursor.fetchall():
+                    rollups[row[0]].append(_rollup_row_to_dict(row, resolution))
+        
+        return rollups
+        
+    except DatabaseError as e:
+        logger.error(f"Error getting price rollups: {str(e)}")
+        return {product_id: [] for product_id in product_ids}
+
+
+@instrumented
+def get_rollup_trend_summary(product_id: str, since: datetime, until: datetime = None) -> dict:
+    """
+    Aggregate a product's daily rollup over a date window in one query
+    
+    Same shape as get_price_trend_summary, at day granularity: the window
+    is widened to whole days and first/latest come from the open of the
+    first and the close of the last priced day.
+    
+    Args:
+        product_id: Product identifier
+        since: First day of the window (inclusive)
+        until: Last day of the window (inclusive, open-ended if None)
+        
+    Returns:
+        dict: Trend summary, or None on error
+    """
+    predicate, params = _rollup_filter(since, until)
+    
+    try:
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f"""
+                WITH days AS (
+                    SELECT 
+                        *,
+                        ROW_NUMBER() OVER (
+                            ORDER BY CASE WHEN open_price IS NULL THEN 1 ELSE 0 END, price_date ASC
+                        ) AS rn_first,
+                        ROW_NUMBER() OVER (
+                            ORDER BY CASE WHEN close_price IS NULL THEN 1 ELSE 0 END, price_date DESC
+                        ) AS rn_last
+                    FROM price_daily
+                    WHERE product_id = ?{predicate}
+                )
+                SELECT 
+                    SUM(sample_count) AS data_points,
+                    MAX(CASE WHEN rn_first = 1 THEN open_price END) AS first_price,
+                    MAX(CASE WHEN rn_first = 1 THEN price_date END) AS first_date,
+                    MAX(CASE WHEN rn_last = 1 THEN close_price END) AS latest_price,
+                    MAX(CASE WHEN rn_last = 1 THEN price_date END) AS latest_date,
+                    MIN(low_price) AS min_price,
+                    MAX(high_price) AS max_price,
+                    SUM(price_sum) / NULLIF(SUM(price_count), 0) AS avg_price
+                FROM days
+            """, [product_id, *params])
+            
+            row = cursor.fetchone()
+        
+        return {
+            "product_id": product_id,
+            "data_points": row[0] or 0,
+            "first_price": float(row[1]) if row[1] else None,
+            "first_date": as_date(row[2]).isoformat() if row[2] else None,
+            "latest_price": float(row[3]) if row[3] else None,
+            "latest_date": as_date(row[4]).isoformat() if row[4] else None,
+            "min_price": float(row[5]) if row[5] else None,
+            "max_price": float(row[6]) if row[6] else None,
+            "avg_price": float(row[7]) if row[7] else None
+        }
+        
+    except DatabaseError as e:
+        logger.error(f"Error getting rollup trend summary: {str(e)}")
+        return None
+
+
+@instrumented
+def get_data_version() -> tuple:
+    """
+    Cheap probe that changes whenever catalog or price data changes
+    
+    Reads only index ends and the small products/current_prices tables;
+    any ingest touches current_prices.updated_at, new history rows move
+    the price_history id high-water mark and archiving old rows moves its
+    low-water mark.
+    Like the catalog reads it may run on the read replica, so the version
+    describes the same copy of the data the cache loads.
+    
+    Returns:
+        tuple: Opaque version value, or None on error
+    """
+    try:
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT 
+                    (SELECT COUNT(*) FROM products),
+                    (SELECT MAX(updated_at) FROM products),
+                    (SELECT MAX(updated_at) FROM current_prices),
+                    (SELECT MAX(id) FROM price_history),
+                    (SELECT MIN(id) FROM price_history)
+            """)
+            
+            return tuple(cursor.fetchone())
+        
+    except DatabaseError as e:
+        logger.error(f"Error probing data version: {str(e)}")
+        return None
+
+
+@instrumented
 def get_all_products() -> list:
     """
     Get all products from database
     
     Returns:
-        list: List of product dictionaries
+        list: Product records ordered by brand, model
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT product_id, brand, model, product_url, created_at, updated_at
-            FROM products
-            ORDER BY brand, model
-        """)
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT product_id, brand, model, product_url, created_at, updated_at
+                FROM products
+                ORDER BY brand, model
+            """)
+            
+            rows = cursor.fetchall()
         
-        rows = cursor.fetchall()
-        conn.close()
+        return [Product(*row) for row in rows]
         
-        products = []
-        for row in rows:
-            products.append({
-                "product_id": row[0],
-                "brand": row[1],
-                "model": row[2],
-                "product_url": row[3],
-                "created_at": row[4].isoformat() if row[4] else None,
-                "updated_at": row[5].isoformat() if row[5] else None
-            })
-        
-        return products
-        
-    except pyodbc.Error as e:
+    except DatabaseError as e:
         logger.error(f"Error getting products: {str(e)}")
         return []
 
 
+@instrumented
+def get_product_by_id(product_id: str) -> Product:
+    """
+    Get a single product by primary key
+    
+    Args:
+        product_id: Product identifier
+    
+    Returns:
+        Product: The product record, or None if not found or on error
+    """
+    try:
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT product_id, brand, model, product_url, created_at, updated_at
+                FROM products
+                WHERE product_id = ?
+            """, (product_id,))
+            
+            row = cursor.fetchone()
+        
+        return Product(*row) if row else None
+    
+    except DatabaseError as e:
+        logger.error(f"Error getting product {product_id}: {str(e)}")
+        return None
+
+
+# {product_filter}: "product_id = ?" or "product_id IN (...)"
+# Lifetime statistics come from price_daily: it keeps the days database.archive
+# moved out of price_history, and holds one row per product-day
+_PRICE_STATISTICS_SQL = """
+    SELECT 
+        product_id,
+        MIN(low_price) as min_price,
+        MAX(high_price) as max_price,
+        SUM(price_sum) / NULLIF(SUM(price_count), 0) as avg_price,
+        COALESCE(SUM(price_count), 0) as total_records
+    FROM price_daily
+    WHERE {product_filter} AND price_count > 0
+    GROUP BY product_id
+"""
+
+
+def _statistics_row(product_id: str, row) -> dict:
+    """Build a statistics dict from a _PRICE_STATISTICS_SQL row (None: no priced history)"""
+    row = row or (product_id, None, None, None, 0)
+    return {
+        "product_id": product_id,
+        "min_price": float(row[1]) if row[1] else None,
+        "max_price": float(row[2]) if row[2] else None,
+        "avg_price": float(row[3]) if row[3] else None,
+        "total_records": row[4]
+    }
+
+
+@instrumented
 def get_price_statistics(product_id: str) -> dict:
     """
-    Get price statistics for a product
+    Get lifetime price statistics for a product
+    
+    Read from price_daily, so days already archived out of price_history
+    still count.
     
     Args:
         product_id: Product identifier
@@ -273,33 +1518,49 @@ def get_price_statistics(product_id: str) -> dict:
         dict: Statistics (min, max, avg price)
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                MIN(price) as min_price,
-                MAX(price) as max_price,
-                AVG(price) as avg_price,
-                COUNT(*) as total_records
-            FROM price_history
-            WHERE product_id = ? AND price IS NOT NULL
-        """, (product_id,))
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(_PRICE_STATISTICS_SQL.format(product_filter="product_id = ?"), (product_id,))
+            
+            row = cursor.fetchone()
         
-        row = cursor.fetchone()
-        conn.close()
+        return _statistics_row(product_id, row)
         
-        if row:
-            return {
-                "product_id": product_id,
-                "min_price": float(row[0]) if row[0] else None,
-                "max_price": float(row[1]) if row[1] else None,
-                "avg_price": float(row[2]) if row[2] else None,
-                "total_records": row[3]
-            }
+    except DatabaseError as e:
+        logger.error(f"Error getting price statistics: {str(e)}")
         return None
+
+
+@instrumented
+def get_price_statistics_batch(product_ids: list) -> dict:
+    """
+    Get price statistics for many products with set-based queries
+    
+    Args:
+        product_ids: Product identifiers
+        
+    Returns:
+        dict: product_id -> statistics (same shape as get_price_statistics),
+              or None on error
+    """
+    product_ids = list(dict.fromkeys(product_ids))
+    
+    try:
+        rows = {}
+        with db_connection(read_only=True) as conn:
+            cursor = conn.cursor()
+            
+            for placeholders, chunk in _chunked(product_ids):
+                cursor.execute(
+                    _PRICE_STATISTICS_SQL.format(product_filter=f"product_id IN ({placeholders})"),
+                    chunk
+                )
+                rows.update((row[0], row) for row in cursor.fetchall())
+        
+        return {product_id: _statistics_row(product_id, rows.get(product_id)) for product_id in product_ids}
         
-    except pyodbc.Error as e:
+    except DatabaseError as e:
         logger.error(f"Error getting price statistics: {str(e)}")
         return None
 
@@ -312,4 +1573,4 @@ if __name__ == "__main__":
     products = get_all_products()
     print(f"\nFound {len(products)} products:")
     for p in products:
-        print(f"  - {p['brand']} {p['model']}")
+        print(f"  - {p.brand} {p.model}")
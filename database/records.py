@@ -0,0 +1,86 @@
+"""
+Typed row records returned by database operations
+Slotted dataclasses keep per-row memory small and give callers attribute access.
+Timestamps stay native datetimes; to_dict() formats them only when a
+response is serialized.
+"""
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Optional
+
+
+class _Record:
+    """Shared serialization for the slotted record types"""
+    __slots__ = ()
+
+    def to_dict(self) -> dict:
+        """JSON-ready dict with datetimes as ISO 8601 strings"""
+        result = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            result[field.name] = value.isoformat() if isinstance(value, datetime) else value
+        return result
+
+
+@dataclass(slots=True, frozen=True)
+class Product(_Record):
+    """A row of the products table"""
+    product_id: str
+    brand: str
+    model: str
+    product_url: str
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+@dataclass(slots=True, frozen=True)
+class LatestPrice(_Record):
+    """A product's current price as kept in current_prices"""
+    product_id: str
+    price: Optional[float]
+    currency: str
+    availability: str
+    promo: Optional[str]
+    scraped_at: datetime
+
+
+@dataclass(slots=True, frozen=True)
+class PriceObservation(_Record):
+    """
+    A price_history row
+
+    With run-length compression the row covers observation_count identical
+    observations from scraped_at to last_seen_at.
+    """
+    id: int
+    product_id: str
+    price: Optional[float]
+    currency: str
+    availability: str
+    promo: Optional[str]
+    scraped_at: datetime
+    last_seen_at: datetime
+    observation_count: int
+
+
+@dataclass(slots=True, frozen=True)
+class ProductSnapshot(_Record):
+    """Product metadata with its latest observation and lifetime price statistics"""
+    product_id: str
+    brand: str
+    model: str
+    product_url: str
+    price: Optional[float]
+    currency: Optional[str]
+    availability: Optional[str]
+    promo: Optional[str]
+    scraped_at: Optional[datetime]
+    min_price: Optional[float]
+    max_price: Optional[float]
+    avg_price: Optional[float]
+    total_records: int
+
+    @property
+    def has_price_data(self) -> bool:
+        """True if the product has at least one price_history row"""
+        return self.scraped_at is not None
@@ -44,7 +44,7 @@ def create_pdf_folders():
     existing = 0
 
     for product in products:
-        product_id = product[0]  # First column is product_id
+        product_id = product.product_id
         product_folder = pdfs_dir / product_id
 
         if product_folder.exists():
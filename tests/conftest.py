@@ -0,0 +1,18 @@
+"""
+Shared pytest setup
+Points the database modules at a throwaway SQLite file before config is
+imported, so tests never touch a configured Azure SQL database.
+"""
+import os
+import sys
+import tempfile
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# Must be set before config is imported by the database modules
+_test_dir = tempfile.mkdtemp(prefix="price-tests-")
+os.environ["DB_CONNECTION_STRING"] = f"sqlite:///{os.path.join(_test_dir, 'test.db')}"
+os.environ["DB_READ_REPLICA_CONNECTION_STRING"] = ""
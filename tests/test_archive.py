@@ -0,0 +1,159 @@
+"""
+Reads spanning the Parquet archive must match the history before it was archived
+"""
+from datetime import datetime, date, timedelta
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from database import archive, operations
+from database.migrations import apply_migrations
+
+PRODUCT_ID = "archive-1"
+# Archive everything before 2021; the test history straddles that cutoff
+ARCHIVE_CUTOFF = date(2021, 1, 1)
+START = datetime(2020, 12, 20, 6, 0)
+
+
+@pytest.fixture(scope="module")
+def archived(tmp_path_factory):
+    apply_migrations()
+    for step in range(22 * 4):
+        scraped_at = START + timedelta(hours=6 * step)
+        price = 1299.0 if step < 30 else 1199.0 if step < 70 else 1249.0
+        operations.save_scraped_batch([{
+            "product_id": PRODUCT_ID,
+            "brand": "Test",
+            "model": "Archive 15",
+            "product_url": f"https://example.com/{PRODUCT_ID}",
+            "price": price,
+            "scraped_at": scraped_at
+        }], compress=True)
+
+    since = datetime(2020, 12, 25, 7, 30)
+    before = {
+        "version": operations.get_data_version(),
+        "statistics": operations.get_price_statistics(PRODUCT_ID),
+        "summary": operations.get_price_trend_summary(PRODUCT_ID, since),
+        "window": operations.get_price_window(PRODUCT_ID, since)
+    }
+
+    archive_dir = str(tmp_path_factory.mktemp("archive"))
+    result = archive.archive_price_history(
+        retention_days=(date.today() - ARCHIVE_CUTOFF).days,
+        archive_dir=archive_dir
+    )
+    assert not result["failed_months"]
+    assert result["deleted_rows"] > 0
+    return since, archive_dir, before
+
+
+def test_archive_changes_the_data_version(archived):
+    _, _, before = archived
+    assert operations.get_data_version() != before["version"]
+
+
+def test_lifetime_statistics_include_archived_days(archived):
+    _, _, before = archived
+    assert operations.get_price_statistics(PRODUCT_ID) == before["statistics"]
+
+
+def test_long_range_summary_matches_unarchived_history(archived):
+    since, archive_dir, before = archived
+
+    assert operations.get_price_trend_summary(PRODUCT_ID, since)["data_points"] < before["summary"]["data_points"]
+    expected = dict(before["summary"])
+    summary = archive.get_long_range_trend_summary(PRODUCT_ID, since, archive_dir=archive_dir)
+
+    assert summary.pop("avg_price") == pytest.approx(expected.pop("avg_price"))
+    assert summary == expected
+
+
+def test_long_range_window_matches_unarchived_history(archived):
+    since, archive_dir, before = archived
+
+    window = archive.get_long_range_price_window(PRODUCT_ID, since, archive_dir=archive_dir)
+
+    assert window == before["window"]
+
+
+RECENT_PRODUCT_ID = "archive-2"
+
+
+@pytest.fixture(scope="module")
+def recent_archive(archived, monkeypatch_module):
+    """
+    Archive with a shorter retention than the configured one, and leave
+    every other month's rows in price_history as if its delete had failed
+    """
+    _, archive_dir, _ = archived
+    start = datetime.combine(date.today() - timedelta(days=150), datetime.min.time()).replace(hour=6)
+    for step in range(90 * 4):
+        operations.save_scraped_batch([{
+            "product_id": RECENT_PRODUCT_ID,
+            "brand": "Test",
+            "model": "Archive 14",
+            "product_url": f"https://example.com/{RECENT_PRODUCT_ID}",
+            "price": 999.0 if step % 50 < 30 else None if step % 50 < 35 else 949.0,
+            "scraped_at": start + timedelta(hours=6 * step)
+        }], compress=True)
+
+    since = start + timedelta(days=25, hours=3)
+    before = {
+        "summary": operations.get_price_trend_summary(RECENT_PRODUCT_ID, since),
+        "window": operations.get_price_window(RECENT_PRODUCT_ID, since)
+    }
+
+    delete = archive._delete_archived
+    calls = []
+
+    def delete_every_other_month(conn, cursor, start, end, max_id):
+        calls.append(start)
+        return delete(conn, cursor, start, end, max_id) if len(calls) % 2 else 0
+
+    monkeypatch_module.setattr(archive, "_delete_archived", delete_every_other_month)
+    result = archive.archive_price_history(retention_days=90, archive_dir=archive_dir)
+    assert not result["failed_months"]
+    assert len(calls) >= 3
+    return since, archive_dir, before
+
+
+@pytest.fixture(scope="module")
+def monkeypatch_module():
+    with pytest.MonkeyPatch.context() as patch:
+        yield patch
+
+
+def test_watermark_follows_the_archive_run(recent_archive, monkeypatch):
+    _, archive_dir, _ = recent_archive
+    cutoff = datetime.combine(date.today() - timedelta(days=90), datetime.min.time())
+    assert archive.archived_until(archive_dir) == cutoff
+
+    # Archives written before the watermark existed: derived from the newest partition
+    monkeypatch.setattr(archive, "WATERMARK_FILE_NAME", "_missing")
+    assert archive.archived_until(archive_dir) == cutoff
+
+
+def test_long_range_summary_counts_undeleted_rows_once(recent_archive):
+    since, archive_dir, before = recent_archive
+    expected = dict(before["summary"])
+    summary = archive.get_long_range_trend_summary(RECENT_PRODUCT_ID, since, archive_dir=archive_dir)
+
+    assert summary.pop("avg_price") == pytest.approx(expected.pop("avg_price"))
+    assert summary == expected
+
+
+def test_long_range_window_counts_undeleted_rows_once(recent_archive):
+    since, archive_dir, before = recent_archive
+
+    window = archive.get_long_range_price_window(RECENT_PRODUCT_ID, since, archive_dir=archive_dir)
+
+    assert window == before["window"]
+
+
+def test_earlier_archive_still_reads_whole(archived, recent_archive):
+    since, archive_dir, before = archived
+    summary = archive.get_long_range_trend_summary(PRODUCT_ID, since, archive_dir=archive_dir)
+    assert summary["data_points"] == before["summary"]["data_points"]
+    assert archive.get_long_range_price_window(PRODUCT_ID, since, archive_dir=archive_dir) == before["window"]
@@ -0,0 +1,94 @@
+"""
+Bulk ingest: one transaction per batch, bad rows reported without losing the rest
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import operations
+from database.backends import DatabaseError
+from database.connection import db_connection
+from database.migrations import apply_migrations
+
+SCRAPED_AT = datetime(2024, 8, 5, 9, 0)
+
+
+def _scrape(product_id: str, price, step: int = 0, **overrides) -> dict:
+    scrape = {
+        "product_id": product_id,
+        "brand": "Test",
+        "model": "Bulk 15",
+        "product_url": f"https://example.com/{product_id}",
+        "price": price,
+        "scraped_at": SCRAPED_AT + timedelta(hours=step)
+    }
+    scrape.update(overrides)
+    return scrape
+
+
+def _stored(product_ids: list) -> dict:
+    """Row counts per table for product_ids"""
+    placeholders = ", ".join("?" for _ in product_ids)
+    counts = {}
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        for table in ("products", "price_history", "current_prices", "price_daily"):
+            cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE product_id IN ({placeholders})", product_ids)
+            counts[table] = cursor.fetchone()[0]
+    return counts
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    apply_migrations()
+
+
+def test_batch_saves_every_row():
+    product_ids = ["bulk-1", "bulk-2", "bulk-3"]
+    result = operations.save_scraped_batch([
+        _scrape(product_id, 1000.0 + step, step)
+        for step in range(4)
+        for product_id in product_ids
+    ], compress=False)
+
+    assert result == {"total": 12, "saved": 12, "failed": []}
+    assert _stored(product_ids) == {"products": 3, "price_history": 12, "current_prices": 3, "price_daily": 3}
+    assert operations.get_latest_price("bulk-2").price == 1003.0
+
+
+def test_invalid_results_are_reported_and_skipped():
+    result = operations.save_scraped_batch([
+        _scrape("bulk-4", 999.0),
+        _scrape("bulk-5", "not a price"),
+        _scrape("bulk-6", 899.0, scraped_at="yesterday")
+    ])
+
+    assert result["saved"] == 1
+    assert [(f["index"], f["product_id"]) for f in result["failed"]] == [(1, "bulk-5"), (2, "bulk-6")]
+    assert _stored(["bulk-4", "bulk-5", "bulk-6"])["price_history"] == 1
+
+
+def test_failing_row_falls_back_to_row_by_row():
+    result = operations.save_scraped_batch([
+        _scrape("bulk-7", 1299.0),
+        _scrape("bulk-8", 1199.0, product_url=None),
+        _scrape("bulk-9", 1099.0)
+    ])
+
+    assert result["saved"] == 2
+    assert [(f["index"], f["product_id"]) for f in result["failed"]] == [(1, "bulk-8")]
+    assert _stored(["bulk-7", "bulk-9"]) == {"products": 2, "price_history": 2, "current_prices": 2, "price_daily": 2}
+    assert _stored(["bulk-8"])["price_history"] == 0
+
+
+def test_failure_after_insert_rolls_back_whole_batch(monkeypatch):
+    def fail_refresh(cursor, product_ids, start, end):
+        raise DatabaseError("price_daily refresh failed")
+
+    monkeypatch.setattr(operations, "_refresh_price_daily", fail_refresh)
+    product_ids = ["bulk-10", "bulk-11"]
+    result = operations.save_scraped_batch([_scrape(product_id, 799.0) for product_id in product_ids])
+
+    assert result["saved"] == 0
+    assert [f["product_id"] for f in result["failed"]] == product_ids
+    assert _stored(product_ids) == {"products": 0, "price_history": 0, "current_prices": 0, "price_daily": 0}
@@ -0,0 +1,57 @@
+"""
+Tests for the catalog cache's data-version probe (database/cache.py)
+"""
+import threading
+import time
+
+from database import cache, operations
+
+
+def test_reads_do_not_wait_behind_a_slow_probe(monkeypatch):
+    catalog_cache = cache.CatalogCache(ttl=60, serve_stale=True)
+    monkeypatch.setattr(operations, "get_data_version", lambda: (1,))
+    assert catalog_cache.get("catalog", lambda: ["cached"]) == ["cached"]
+
+    probe_started, release_probe = threading.Event(), threading.Event()
+
+    def slow_probe():
+        probe_started.set()
+        release_probe.wait(5)
+        return (1,)
+
+    monkeypatch.setattr(operations, "get_data_version", slow_probe)
+    catalog_cache._next_probe_at = 0
+    prober = threading.Thread(target=catalog_cache.get, args=("catalog", lambda: ["reloaded"]))
+    prober.start()
+    assert probe_started.wait(5)
+
+    began = time.monotonic()
+    assert catalog_cache.get("catalog", lambda: ["loaded while probing"]) == ["cached"]
+    assert time.monotonic() - began < 1
+
+    release_probe.set()
+    prober.join(5)
+
+
+def test_failed_probe_backs_off(monkeypatch):
+    probes = []
+    catalog_cache = cache.CatalogCache(ttl=60, serve_stale=False, probe_backoff=30)
+    monkeypatch.setattr(operations, "get_data_version", lambda: probes.append(1))
+
+    for _ in range(5):
+        catalog_cache.get("catalog", lambda: ["rows"])
+
+    assert len(probes) == 1
+    assert catalog_cache.version() is None
+
+
+def test_version_change_drops_entries(monkeypatch):
+    versions = iter([(1,), (2,)])
+    catalog_cache = cache.CatalogCache(ttl=60)
+    monkeypatch.setattr(operations, "get_data_version", lambda: next(versions))
+
+    assert catalog_cache.get("catalog", lambda: ["old"]) == ["old"]
+    catalog_cache._next_probe_at = 0
+
+    assert catalog_cache.get("catalog", lambda: ["new"]) == ["new"]
+    assert catalog_cache.version() == (2,)
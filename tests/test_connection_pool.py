@@ -0,0 +1,124 @@
+"""
+Connection pool: size bound, recycling, checkout validation of reused connections
+"""
+import threading
+
+import pytest
+
+from database.backends import DatabaseError
+from database.connection import ConnectionPool, PoolTimeoutError, get_connection
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = ConnectionPool(connect=get_connection, size=2, timeout=0.1, validate_after=30)
+    validations = []
+    validate = pool._validate
+
+    def counting_validate(pooled):
+        validations.append(pooled)
+        return validate(pooled)
+
+    monkeypatch.setattr(pool, "_validate", counting_validate)
+    pool.validations = validations
+    yield pool
+    pool.close()
+
+
+def _idle_for(pooled, seconds: float):
+    pooled.last_used_at -= seconds
+    pooled.created_at -= seconds
+
+
+def test_recently_used_connection_is_not_validated(pool):
+    with pool.connection():
+        pass
+    for _ in range(5):
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+
+    assert pool.validations == []
+    assert pool.metrics()["connections_created"] == 1
+
+
+def test_idle_connection_is_validated(pool):
+    pooled = pool.checkout()
+    pool.checkin(pooled)
+    _idle_for(pooled, 60)
+
+    assert pool.checkout() is pooled
+    assert pool.validations == [pooled]
+
+
+def test_dead_idle_connection_is_replaced(pool):
+    pooled = pool.checkout()
+    pool.checkin(pooled)
+    pooled.connection.close()
+    _idle_for(pooled, 60)
+
+    replacement = pool.checkout()
+    assert replacement is not pooled
+    assert pool.metrics()["validation_failures"] == 1
+
+
+def test_dead_recent_connection_is_closed_on_first_error(pool):
+    pooled = pool.checkout()
+    pool.checkin(pooled)
+    pooled.connection.close()
+
+    with pytest.raises(DatabaseError):
+        with pool.connection() as conn:
+            conn.cursor().execute("SELECT 1")
+
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        assert cursor.fetchone()[0] == 1
+    assert pool.metrics()["connections_created"] == 2
+
+
+def test_pool_never_exceeds_its_size(pool):
+    first, second = pool.checkout(), pool.checkout()
+    assert pool.metrics()["open"] == 2
+
+    with pytest.raises(PoolTimeoutError):
+        pool.checkout()
+    assert pool.metrics()["timeouts"] == 1
+
+    pool.checkin(first)
+    assert pool.checkout() is first
+    pool.checkin(first)
+    pool.checkin(second)
+    assert pool.metrics()["connections_created"] == 2
+
+
+def test_waiting_checkout_gets_returned_connection(pool):
+    held = [pool.checkout(), pool.checkout()]
+    pool.timeout = 5
+    threading.Timer(0.05, pool.checkin, args=(held[0],)).start()
+
+    assert pool.checkout() is held[0]
+    assert pool.metrics()["waits"] == 1
+
+
+def test_old_connection_is_recycled(pool):
+    pool.recycle = 60
+    pooled = pool.checkout()
+    pool.checkin(pooled)
+    pooled.created_at -= 120
+
+    assert pool.checkout() is not pooled
+    metrics = pool.metrics()
+    assert (metrics["connections_recycled"], metrics["connections_created"], metrics["open"]) == (1, 2, 1)
+
+
+def test_long_idle_connection_is_recycled(pool):
+    pool.idle_timeout = 300
+    pooled = pool.checkout()
+    pool.checkin(pooled)
+    _idle_for(pooled, 600)
+
+    assert pool.checkout() is not pooled
+    assert pool.metrics()["connections_recycled"] == 1
+    assert pool.validations == []
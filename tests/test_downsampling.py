@@ -0,0 +1,73 @@
+"""
+Tests for LTTB chart downsampling (api/downsampling.py)
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from api.downsampling import lttb_indices, downsample
+
+
+def _series(n: int, spike_at: int = None):
+    x = np.arange(n, dtype=np.float64)
+    y = np.full(n, 100.0)
+    if spike_at is not None:
+        y[spike_at] = 500.0
+    return x, y
+
+
+def test_keeps_first_and_last_points():
+    x, _ = _series(500)
+    keep = lttb_indices(x, np.sin(x / 10), 50)
+    assert len(keep) == 50
+    assert keep[0] == 0
+    assert keep[-1] == 499
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_spike_survives():
+    x, y = _series(1000, spike_at=437)
+    keep = lttb_indices(x, y, 20)
+    assert 437 in keep
+
+
+def test_short_series_is_returned_whole():
+    x, y = _series(10)
+    assert lttb_indices(x, y, 10).tolist() == list(range(10))
+    assert lttb_indices(x, y, 50).tolist() == list(range(10))
+
+
+def test_fewer_than_three_points():
+    x, y = _series(10)
+    assert lttb_indices(x, y, 2).tolist() == [0, 9]
+    assert lttb_indices(x, y, 1).tolist() == [0]
+    assert lttb_indices(x, y, 0).tolist() == []
+
+
+def test_downsample_keeps_newest_first_order():
+    start = datetime(2024, 1, 1)
+    rows = [
+        {"at": start + timedelta(hours=i), "price": 500.0 if i == 123 else 100.0 + i % 7}
+        for i in range(300)
+    ]
+    newest_first = rows[::-1]
+
+    result = downsample(newest_first, 30, lambda row: row["at"], lambda row: row["price"])
+
+    assert len(result) == 30
+    assert result[0] is newest_first[0]
+    assert result[-1] is newest_first[-1]
+    assert all(a["at"] > b["at"] for a, b in zip(result, result[1:]))
+    assert any(row["price"] == 500.0 for row in result)
+    # Same points as downsampling the oldest-first series
+    oldest_first = downsample(rows, 30, lambda row: row["at"], lambda row: row["price"])
+    assert result == oldest_first[::-1]
+
+
+def test_downsample_skips_missing_values():
+    start = datetime(2024, 1, 1)
+    rows = [{"at": start + timedelta(days=i), "price": None if i % 2 else 10.0} for i in range(6)]
+
+    result = downsample(rows, 10, lambda row: row["at"], lambda row: row["price"])
+
+    assert [row["at"].day for row in result] == [1, 3, 5]
@@ -0,0 +1,105 @@
+"""
+Cursor-paginated /price-history: following next_cursor returns every row once
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+from database import cache, operations
+from database.migrations import apply_migrations
+
+PRODUCT_ID = "cursor-1"
+START = datetime(2024, 4, 1, 8, 0)
+DAYS = 5
+SCRAPES_PER_DAY = 4
+
+
+@pytest.fixture(scope="module")
+def app():
+    import api.main
+
+    apply_migrations()
+    # Two uncompressed rows per scraped_at, so raw pages split ties
+    operations.save_scraped_batch([
+        {
+            "product_id": PRODUCT_ID,
+            "brand": "Test",
+            "model": "Cursor 14",
+            "product_url": f"https://example.com/{PRODUCT_ID}",
+            "price": 1200.0 - day * 10 + scrape,
+            "scraped_at": START + timedelta(days=day, hours=3 * (scrape // 2))
+        }
+        for day in range(DAYS)
+        for scrape in range(SCRAPES_PER_DAY)
+    ], compress=False)
+    cache.invalidate_cache()
+    return api.main.app
+
+
+def _walk(app, limit: int, resolution: str = "raw") -> list:
+    """Follow next_cursor to the last page, returning each page's response"""
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            pages, cursor = [], None
+            while True:
+                params = {"limit": limit, "resolution": resolution}
+                if cursor:
+                    params["cursor"] = cursor
+                response = await client.get(f"/api/v1/products/{PRODUCT_ID}/price-history", params=params)
+                assert response.status_code == 200
+                pages.append(response.json())
+                cursor = pages[-1]["next_cursor"]
+                if cursor is None:
+                    return pages
+    return asyncio.run(request())
+
+
+def _get(app, params: dict):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(f"/api/v1/products/{PRODUCT_ID}/price-history", params=params)
+    return asyncio.run(request())
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7, 20])
+def test_raw_pages_cover_history_once(app, limit):
+    everything = operations.get_price_history(PRODUCT_ID, limit=1000)
+    assert len(everything) == DAYS * SCRAPES_PER_DAY
+
+    pages = _walk(app, limit)
+    rows = [row for page in pages for row in page["history"]]
+
+    assert [row["id"] for row in rows] == [row.id for row in everything]
+    assert all(page["count"] == limit for page in pages[:-1])
+    assert len(pages) == -(-len(everything) // limit)
+
+
+def test_day_pages_cover_rollup_once(app):
+    pages = _walk(app, 2, resolution="day")
+    days = [row["period_start"] for page in pages for row in page["history"]]
+
+    assert days == [(START + timedelta(days=day)).date().isoformat() for day in reversed(range(DAYS))]
+
+
+def test_last_page_has_no_cursor(app):
+    body = _get(app, {"limit": 1000}).json()
+
+    assert body["count"] == DAYS * SCRAPES_PER_DAY
+    assert body["next_cursor"] is None
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30"])
+def test_malformed_cursor_is_rejected(app, cursor):
+    assert _get(app, {"cursor": cursor}).status_code == 400
+
+
+def test_cursor_for_another_resolution_is_rejected(app):
+    cursor = _get(app, {"limit": 1, "resolution": "day"}).json()["next_cursor"]
+
+    assert _get(app, {"cursor": cursor, "resolution": "raw"}).status_code == 400
@@ -0,0 +1,78 @@
+"""
+Tests for ETag / 304 handling of /api/v1 reads (api/main.py conditional_get)
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+from database import cache, operations
+from database.instrumentation import instrumented, current_timer
+from database.migrations import apply_migrations
+
+
+@pytest.fixture(scope="module")
+def app():
+    import api.main
+
+    apply_migrations()
+    operations.save_scraped_batch([{
+        "product_id": "etag-1",
+        "brand": "Test",
+        "model": "ETag 13",
+        "product_url": "https://example.com/etag-1",
+        "price": 1099.0,
+        "scraped_at": datetime(2024, 5, 1, 12, 0)
+    }])
+    cache.invalidate_cache()
+    return api.main.app
+
+
+def _get(app, path: str, headers: dict = None):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+    return asyncio.run(request())
+
+
+def test_304_repeats_the_etag_of_the_200(app):
+    headers = {"Accept-Encoding": "gzip"}
+    first = _get(app, "/api/v1/products", headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    second = _get(app, "/api/v1/products", {**headers, "If-None-Match": etag})
+
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert "Accept-Encoding" in second.headers["vary"]
+
+
+def test_identity_requests_get_a_strong_etag(app):
+    response = _get(app, "/api/v1/products", {"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+
+
+def test_response_built_from_a_failed_query_is_not_tagged(app, monkeypatch):
+    @instrumented
+    def failing_catalog(product_ids=None):
+        # What an operation does when it swallows a DatabaseError
+        current_timer().errors += 1
+        return []
+
+    monkeypatch.setattr(operations, "get_catalog", failing_catalog)
+    cache.invalidate_cache()
+
+    response = _get(app, "/api/v1/products")
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 0
+    assert "etag" not in response.headers
+    cache.invalidate_cache()
@@ -0,0 +1,53 @@
+"""
+Keyset-paginated price history: every row exactly once, newest first
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import operations
+from database.migrations import apply_migrations
+
+PRODUCT_ID = "pages-1"
+START = datetime(2024, 5, 1, 9, 0)
+TIMESTAMPS = 10
+ROWS_PER_TIMESTAMP = 3
+
+
+@pytest.fixture(scope="module", autouse=True)
+def history():
+    apply_migrations()
+    # Several uncompressed rows share each scraped_at, so pages split ties
+    operations.save_scraped_batch([
+        {
+            "product_id": PRODUCT_ID,
+            "brand": "Test",
+            "model": "Pages 13",
+            "product_url": f"https://example.com/{PRODUCT_ID}",
+            "price": 1000.0 + step * 10 + copy,
+            "scraped_at": START + timedelta(hours=step)
+        }
+        for step in range(TIMESTAMPS)
+        for copy in range(ROWS_PER_TIMESTAMP)
+    ], compress=False)
+
+
+def _walk(page_size: int) -> list:
+    rows, before = [], None
+    while True:
+        page = operations.get_price_history(PRODUCT_ID, limit=page_size, before=before)
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        before = (page[-1].scraped_at, page[-1].id)
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 4, 7, 30])
+def test_pages_have_no_gaps_or_duplicates(page_size):
+    everything = operations.get_price_history(PRODUCT_ID, limit=1000)
+    assert len(everything) == TIMESTAMPS * ROWS_PER_TIMESTAMP
+
+    walked = _walk(page_size)
+    assert [row.id for row in walked] == [row.id for row in everything]
+    assert len({row.id for row in walked}) == len(walked)
+    assert walked == sorted(walked, key=lambda row: (row.scraped_at, row.id), reverse=True)
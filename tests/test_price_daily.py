@@ -0,0 +1,119 @@
+"""
+price_daily: seeded for existing history by migration 0007
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import operations
+from database.connection import db_connection
+from database.migrations import apply_migrations, load_migrations, _split_batches
+
+PRODUCT_ID = "daily-1"
+START = datetime(2024, 7, 1, 0, 30)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def history():
+    apply_migrations()
+    # Priced and unpriced runs, several per day, over ten days
+    for step in range(10 * 8):
+        price = None if step % 7 == 3 else 1100.0 + (step // 5 % 4) * 25
+        operations.save_scraped_batch([{
+            "product_id": PRODUCT_ID,
+            "brand": "Test",
+            "model": "Daily 15",
+            "product_url": f"https://example.com/{PRODUCT_ID}",
+            "price": price,
+            "availability": "In Stock" if price else "Out of Stock",
+            "scraped_at": START + timedelta(hours=3 * step)
+        }], compress=True)
+
+
+def _price_daily_rows() -> list:
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM price_daily WHERE product_id = ? ORDER BY price_date", (PRODUCT_ID,))
+        return [tuple(row) for row in cursor.fetchall()]
+
+
+def test_seed_migration_rebuilds_missing_days():
+    maintained = _price_daily_rows()
+    assert len(maintained) == 10
+
+    # As on a deployment whose history predates price_daily: only some days built
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM price_daily WHERE product_id = ? AND price_date >= ?",
+            (PRODUCT_ID, START.date() + timedelta(days=3))
+        )
+        seed = next(m for m in load_migrations() if m.name == "seed_price_daily")
+        with open(seed.path, encoding="utf-8") as f:
+            for batch in _split_batches(f.read()):
+                cursor.execute(batch)
+        conn.commit()
+
+    seeded = _price_daily_rows()
+    # updated_at differs; every aggregate must match what ingest maintained
+    assert [row[:-1] for row in seeded] == [row[:-1] for row in maintained]
+
+
+RAW_PRODUCT_ID = "daily-raw"
+RUNS_PRODUCT_ID = "daily-runs"
+
+
+@pytest.fixture(scope="module")
+def raw_and_compressed():
+    # The same scrapes stored one row each and run-length compressed
+    for step in range(6 * 12):
+        price = None if step % 11 in (4, 5) else 899.0 + (step // 6 % 3) * 50
+        for product_id, compress in ((RAW_PRODUCT_ID, False), (RUNS_PRODUCT_ID, True)):
+            operations.save_scraped_batch([{
+                "product_id": product_id,
+                "brand": "Test",
+                "model": "Daily 13",
+                "product_url": f"https://example.com/{product_id}",
+                "price": price,
+                "scraped_at": START + timedelta(days=20, hours=2 * step)
+            }], compress=compress)
+
+
+def _baseline_statistics(product_id: str) -> dict:
+    """The statistics as computed before price_daily: over raw price_history rows"""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT MIN(price), MAX(price), AVG(price), COUNT(*)
+            FROM price_history
+            WHERE product_id = ? AND price IS NOT NULL
+        """, (product_id,))
+        min_price, max_price, avg_price, total_records = cursor.fetchone()
+    return {
+        "product_id": product_id,
+        "min_price": float(min_price),
+        "max_price": float(max_price),
+        "avg_price": pytest.approx(float(avg_price)),
+        "total_records": total_records
+    }
+
+
+def test_statistics_match_raw_history(raw_and_compressed):
+    baseline = _baseline_statistics(RAW_PRODUCT_ID)
+    assert baseline["total_records"] < 6 * 12
+
+    assert operations.get_price_statistics(RAW_PRODUCT_ID) == baseline
+    compressed = operations.get_price_statistics(RUNS_PRODUCT_ID)
+    assert compressed == dict(baseline, product_id=RUNS_PRODUCT_ID)
+
+    batch = operations.get_price_statistics_batch([RAW_PRODUCT_ID, RUNS_PRODUCT_ID])
+    assert batch[RAW_PRODUCT_ID] == baseline
+    assert batch[RUNS_PRODUCT_ID] == compressed
+
+
+def test_snapshot_statistics_match_raw_history(raw_and_compressed):
+    baseline = _baseline_statistics(RAW_PRODUCT_ID)
+    for snapshot in operations.get_product_snapshots([RAW_PRODUCT_ID, RUNS_PRODUCT_ID]):
+        assert (snapshot.min_price, snapshot.max_price, snapshot.avg_price, snapshot.total_records) == (
+            baseline["min_price"], baseline["max_price"], baseline["avg_price"], baseline["total_records"]
+        )
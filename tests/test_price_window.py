@@ -0,0 +1,101 @@
+"""
+Windowed reads over run-length compressed price history must match the
+uncompressed history, including windows that cut a run in two
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import operations
+from database.migrations import apply_migrations
+
+START = datetime(2024, 3, 4, 8, 0)
+
+# Hourly scrapes over two days; the price changes a few times a day
+PRICES = [
+    999.0 if hour < 5 else 949.0 if hour < 14 else None if hour == 14 else 899.0 if hour < 30 else 929.0
+    for hour in range(40)
+]
+
+WINDOWS = [
+    (START + timedelta(minutes=90), START + timedelta(minutes=150)),   # inside one run
+    (START + timedelta(minutes=30), START + timedelta(hours=20)),      # cuts two runs
+    (START + timedelta(hours=6, minutes=1), START + timedelta(hours=6, minutes=59)),  # between observations
+    (START + timedelta(hours=3), START + timedelta(hours=39)),
+    (START - timedelta(days=1), START + timedelta(days=3)),            # whole history
+    (START + timedelta(hours=25, minutes=30), None),                   # open-ended
+]
+
+
+def _scrape(product_id: str, price, scraped_at: datetime) -> dict:
+    return {
+        "product_id": product_id,
+        "brand": "Test",
+        "model": "Window 14",
+        "product_url": f"https://example.com/{product_id}",
+        "price": price,
+        "scraped_at": scraped_at
+    }
+
+
+@pytest.fixture(scope="module")
+def products():
+    apply_migrations()
+    for hour, price in enumerate(PRICES):
+        scraped_at = START + timedelta(hours=hour)
+        operations.save_scraped_batch([_scrape("window-compressed", price, scraped_at)], compress=True)
+        operations.save_scraped_batch([_scrape("window-raw", price, scraped_at)], compress=False)
+    return "window-compressed", "window-raw"
+
+
+def test_history_is_compressed(products):
+    compressed, raw = products
+    assert len(operations.get_price_history(compressed, limit=100)) < len(PRICES)
+    assert len(operations.get_price_history(raw, limit=100)) == len(PRICES)
+
+
+def test_cut_run_counts_only_observations_in_window(products):
+    compressed, raw = products
+    since, until = START + timedelta(minutes=90), START + timedelta(minutes=150)
+
+    summary = operations.get_price_trend_summary(compressed, since, until)
+
+    assert summary["data_points"] == 1
+    assert summary["first_date"] == (START + timedelta(hours=2)).isoformat()
+    assert summary["latest_date"] == (START + timedelta(hours=2)).isoformat()
+
+
+@pytest.mark.parametrize("since, until", WINDOWS)
+def test_trend_summary_matches_uncompressed(products, since, until):
+    compressed, raw = products
+
+    expected = operations.get_price_trend_summary(raw, since, until)
+    actual = operations.get_price_trend_summary(compressed, since, until)
+
+    for key in ("data_points", "priced_points", "first_price", "first_date",
+                "latest_price", "latest_date", "min_price", "max_price"):
+        assert actual[key] == expected[key], key
+    assert actual["avg_price"] == pytest.approx(expected["avg_price"])
+
+
+@pytest.mark.parametrize("since, until", WINDOWS)
+def test_trend_summaries_match_single_product(products, since, until):
+    summaries = operations.get_price_trend_summaries(list(products), since, until)
+
+    for product_id in products:
+        assert summaries[product_id] == operations.get_price_trend_summary(product_id, since, until)
+
+
+@pytest.mark.parametrize("since, until", WINDOWS)
+def test_price_window_matches_uncompressed(products, since, until):
+    compressed, raw = products
+
+    expected = operations.get_price_window(raw, since, until)
+    actual = operations.get_price_window(compressed, since, until)
+
+    assert sum(run.observation_count for run in actual) == len(expected)
+    assert all(since <= run.scraped_at <= run.last_seen_at for run in actual)
+    assert all(until is None or run.last_seen_at <= until for run in actual)
+    if expected:
+        assert actual[0].last_seen_at == expected[0].scraped_at
+        assert actual[-1].scraped_at == expected[-1].scraped_at
@@ -0,0 +1,98 @@
+"""
+POST /api/v1/products/batch: request validation and per-product facets
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+from database import cache, operations
+from database.migrations import apply_migrations
+
+PRODUCT_IDS = ["batch-1", "batch-2"]
+
+
+@pytest.fixture(scope="module")
+def app():
+    import api.main
+
+    apply_migrations()
+    now = datetime.now().replace(microsecond=0)
+    operations.save_scraped_batch([
+        {
+            "product_id": product_id,
+            "brand": "Test",
+            "model": f"Batch {number}",
+            "product_url": f"https://example.com/{product_id}",
+            "price": 1000.0 * number + step * 10,
+            "scraped_at": now - timedelta(days=3 - step)
+        }
+        for number, product_id in enumerate(PRODUCT_IDS, start=1)
+        for step in range(3)
+    ])
+    cache.invalidate_cache()
+    return api.main.app
+
+
+def _post(app, body):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/v1/products/batch", json=body)
+    return asyncio.run(request())
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"product_ids": []},
+    {"product_ids": "batch-1"},
+    {"product_ids": [f"batch-{n}" for n in range(101)]},
+    {"product_ids": PRODUCT_IDS, "days": 0},
+    {"product_ids": PRODUCT_IDS, "days": 366},
+    {"product_ids": PRODUCT_IDS, "resolution": "hour"},
+    {"product_ids": PRODUCT_IDS, "points": 1},
+    {"product_ids": PRODUCT_IDS, "points": 1001}
+])
+def test_invalid_request_is_rejected(app, body):
+    assert _post(app, body).status_code == 422
+
+
+def test_unknown_facet_is_rejected(app):
+    response = _post(app, {"product_ids": PRODUCT_IDS, "facets": ["latest", "reviews"]})
+
+    assert response.status_code == 400
+    assert "reviews" in response.json()["detail"]
+
+
+def test_largest_batch_is_accepted(app):
+    product_ids = PRODUCT_IDS + [f"missing-{n}" for n in range(98)]
+    body = _post(app, {"product_ids": product_ids, "facets": ["latest"]}).json()
+
+    assert body["count"] == 2
+    assert len(body["not_found"]) == 98
+
+
+def test_products_keep_request_order_without_duplicates(app):
+    body = _post(app, {
+        "product_ids": ["batch-2", "missing-1", "batch-1", "batch-2"],
+        "facets": ["latest", "stats", "trend", "history"]
+    }).json()
+
+    assert [product["product_id"] for product in body["products"]] == ["batch-2", "batch-1"]
+    assert body["not_found"] == ["missing-1"]
+
+    batch_2 = body["products"][0]
+    assert batch_2["latest_price"]["price"] == 2020.0
+    assert batch_2["price_statistics"]["total_records"] == 3
+    assert batch_2["trend"]["data_points"] == 3
+    assert [bucket["close_price"] for bucket in batch_2["history"]] == [2020.0, 2010.0, 2000.0]
+
+
+def test_default_facets(app):
+    product = _post(app, {"product_ids": ["batch-1"]}).json()["products"][0]
+
+    assert {"latest_price", "price_statistics"} <= set(product)
+    assert "trend" not in product and "history" not in product
@@ -0,0 +1,91 @@
+"""
+Read-replica failures must fall back to the primary, not turn into empty results
+"""
+import sqlite3
+import time
+
+import pytest
+
+from database import connection, operations
+from database.instrumentation import request_summary, request_degraded
+from database.migrations import apply_migrations
+
+PRODUCT_ID = "replica-1"
+
+
+class _LockedCursor:
+    def execute(self, sql, params=()):
+        raise sqlite3.OperationalError("database is locked")
+
+    def close(self):
+        pass
+
+
+class _LockedConnection:
+    """Replica connection that checks out fine but fails every query"""
+
+    def cursor(self):
+        return _LockedCursor()
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _refuse_connection():
+    raise sqlite3.OperationalError("database is locked")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def product():
+    apply_migrations()
+    operations.save_scraped_batch([{
+        "product_id": PRODUCT_ID,
+        "brand": "Test",
+        "model": "Replica 14",
+        "product_url": f"https://example.com/{PRODUCT_ID}",
+        "price": 899.0
+    }])
+
+
+def _use_replica(monkeypatch, connect):
+    router = connection.ReplicaRouter(check_interval=3600)
+    router._healthy = True
+    router._checked_at = time.monotonic()
+    monkeypatch.setattr(connection, "_router", router)
+    monkeypatch.setattr(connection, "_replica_breaker", connection.CircuitBreaker(failure_threshold=1))
+    monkeypatch.setattr(connection, "_replica_pool", connection.ConnectionPool(connect=connect, size=1))
+    return router
+
+
+def test_checkout_failure_reads_from_primary(monkeypatch):
+    router = _use_replica(monkeypatch, _refuse_connection)
+
+    with request_summary():
+        product = operations.get_product_by_id(PRODUCT_ID)
+        assert not request_degraded()
+
+    assert product.model == "Replica 14"
+    assert router.metrics()["routing_to_replica"] is False
+    assert connection.get_replica_metrics()["circuit"]["state"] == "open"
+
+
+def test_query_failure_is_rerun_on_primary(monkeypatch):
+    router = _use_replica(monkeypatch, _LockedConnection)
+
+    with request_summary():
+        latest = operations.get_latest_price(PRODUCT_ID)
+        assert not request_degraded()
+
+    assert latest is not None and latest.price == 899.0
+    assert router.metrics()["replica_failures"] == 1
+
+
+def test_open_replica_circuit_skips_replica(monkeypatch):
+    _use_replica(monkeypatch, _refuse_connection)
+    connection._replica_breaker.record_failure()
+
+    assert operations.get_product_by_id(PRODUCT_ID).model == "Replica 14"
+    assert connection._replica_pool.metrics()["connections_created"] == 0
@@ -0,0 +1,43 @@
+"""
+Run-length compression extends the same latest row that current_prices shows
+"""
+from datetime import datetime
+
+import pytest
+
+from database import operations
+from database.connection import db_connection
+from database.migrations import apply_migrations
+
+PRODUCT_ID = "runs-1"
+TIED_AT = datetime(2024, 6, 3, 10, 0)
+
+
+def _scrape(price: float, scraped_at: datetime) -> dict:
+    return {
+        "product_id": PRODUCT_ID,
+        "brand": "Test",
+        "model": "Runs 16",
+        "product_url": f"https://example.com/{PRODUCT_ID}",
+        "price": price,
+        "scraped_at": scraped_at
+    }
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    apply_migrations()
+
+
+def test_tied_scraped_at_extends_highest_id():
+    # Two rows share scraped_at; the later insert (higher id) is the latest
+    operations.save_scraped_batch([_scrape(1500.0, TIED_AT), _scrape(1450.0, TIED_AT)], compress=False)
+    operations.save_scraped_batch([_scrape(1450.0, TIED_AT.replace(hour=11))], compress=True)
+
+    history = operations.get_price_history(PRODUCT_ID)
+    assert [(row.price, row.observation_count) for row in history] == [(1450.0, 2), (1500.0, 1)]
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT price_history_id FROM current_prices WHERE product_id = ?", (PRODUCT_ID,))
+        assert cursor.fetchone()[0] == history[0].id
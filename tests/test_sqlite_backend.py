@@ -0,0 +1,54 @@
+"""
+SQLite backend: type conversion by declared column type, transactional migrations
+"""
+from datetime import datetime
+
+import pytest
+
+from database import migrations, operations
+from database.connection import db_connection
+from database.backends import DatabaseError
+from database.migrations import apply_migrations
+
+PRODUCT_ID = "sqlite-1"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    apply_migrations()
+
+
+def test_date_like_text_stays_text():
+    operations.save_scraped_batch([{
+        "product_id": PRODUCT_ID,
+        "brand": "Test",
+        "model": "2024-01-01",
+        "product_url": f"https://example.com/{PRODUCT_ID}",
+        "price": 999.0,
+        "promo": "2024-01-01",
+        "scraped_at": datetime(2024, 3, 4, 8, 0)
+    }])
+
+    latest = operations.get_latest_price(PRODUCT_ID)
+    assert latest.promo == "2024-01-01"
+    assert latest.scraped_at == datetime(2024, 3, 4, 8, 0)
+    assert operations.get_product_by_id(PRODUCT_ID).model == "2024-01-01"
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    before = migrations.get_applied_version()
+    (tmp_path / "9001_half_applied.sql").write_text(
+        "ALTER TABLE products ADD COLUMN probe_column TEXT NULL;\nGO\n"
+        "ALTER TABLE no_such_table ADD COLUMN probe_column TEXT NULL;\nGO\n",
+        encoding="utf-8"
+    )
+    monkeypatch.setattr(migrations, "MIGRATIONS_DIR", str(tmp_path))
+
+    with pytest.raises(DatabaseError):
+        apply_migrations()
+
+    assert migrations.get_applied_version() == before
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM pragma_table_info('products')")
+        assert "probe_column" not in {row[0] for row in cursor.fetchall()}